@@ -0,0 +1,4 @@
+"""
+Benchmarks for RhinoGuardians
+Standalone performance scripts, run with ``python -m benchmarks.<name>``
+"""
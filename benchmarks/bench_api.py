@@ -0,0 +1,255 @@
+"""
+API End-to-End Benchmark
+
+Drives the hot API paths through the ASGI app in-process, against a
+temporary SQLite database, and reports req/s and p50/p95/p99 latency per
+scenario:
+
+- ``upload_single``: sequential ``POST /upload/``
+- ``upload_batch``: bursts of ``--batch`` concurrent uploads
+- ``alerts_list_<rows>``: ``GET /alerts/?limit=100`` with ``<rows>`` alerts
+  in the table (no If-None-Match, so the page is always built)
+- ``alerts_trigger``: ``POST /alerts/trigger``
+- ``alerts_status``: ``PATCH /alerts/{id}/status``
+
+Uploads go through a stub detector that decodes the image and returns two
+fixed boxes, so the suite runs offline and exercises tracking, rules and the
+DB write; ``--detector model`` uses the real ``YoloDetector`` (``MODEL_PATH``).
+
+With ``--baseline`` each scenario is compared with a stored run and counts
+as a regression when its req/s drops, or its p95 rises, by more than
+``--tolerance``; the exit status is then 1 so the script can gate CI.
+Baselines are hardware-specific: record them on the machine that compares.
+
+Usage:
+    python -m benchmarks.bench_api [-n 200] [--sizes 100,1000,10000] [--batch 8]
+    python -m benchmarks.bench_api --baseline            # benchmarks/baselines/api.json
+    python -m benchmarks.bench_api --save-baseline benchmarks/baselines/api.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from io import BytesIO
+from typing import Awaitable, Callable, Dict, List, Optional
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "api.json")
+AUTH = {"Authorization": "Bearer testtoken123"}
+
+
+class BenchDetector:
+    """Stub model: decodes the upload like the real detector, returns two fixed boxes."""
+
+    def predict_bytes(self, data: bytes, region: Optional[List[int]] = None) -> list:
+        from PIL import Image
+
+        with Image.open(BytesIO(data)) as img:
+            img.load()
+            width, height = img.size
+        # Boxes on the motion-gate crop, returned in full-frame pixels like the real detector
+        x0, y0 = 0, 0
+        if region is not None:
+            x0, y0, width, height = region[0], region[1], region[2] - region[0], region[3] - region[1]
+        return [
+            {"box": [x0 + 0.1 * width, y0 + 0.1 * height, x0 + 0.4 * width, y0 + 0.5 * height], "confidence": 0.91,
+             "class": 0, "class_name": "rhino"},
+            {"box": [x0 + 0.5 * width, y0 + 0.2 * height, x0 + 0.9 * width, y0 + 0.7 * height], "confidence": 0.62,
+             "class": 1, "class_name": "person"},
+        ]
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    index = max(0, math.ceil(pct / 100.0 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def summarize(latencies: List[float], elapsed: float, errors: int) -> Dict:
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "req_per_s": round(len(ordered) / elapsed, 1),
+        "p50_ms": round(percentile(ordered, 50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 3),
+    }
+
+
+async def measure(
+    client, request: Callable[[object, int], Awaitable], count: int, concurrency: int = 1, warmup: int = 5
+) -> Dict:
+    """Issue ``count`` requests in waves of ``concurrency`` and summarise their latencies."""
+    for i in range(warmup):
+        await request(client, -1 - i)
+
+    latencies: List[float] = []
+
+    async def one(i: int) -> int:
+        started = time.perf_counter()
+        response = await request(client, i)
+        latencies.append(time.perf_counter() - started)
+        return response.status_code
+
+    errors = 0
+    started = time.perf_counter()
+    for first in range(0, count, concurrency):
+        statuses = await asyncio.gather(*(one(i) for i in range(first, min(first + concurrency, count))))
+        errors += sum(status >= 400 for status in statuses)
+    return summarize(latencies, time.perf_counter() - started, errors)
+
+
+def _image(i: int, size=(640, 480)) -> bytes:
+    from utils import create_test_image
+
+    # Distinct colours so the image store does not deduplicate every upload
+    return create_test_image(size=size, color=(i % 256, (i // 256) % 256, 90)).getvalue()
+
+
+def _seed_alerts(session_factory, start: int, stop: int) -> None:
+    from sqlalchemy import insert
+
+    from database.models import Alert, AlertStatus
+
+    base = datetime.utcnow() - timedelta(days=30)
+    rows = [
+        {
+            "alert_id": f"bench-{i}", "detection_id": str(i), "timestamp": base + timedelta(seconds=i),
+            "status": AlertStatus.ACTIVE, "type": "rhino_sighting", "severity": "high", "source": "camera_trap",
+            "lat": -23.88, "lng": 31.52, "zone_label": "Bench Zone", "created_by": "bench",
+        }
+        for i in range(start, stop)
+    ]
+    with session_factory() as db:
+        for i in range(0, len(rows), 5000):
+            db.execute(insert(Alert), rows[i:i + 5000])
+        db.commit()
+
+
+async def run_suite(args) -> Dict:
+    import httpx
+
+    from database.db import SessionLocal, engine
+    from database.models import Base
+    from main import app, warm_up
+    from routes.api import upload_detector
+
+    Base.metadata.create_all(bind=engine)
+    if args.detector == "stub":
+        app.dependency_overrides[upload_detector] = BenchDetector
+    warm_up()
+
+    async def upload(client, i):
+        return await client.post("/upload/", files={"file": (f"bench-{i}.jpg", _image(i + 100_000), "image/jpeg")})
+
+    async def list_alerts(client, i):
+        return await client.get("/alerts/", params={"limit": 100})
+
+    async def trigger(client, i):
+        return await client.post("/alerts/trigger", headers=AUTH, json={
+            "detection_id": f"bench-trigger-{i}", "type": "poacher_suspected", "severity": "high",
+            "source": "camera_trap", "location": {"lat": -23.88, "lng": 31.52, "zoneLabel": "Bench Zone"},
+            "createdBy": "bench",
+        })
+
+    async def patch_status(client, i):
+        status = "ACKNOWLEDGED" if i % 2 else "RESOLVED"
+        return await client.patch(f"/alerts/bench-{abs(i) % args.sizes[0]}/status", json={"status": status})
+
+    scenarios: Dict[str, Dict] = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # No alert rules are configured, so uploads add no alerts and the
+        # listing table sizes below are exact
+        scenarios["upload_single"] = await measure(client, upload, args.count)
+        scenarios["upload_batch"] = await measure(
+            client, lambda c, i: upload(c, i + args.count), args.count, concurrency=args.batch
+        )
+        seeded = 0
+        for size in args.sizes:
+            _seed_alerts(SessionLocal, seeded, size)
+            seeded = size
+            scenarios[f"alerts_list_{size}"] = await measure(client, list_alerts, args.count)
+        scenarios["alerts_trigger"] = await measure(client, trigger, args.count)
+        scenarios["alerts_status"] = await measure(client, patch_status, args.count)
+    return scenarios
+
+
+def compare(scenarios: Dict, baseline: Dict, tolerance: float):
+    """Relative change per scenario vs. the baseline, and the regressions found."""
+    changes, regressions = {}, []
+    for name, current in scenarios.items():
+        base = baseline.get("scenarios", {}).get(name)
+        if not base:
+            continue
+        throughput = current["req_per_s"] / base["req_per_s"] - 1.0
+        p95 = current["p95_ms"] / base["p95_ms"] - 1.0
+        changes[name] = {"req_per_s": f"{throughput:+.1%}", "p95_ms": f"{p95:+.1%}"}
+        if throughput < -tolerance:
+            regressions.append(f"{name}: req/s {base['req_per_s']} -> {current['req_per_s']}")
+        if p95 > tolerance:
+            regressions.append(f"{name}: p95 {base['p95_ms']}ms -> {current['p95_ms']}ms")
+    return changes, regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("-n", "--count", type=int, default=200, help="Requests per scenario")
+    parser.add_argument("--sizes", type=lambda v: sorted(int(x) for x in v.split(",")), default=[100, 1000, 10000],
+                        help="Alert table sizes for the listing scenarios")
+    parser.add_argument("--batch", type=int, default=8, help="Concurrent uploads per burst")
+    parser.add_argument("--detector", choices=("stub", "model"), default="stub")
+    parser.add_argument("--baseline", nargs="?", const=DEFAULT_BASELINE, default=None,
+                        help="Baseline JSON to compare against (default file if no path is given)")
+    parser.add_argument("--save-baseline", default=None, help="Write this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative slowdown")
+    args = parser.parse_args()
+
+    tmpdir = tempfile.TemporaryDirectory()
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmpdir.name, 'bench.db')}"
+    for name in ("IMAGE_STORAGE_DIR", "THUMBNAIL_CACHE_DIR", "PROFILE_DIR"):
+        os.environ[name] = os.path.join(tmpdir.name, name.lower())
+    # No zone polygons or alert rules: only the request paths are measured
+    os.environ["GEOFENCE_PATH"] = os.path.join(tmpdir.name, "zones.geojson")
+    os.environ["ALERT_RULES_PATH"] = os.path.join(tmpdir.name, "alert_rules.json")
+    if args.detector == "stub":
+        os.environ["SKIP_YOLO"] = "1"
+    logging.disable(logging.INFO)
+
+    scenarios = asyncio.run(run_suite(args))
+    results = {
+        "recorded_at": datetime.utcnow().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "detector": args.detector,
+        "count": args.count,
+        "scenarios": scenarios,
+    }
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as fh:
+            results["comparison"], regressions = compare(scenarios, json.load(fh), args.tolerance)
+        results["regressions"] = regressions
+    print(json.dumps(results, indent=2))
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save_baseline)), exist_ok=True)
+        with open(args.save_baseline, "w") as fh:
+            json.dump({k: v for k, v in results.items() if k not in ("comparison", "regressions")}, fh, indent=2)
+            fh.write("\n")
+    tmpdir.cleanup()
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+CPU Thread Plan Benchmark
+
+Compares inference throughput with torch's default threading against the
+CPU plan of ``utils.cpu_planner``, for a host running several web workers.
+
+``--workers`` processes stand in for web workers. In each, ``--concurrency``
+request threads call the model back to back for ``--duration`` seconds:
+
+- ``default``: torch keeps its default thread pools (one thread per core in
+  every worker) and every request thread calls the model directly, as with
+  the shared Starlette thread pool
+- ``planned``: ``plan_cpu`` for the detected CPU budget is applied
+  (``apply_torch_threads``) and calls go through a pool of
+  ``inference_pool_size`` threads, as ``/upload/`` does
+
+Reported per mode: total images/s over all workers and p50/p95 latency per
+call, queueing included. The model is the ``YoloDetector`` network when the
+weights are found (``--model``, default ``MODEL_PATH``) and otherwise a
+YOLO-sized stack of strided convolutions (``--synthetic`` forces it), so the
+comparison also runs without weights.
+
+Usage:
+    python -m benchmarks.bench_cpu_plan [--workers 4] [--concurrency 4] [--duration 10] [--size 640]
+        [--model PATH | --synthetic]
+"""
+
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import platform
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+MODES = ("default", "planned")
+
+
+def _synthetic_model():
+    import torch
+
+    layers, channels = [], 3
+    for out in (32, 64, 128, 256, 512):
+        layers += [torch.nn.Conv2d(channels, out, 3, stride=2, padding=1), torch.nn.SiLU(),
+                   torch.nn.Conv2d(out, out, 3, padding=1), torch.nn.SiLU()]
+        channels = out
+    return torch.nn.Sequential(*layers).eval()
+
+
+def _load_model(args):
+    """Callable running one inference, built inside the worker process."""
+    import torch
+
+    if not args.synthetic:
+        from config import MODEL_PATH
+        from models.yolo_detector import decode_image
+        from utils import create_test_image
+
+        # Loaded through torch.hub rather than YoloDetector, which would apply
+        # the CPU plan in the default mode too
+        model = torch.hub.load("ultralytics/yolov5", "custom", path=args.model or MODEL_PATH, force_reload=False)
+        frame = create_test_image(size=(1920, 1080)).getvalue()
+        return lambda: model(decode_image(frame), size=args.size)
+
+    model = _synthetic_model()
+    batch = torch.rand(1, 3, args.size, args.size)
+
+    def run():
+        with torch.inference_mode():
+            model(batch)
+    return run
+
+
+def _worker(mode: str, args, barrier, results) -> None:
+    import torch
+
+    from utils.cpu_planner import apply_torch_threads, available_cpus, plan_cpu
+
+    plan = plan_cpu(available_cpus(), workers=args.workers)
+    if mode == "planned":
+        apply_torch_threads(plan)
+    infer = _load_model(args)
+    infer()  # warm-up
+
+    executor = ThreadPoolExecutor(max_workers=plan.inference_pool_size) if mode == "planned" else None
+    latencies: List[float] = []
+    lock = threading.Lock()
+    barrier.wait()
+    deadline = time.perf_counter() + args.duration
+
+    def request_loop():
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            if executor is not None:
+                executor.submit(infer).result()
+            else:
+                infer()
+            with lock:
+                latencies.append(time.perf_counter() - started)
+
+    threads = [threading.Thread(target=request_loop) for _ in range(args.concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if executor is not None:
+        executor.shutdown()
+    results.put({"threads": torch.get_num_threads(), "plan": plan.as_dict(), "latencies": latencies})
+
+
+def _pct(ordered: List[float], p: float) -> float:
+    return ordered[max(0, math.ceil(p / 100.0 * len(ordered)) - 1)]
+
+
+def run_mode(mode: str, args) -> Dict:
+    ctx = multiprocessing.get_context("spawn")
+    barrier = ctx.Barrier(args.workers)
+    results = ctx.Queue()
+    processes = [ctx.Process(target=_worker, args=(mode, args, barrier, results)) for _ in range(args.workers)]
+    for process in processes:
+        process.start()
+    outputs = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    latencies = sorted(value for output in outputs for value in output["latencies"])
+    return {
+        "torch_threads_per_worker": outputs[0]["threads"],
+        "plan": outputs[0]["plan"],
+        "calls": len(latencies),
+        "images_per_s": round(len(latencies) / args.duration, 2),
+        "p50_ms": round(_pct(latencies, 50) * 1000.0, 1),
+        "p95_ms": round(_pct(latencies, 95) * 1000.0, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, default=4, help="Simulated web worker processes")
+    parser.add_argument("--concurrency", type=int, default=4, help="Request threads per worker")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds measured per mode")
+    parser.add_argument("--size", type=int, default=640, help="Inference resolution")
+    parser.add_argument("--model", default=None, help="Model weights (default: MODEL_PATH)")
+    parser.add_argument("--synthetic", action="store_true", help="Use the synthetic conv stack")
+    args = parser.parse_args()
+
+    from config import MODEL_PATH
+    from utils.cpu_planner import available_cpus
+
+    if not args.synthetic and not os.path.exists(args.model or MODEL_PATH):
+        print(f"{args.model or MODEL_PATH} not found, using the synthetic model", file=sys.stderr)
+        args.synthetic = True
+
+    modes = {}
+    for mode in MODES:
+        modes[mode] = run_mode(mode, args)
+        print(f"{mode} -> {modes[mode]['images_per_s']} img/s", file=sys.stderr)
+    speedup = modes["planned"]["images_per_s"] / modes["default"]["images_per_s"] - 1.0
+    print(json.dumps({
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "available_cpus": available_cpus(),
+        "model": "synthetic" if args.synthetic else (args.model or MODEL_PATH),
+        "workers": args.workers,
+        "concurrency": args.concurrency,
+        "size": args.size,
+        "modes": modes,
+        "planned_vs_default": f"{speedup:+.1%}",
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
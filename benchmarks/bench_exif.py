@@ -0,0 +1,108 @@
+"""
+EXIF Extraction Benchmark
+
+Compares the original PIL path of ``get_gps_from_image`` (``Image.open`` plus
+the private ``_getexif()`` and a scan over every tag) against the header-only
+parser in ``utils.exif``, single-file and batched, over thousands of
+synthetic camera-trap JPEGs carrying GPS EXIF.
+
+Usage:
+    python -m benchmarks.bench_exif [-n COUNT] [--width W --height H]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from io import BytesIO
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+from PIL.ExifTags import TAGS
+
+from utils import create_test_image
+from utils.exif import extract_metadata, extract_metadata_batch
+
+
+def legacy_get_gps(image_path: str):
+    """The pre-rework PIL implementation, kept as the comparison baseline."""
+    with Image.open(image_path) as img:
+        exif = img._getexif()
+        if not exif:
+            return None
+        gps_info = None
+        for tag_id in exif:
+            if TAGS.get(tag_id, tag_id) == "GPSInfo":
+                gps_info = exif[tag_id]
+                break
+        if not gps_info:
+            return None
+        lat, lon = gps_info.get(2), gps_info.get(4)
+        if not (lat and lon):
+            return None
+        lat = lat[0] + lat[1] / 60.0 + lat[2] / 3600.0
+        lon = lon[0] + lon[1] / 60.0 + lon[2] / 3600.0
+        if gps_info.get(1, "N") == "S":
+            lat = -lat
+        if gps_info.get(3, "E") == "W":
+            lon = -lon
+        return (lat, lon)
+
+
+def _make_frame(width: int, height: int) -> bytes:
+    """A test image (as ``utils.create_test_image`` builds it) with camera-trap EXIF."""
+    img = Image.open(create_test_image(size=(width, height), color=(60, 90, 40)))
+    exif = Image.Exif()
+    exif[0x010F], exif[0x0110] = "Reconyx", "HP2X"
+    exif.get_ifd(0x8769)[0x9003] = "2025:11:14 03:12:44"
+    gps = exif.get_ifd(0x8825)
+    gps[1], gps[2], gps[3], gps[4] = "S", (23.0, 53.0, 9.24), "E", (31.0, 31.0, 13.8)
+    gps[6] = 412.5
+    buf = BytesIO()
+    img.save(buf, "JPEG", exif=exif, quality=85)
+    return buf.getvalue()
+
+
+def _timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("-n", "--count", type=int, default=2000, help="Number of files")
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    args = parser.parse_args()
+
+    frame = _make_frame(args.width, args.height)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        paths = []
+        for i in range(args.count):
+            path = os.path.join(tmpdir, f"frame_{i}.jpg")
+            with open(path, "wb") as fh:
+                fh.write(frame)
+            paths.append(path)
+
+        assert legacy_get_gps(paths[0]) == extract_metadata(paths[0]).gps
+
+        timings = {
+            "pil_getexif": _timed(lambda: [legacy_get_gps(p) for p in paths]),
+            "header_parser": _timed(lambda: [extract_metadata(p) for p in paths]),
+            "header_parser_batch": _timed(lambda: extract_metadata_batch(paths)),
+            "header_parser_bytes": _timed(lambda: [extract_metadata(frame) for _ in paths]),
+        }
+
+    results = {"files": args.count, "frame_bytes": len(frame)}
+    for name, seconds in timings.items():
+        results[f"{name}_files_per_sec"] = round(args.count / seconds, 1)
+    results["speedup_vs_pil"] = round(timings["pil_getexif"] / timings["header_parser"], 2)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
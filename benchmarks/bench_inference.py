@@ -0,0 +1,206 @@
+"""
+Inference Micro-Benchmark
+
+Times the ``YoloDetector`` pipeline stage by stage for every combination of
+batch size, inference resolution, torch thread count and precision mode:
+
+- ``decode``: verify + full decode of the encoded frames (``decode_image``,
+  as ``predict_bytes`` does)
+- ``preprocess``: letterbox resize, HWC -> CHW and normalisation
+- ``forward``: the network
+- ``nms``: non-maximum suppression
+
+Preprocess, forward and NMS come from the per-stage timers that YOLOv5's
+``AutoShape`` records on every call (``Detections.t``, ms per image), so the
+model runs exactly as in the app. Frames are JPEGs made with
+``utils.create_test_image``. Results are printed as JSON together with the
+fastest precision/thread setting per batch size and resolution, to pick
+``torch`` settings per hardware class. ``--torch-profile`` adds the top
+operators per configuration from ``torch.profiler``.
+
+Precision modes: ``fp32``; ``bf16`` (``torch.autocast``, CPU or CUDA);
+``fp16`` (half weights, CUDA only; skipped on CPU).
+
+Needs the model weights (``--model``, default ``MODEL_PATH``) and the
+YOLOv5 hub code, which torch caches after the first load.
+
+Usage:
+    python -m benchmarks.bench_inference [--model PATH] [--batch-sizes 1,4,8] [--sizes 320,640]
+        [--threads 1,2,4] [--precision fp32,bf16] [--frame 1920x1080] [-n 20] [--torch-profile]
+"""
+
+import argparse
+import contextlib
+import itertools
+import json
+import math
+import os
+import platform
+import sys
+import time
+from typing import Dict, List
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+STAGES = ("decode", "preprocess", "forward", "nms")
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(",")]
+
+
+def _frame_size(value: str):
+    width, height = value.lower().split("x")
+    return int(width), int(height)
+
+
+def _stats(values: List[float]) -> Dict:
+    ordered = sorted(values)
+
+    def pct(p):
+        return ordered[max(0, math.ceil(p / 100.0 * len(ordered)) - 1)]
+
+    return {
+        "mean_ms": round(sum(ordered) / len(ordered), 3),
+        "p50_ms": round(pct(50), 3),
+        "p95_ms": round(pct(95), 3),
+    }
+
+
+def _frames(count: int, frame) -> List[bytes]:
+    from utils import create_test_image
+
+    return [create_test_image(size=frame, color=((40 + 13 * i) % 256, 120, 60)).getvalue() for i in range(count)]
+
+
+def _precision_context(precision: str, device: str):
+    import torch
+
+    if precision == "bf16":
+        return torch.autocast(device_type=device, dtype=torch.bfloat16)
+    return contextlib.nullcontext()
+
+
+def run_config(model, frames: List[bytes], size: int, precision: str, device: str, iterations: int, warmup: int,
+               torch_profile: bool) -> Dict:
+    """Time ``iterations`` batched calls; every stage is reported in ms per batch."""
+    from models.yolo_detector import decode_image
+
+    samples = {stage: [] for stage in STAGES}
+    batch = len(frames)
+    for i in range(warmup + iterations):
+        started = time.perf_counter()
+        images = [decode_image(data) for data in frames]
+        decode_ms = (time.perf_counter() - started) * 1000.0
+        with _precision_context(precision, device):
+            results = model(images, size=size)
+        for img in images:
+            img.close()
+        if i < warmup:
+            continue
+        preprocess_ms, forward_ms, nms_ms = (t * batch for t in results.t)
+        for stage, value in zip(STAGES, (decode_ms, preprocess_ms, forward_ms, nms_ms)):
+            samples[stage].append(value)
+
+    stages = {stage: _stats(values) for stage, values in samples.items()}
+    total_ms = sum(stage["mean_ms"] for stage in stages.values())
+    result = {
+        "stages": stages,
+        "total_ms": round(total_ms, 3),
+        "images_per_s": round(batch / total_ms * 1000.0, 2),
+    }
+    if torch_profile:
+        result["top_ops"] = _profile_ops(model, frames, size, precision, device)
+    return result
+
+
+def _profile_ops(model, frames: List[bytes], size: int, precision: str, device: str, top: int = 15) -> List[Dict]:
+    import torch
+    from models.yolo_detector import decode_image
+
+    images = [decode_image(data) for data in frames]
+    with torch.profiler.profile(activities=[torch.profiler.ProfilerActivity.CPU]) as prof:
+        with _precision_context(precision, device):
+            model(images, size=size)
+    events = sorted(prof.key_averages(), key=lambda e: e.self_cpu_time_total, reverse=True)[:top]
+    return [
+        {"op": e.key, "calls": e.count, "self_cpu_ms": round(e.self_cpu_time_total / 1000.0, 3)}
+        for e in events
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--model", default=None, help="Model weights (default: MODEL_PATH)")
+    parser.add_argument("--batch-sizes", type=_int_list, default=[1, 4, 8])
+    parser.add_argument("--sizes", type=_int_list, default=[320, 640], help="Inference resolutions")
+    parser.add_argument("--threads", type=_int_list, default=None,
+                        help="torch.set_num_threads values (default: 1 and all cores)")
+    parser.add_argument("--precision", type=lambda v: v.split(","), default=["fp32", "bf16"])
+    parser.add_argument("--frame", type=_frame_size, default=(1920, 1080), help="Source frame WxH")
+    parser.add_argument("--device", default="cpu", help="cpu or cuda")
+    parser.add_argument("-n", "--iterations", type=int, default=20, help="Timed calls per configuration")
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--torch-profile", action="store_true", help="Add top torch operators per configuration")
+    args = parser.parse_args()
+
+    if os.getenv("SKIP_YOLO") == "1":
+        parser.error("unset SKIP_YOLO: the stub detector has no model to benchmark")
+
+    import torch
+
+    from config import MODEL_PATH
+    from models.yolo_detector import YoloDetector
+
+    try:
+        detector = YoloDetector(args.model or MODEL_PATH)
+    except (FileNotFoundError, RuntimeError) as e:
+        parser.error(str(e))
+    model = detector.model.to(args.device)
+    threads = args.threads or sorted({1, os.cpu_count() or 1})
+
+    results = []
+    for precision, threads_n, batch, size in itertools.product(args.precision, threads, args.batch_sizes, args.sizes):
+        config = {"precision": precision, "threads": threads_n, "batch": batch, "size": size}
+        if precision == "fp16" and args.device == "cpu":
+            results.append({**config, "skipped": "fp16 needs --device cuda"})
+            continue
+        torch.set_num_threads(threads_n)
+        if precision == "fp16":
+            model.half()
+        try:
+            measured = run_config(model, _frames(batch, args.frame), size, precision, args.device,
+                                  args.iterations, args.warmup, args.torch_profile)
+        except RuntimeError as e:  # e.g. bf16 kernels missing on this CPU
+            results.append({**config, "skipped": str(e)})
+            continue
+        finally:
+            if precision == "fp16":
+                model.float()
+        results.append({**config, **measured})
+        print(f"{config} -> {measured['images_per_s']} img/s", file=sys.stderr)
+
+    # Resolution trades accuracy for speed, so settings are ranked per (batch, size)
+    best = {}
+    for result in results:
+        key = (result["batch"], result["size"])
+        if "images_per_s" in result and result["images_per_s"] > best.get(key, {}).get("images_per_s", 0):
+            best[key] = result
+    print(json.dumps({
+        "model": args.model or MODEL_PATH,
+        "torch": torch.__version__,
+        "device": args.device,
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "frame": "x".join(map(str, args.frame)),
+        "results": results,
+        "best": [
+            {key: r[key] for key in ("batch", "size", "precision", "threads", "images_per_s")}
+            for _, r in sorted(best.items())
+        ],
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+List Serialization Benchmark
+
+Compares the legacy ``GET /alerts/`` page build (ORM instances, per-row
+``getattr`` dicts, ``jsonable_encoder`` and the stdlib JSON encoder) with the
+current path (column tuples from ``list_alert_rows`` rendered by
+``FastJSONResponse``) for 100- and 1000-row pages.
+
+Usage:
+    python -m benchmarks.bench_list_serialization [--repeat N]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import create_engine, desc, func, insert, select
+from sqlalchemy.orm import sessionmaker
+
+from database.models import Alert, AlertStatus, Base
+from routes.alerts import list_alert_rows
+from routes.responses import FastJSONResponse
+
+PAGE_SIZES = (100, 1000)
+
+
+def legacy_page(db, limit: int) -> bytes:
+    """The pre-rework page build, kept here as the comparison baseline."""
+    # Same count query as the current path, so both sides pay for it
+    total = db.execute(select(func.count()).select_from(Alert)).scalar_one()
+    items = db.execute(select(Alert).order_by(desc(Alert.timestamp)).limit(limit)).scalars().all()
+    result = []
+    for a in items:
+        st = a.status.name if hasattr(a.status, "name") else str(a.status)
+        ts = a.timestamp if hasattr(a, "timestamp") else getattr(a, "created_at", datetime.utcnow())
+        result.append({
+            "id": a.id,
+            "detection_id": a.detection_id,
+            "timestamp": ts.isoformat(),
+            "status": st,
+            "type": getattr(a, "type", None),
+            "severity": getattr(a, "severity", None),
+            "source": getattr(a, "source", None),
+            "lat": getattr(a, "lat", None),
+            "lng": getattr(a, "lng", None),
+            "zone_label": getattr(a, "zone_label", None),
+            "created_by": getattr(a, "created_by", None),
+        })
+    content = {"alerts": result, "total": total, "timestamp": datetime.utcnow().isoformat()}
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+def current_page(db, limit: int) -> bytes:
+    """The path used by ``get_alerts``."""
+    total, result = list_alert_rows(db, limit, 0)
+    return FastJSONResponse({"alerts": result, "total": total, "timestamp": datetime.utcnow()}).body
+
+
+def _seed(session_factory, count: int) -> None:
+    now = datetime.utcnow()
+    rows = [
+        dict(
+            alert_id=f"RG-{i}", detection_id=str(i), timestamp=now - timedelta(seconds=i),
+            status=AlertStatus.ACTIVE, type="poacher_suspected", severity="high",
+            source="camera_trap", lat=-23.88, lng=31.52, zone_label="North Sector",
+            created_by="bench", updated_at=now,
+        )
+        for i in range(count)
+    ]
+    with session_factory() as db:
+        db.execute(insert(Alert), rows)
+        db.commit()
+
+
+def _time_ms(fn, db, limit: int, repeat: int) -> float:
+    fn(db, limit)  # warm up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        db.expire_all()
+        fn(db, limit)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=50, help="Iterations per measurement")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        engine = create_engine(f"sqlite:///{os.path.join(tmpdir, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        _seed(session_factory, max(PAGE_SIZES))
+
+        results = []
+        with session_factory() as db:
+            for size in PAGE_SIZES:
+                legacy = _time_ms(legacy_page, db, size, args.repeat)
+                current = _time_ms(current_page, db, size, args.repeat)
+                results.append({
+                    "rows": size,
+                    "legacy_ms": round(legacy, 3),
+                    "current_ms": round(current, 3),
+                    "speedup": round(legacy / current, 2),
+                })
+        engine.dispose()
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Alert Rules Benchmark
+
+Measures detections/second through rule evaluation, comparing a linear scan
+of every rule per detection with the (class, zone) index used by
+``RuleEngine``. Both paths keep the same repeat-count and cooldown state and
+must fire the same alerts.
+
+Usage:
+    python -m benchmarks.bench_rules [-n DETECTIONS] [--rules COUNT]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.alert_rules import AlertRule, RuleEngine
+
+CLASSES = ["rhino", "elephant", "person", "vehicle", "buffalo", "lion", "leopard", "giraffe"]
+
+
+def make_rules(count: int, zones: list, rng: random.Random) -> list:
+    rules = []
+    for i in range(count):
+        rules.append(AlertRule.from_dict({
+            "name": f"rule-{i}",
+            "classes": [rng.choice(CLASSES)] if rng.random() < 0.95 else None,
+            "zones": rng.sample(zones, rng.randint(1, 3)) if rng.random() < 0.9 else None,
+            "min_confidence": round(rng.uniform(0.5, 0.9), 2),
+            "hours": ["18:00", "06:00"] if rng.random() < 0.3 else None,
+            "min_count": rng.choice([1, 1, 2, 3]),
+            "window_seconds": 600,
+            "cooldown_seconds": rng.choice([0, 300, 1800]),
+        }))
+    return rules
+
+
+def make_detections(count: int, zones: list, rng: random.Random) -> list:
+    start = datetime(2026, 3, 1)
+    return [
+        SimpleNamespace(
+            id=i, class_name=rng.choice(CLASSES), confidence=rng.random(),
+            zone_label=rng.choice(zones), timestamp=start + timedelta(seconds=i * 2),
+        )
+        for i in range(count)
+    ]
+
+
+class LinearEngine:
+    """Every rule checked for every detection, with the same window semantics."""
+
+    def __init__(self, rules):
+        self.rules = rules
+        self.windows = {}
+        self.last_fired = {}
+
+    def evaluate(self, detection):
+        ts = detection.timestamp
+        minute = ts.hour * 60 + ts.minute
+        fired = []
+        for rule in self.rules:
+            if rule.classes is not None and detection.class_name not in rule.classes:
+                continue
+            if rule.zones is not None and detection.zone_label not in rule.zones:
+                continue
+            if detection.confidence < rule.min_confidence or not rule.in_hours(minute):
+                continue
+            key = (rule.name, detection.zone_label)
+            last = self.last_fired.get(key)
+            if last is not None and (ts - last).total_seconds() < rule.cooldown_seconds:
+                continue
+            if rule.min_count > 1:
+                window = self.windows.setdefault(key, deque())
+                window.append(ts)
+                while (ts - window[0]).total_seconds() > rule.window_seconds:
+                    window.popleft()
+                if len(window) < rule.min_count:
+                    continue
+                window.clear()
+            self.last_fired[key] = ts
+            fired.append(rule)
+        return fired
+
+
+def run(engine, detections) -> tuple:
+    evaluate = engine.evaluate
+    started = time.perf_counter()
+    fired = sum(len(evaluate(d)) for d in detections)
+    return len(detections) / (time.perf_counter() - started), fired
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("-n", type=int, default=50_000, help="Detections to evaluate")
+    parser.add_argument("--rules", type=int, default=500, help="Rules in the rule set")
+    parser.add_argument("--zones", type=int, default=40, help="Distinct zone labels")
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    zones = [f"Zone {i}" for i in range(args.zones)]
+    rules = make_rules(args.rules, zones, rng)
+    detections = make_detections(args.n, zones, rng)
+
+    linear_rate, linear_fired = run(LinearEngine(rules), detections)
+    indexed_rate, indexed_fired = run(RuleEngine(rules), detections)
+    if linear_fired != indexed_fired:
+        raise SystemExit(f"Alert mismatch: linear={linear_fired} indexed={indexed_fired}")
+
+    print(json.dumps({
+        "detections": args.n,
+        "rules": args.rules,
+        "alerts_fired": indexed_fired,
+        "linear_detections_per_s": round(linear_rate),
+        "indexed_detections_per_s": round(indexed_rate),
+        "speedup": round(indexed_rate / linear_rate, 1),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
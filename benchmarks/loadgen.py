@@ -0,0 +1,418 @@
+"""
+Traffic Replay Load Generator
+
+Replays a camera-trap traffic profile against the API, either in-process
+(ASGI app on a temporary SQLite database, stub detector) or over HTTP
+against a running deployment, and reports latency and queueing per traffic
+kind for capacity planning.
+
+A profile is either synthetic (JSON with ``streams`` that are expanded into
+timed requests) or recorded (JSONL, one ``{"t", "method", "path", ...}``
+request per line, e.g. converted from access logs). Synthetic stream kinds:
+
+- ``camera_burst``: each of ``cameras`` camera traps sends ``burst_size``
+  frames every ``burst_every_s`` seconds (with ``jitter_s``), e.g. nightly
+  motion-triggered bursts
+- ``drone_sweep``: ``images`` large frames at ``rate_per_s`` from ``start_s``
+- ``dashboard``: ``clients`` dashboards polling ``paths`` every ``interval_s``
+
+Requests are sent open-loop at their scheduled times (scaled by ``--speed``)
+whether or not earlier ones finished, so overload shows up as queueing
+rather than as a slower send rate. ``--max-in-flight`` caps concurrent
+requests like a client connection pool; time spent waiting for a slot is
+reported as dispatch lag. Every ``--sample-interval`` the generator records
+requests in flight and the server's inference queue depth (from
+``/metrics``). The report counts HTTP error responses (``errors``)
+separately from requests that got no response at all (``failed``, by
+exception type), so client-side problems are not mistaken for server errors.
+
+Upload payloads come from ``utils.create_test_image``: a pool of
+``--image-pool`` distinct frames per size, generated before the run so the
+client does not compete with the server for CPU. Uploads without a ``frame``
+size, as in most recorded profiles, send 1920x1080 frames.
+
+Usage:
+    python -m benchmarks.loadgen benchmarks/traffic/camera_trap_night.json [--speed 2]
+    python -m benchmarks.loadgen recorded.jsonl --url http://localhost:8000 --max-in-flight 32
+    python -m benchmarks.loadgen profile.json --seed-detections 100000 --seed-alerts 5000 -o report.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_api import AUTH, BenchDetector, percentile  # noqa: E402
+
+# Default area for synthetic GPS positions: lat_min, lat_max, lng_min, lng_max
+DEFAULT_AREA = (-24.5, -23.5, 31.0, 32.0)
+# Frame size for uploads whose event does not name one (e.g. recorded requests)
+DEFAULT_FRAME = (1920, 1080)
+
+
+def load_profile(path: str) -> Dict:
+    """Read a synthetic (JSON) or recorded (JSONL) profile."""
+    with open(path) as fh:
+        if path.endswith(".jsonl"):
+            events = [json.loads(line) for line in fh if line.strip()]
+            return {"name": os.path.basename(path), "events": events}
+        return json.load(fh)
+
+
+def expand_profile(profile: Dict) -> List[Dict]:
+    """Timed request events of a profile, sorted by ``t`` (seconds from start)."""
+    if "events" in profile:
+        return sorted(({"kind": "recorded", **event} for event in profile["events"]), key=lambda e: e["t"])
+
+    rng = random.Random(profile.get("seed", 0))
+    duration = float(profile["duration_s"])
+    area = profile.get("area", DEFAULT_AREA)
+    events: List[Dict] = []
+
+    def position():
+        return round(rng.uniform(area[0], area[1]), 6), round(rng.uniform(area[2], area[3]), 6)
+
+    for stream in profile["streams"]:
+        kind = stream["kind"]
+        if kind == "camera_burst":
+            for camera in range(stream["cameras"]):
+                camera_id = f"{stream.get('prefix', 'cam')}-{camera:03d}"
+                lat, lng = position()
+                t = rng.uniform(0, stream["burst_every_s"])
+                while t < duration:
+                    for frame in range(stream["burst_size"]):
+                        events.append({
+                            "t": t + frame * stream.get("frame_gap_s", 0.2), "kind": kind, "method": "POST",
+                            "path": "/upload/", "frame": stream.get("frame", DEFAULT_FRAME),
+                            "camera_id": camera_id, "lat": lat, "lng": lng,
+                        })
+                    t += stream["burst_every_s"] + rng.uniform(-1, 1) * stream.get("jitter_s", 0)
+        elif kind == "drone_sweep":
+            start = stream.get("start_s", 0.0)
+            for i in range(stream["images"]):
+                lat, lng = position()
+                events.append({
+                    "t": start + i / stream["rate_per_s"], "kind": kind, "method": "POST", "path": "/upload/",
+                    "frame": stream.get("frame", [4000, 3000]), "camera_id": stream.get("camera_id", "drone"),
+                    "lat": lat, "lng": lng,
+                })
+        elif kind == "dashboard":
+            for client in range(stream["clients"]):
+                t = rng.uniform(0, stream["interval_s"])
+                while t < duration:
+                    for path in stream["paths"]:
+                        events.append({"t": t, "kind": kind, "method": "GET", "path": path})
+                    t += stream["interval_s"]
+        else:
+            raise ValueError(f"Unknown stream kind: {kind}")
+    return sorted((e for e in events if e["t"] < duration), key=lambda e: e["t"])
+
+
+def is_upload(event: Dict) -> bool:
+    """Whether an event posts a frame to the upload endpoint."""
+    return event["method"] == "POST" and event["path"].startswith("/upload")
+
+
+def frame_of(event: Dict) -> tuple:
+    """Frame size uploaded by an event."""
+    return tuple(event.get("frame", DEFAULT_FRAME))
+
+
+class ImagePool:
+    """Pre-encoded JPEG frames per size, handed out round-robin."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self._frames: Dict[tuple, List[bytes]] = {}
+        self._next: Dict[tuple, int] = defaultdict(int)
+
+    def prepare(self, events: List[Dict]) -> None:
+        from utils import create_test_image
+
+        for frame in {frame_of(e) for e in events if is_upload(e)}:
+            self._frames[frame] = [
+                create_test_image(size=frame, color=(i * 37 % 256, i * 91 % 256, 80)).getvalue()
+                for i in range(self.size)
+            ]
+
+    def get(self, frame: tuple) -> bytes:
+        index = self._next[frame]
+        self._next[frame] = index + 1
+        return self._frames[frame][index % self.size]
+
+
+def seed_database(session_factory, detections: int, alerts: int, area=DEFAULT_AREA, seed: int = 0) -> None:
+    """Fill the database with history so dashboards and listings query realistic tables."""
+    from sqlalchemy import insert
+
+    from database.bulk_import import insert_rows
+    from database.models import Alert, AlertStatus
+    from database.rollups import record_detections
+
+    rng = random.Random(seed)
+    start = datetime.utcnow() - timedelta(days=30)
+    classes = ("rhino", "rhino", "elephant", "person", "vehicle")
+    batch = 10_000
+    with session_factory() as db:
+        connection = db.connection()
+        for first in range(0, detections, batch):
+            rows = []
+            for _ in range(first, min(first + batch, detections)):
+                rows.append({
+                    "timestamp": start + timedelta(seconds=rng.uniform(0, 30 * 86400)),
+                    "class_name": rng.choice(classes), "confidence": round(rng.uniform(0.3, 0.99), 3),
+                    "gps_lat": rng.uniform(area[0], area[1]), "gps_lng": rng.uniform(area[2], area[3]),
+                    "zone_label": None, "camera_id": f"seed-{rng.randrange(50):03d}", "image_path": "seed",
+                    "box_x1": 10.0, "box_y1": 10.0, "box_x2": 200.0, "box_y2": 150.0,
+                })
+            insert_rows(connection, rows)
+            record_detections(connection, (
+                (r["timestamp"], r["class_name"], None, r["confidence"], r["gps_lat"], r["gps_lng"]) for r in rows
+            ))
+        alert_rows = [
+            {
+                "alert_id": f"seed-{i}", "detection_id": str(i), "timestamp": start + timedelta(minutes=i),
+                "status": AlertStatus.ACTIVE, "type": "rhino_sighting", "severity": "high", "source": "camera_trap",
+                "lat": -23.9, "lng": 31.5, "created_by": "loadgen",
+            }
+            for i in range(alerts)
+        ]
+        for first in range(0, len(alert_rows), batch):
+            db.execute(insert(Alert), alert_rows[first:first + batch])
+        db.commit()
+
+
+def _queue_depth(metrics_text: str) -> Optional[float]:
+    for line in metrics_text.splitlines():
+        if line.startswith("rhinoguardians_inference_queue_depth "):
+            return float(line.split()[1])
+    return None
+
+
+async def replay(client, events: List[Dict], images: ImagePool, speed: float, max_in_flight: int,
+                 sample_interval: float) -> Dict:
+    """Send every event at its scheduled time and collect per-request and sampled results."""
+    slots = asyncio.Semaphore(max_in_flight)
+    records: List[Dict] = []
+    samples: List[Dict] = []
+    in_flight = 0
+    done = asyncio.Event()
+    started = time.perf_counter()
+
+    async def send(event: Dict, scheduled: float) -> None:
+        nonlocal in_flight
+        status, failure = None, None
+        async with slots:
+            dispatched = time.perf_counter()
+            in_flight += 1
+            try:
+                if is_upload(event):
+                    data = {"camera_id": event.get("camera_id")}
+                    if event.get("lat") is not None:
+                        data.update(gps_lat=str(event["lat"]), gps_lng=str(event["lng"]))
+                    response = await client.post(event["path"], data=data, files={
+                        "file": ("frame.jpg", images.get(frame_of(event)), "image/jpeg")
+                    })
+                elif event["method"] == "POST":
+                    response = await client.post(event["path"], json=event.get("json"), headers=AUTH)
+                else:
+                    response = await client.request(event["method"], event["path"])
+                status = response.status_code
+            except Exception as exc:  # no response: connection error, timeout or client-side bug
+                failure = type(exc).__name__
+            finally:
+                in_flight -= 1
+        finished = time.perf_counter()
+        records.append({
+            "kind": event["kind"], "status": status, "failure": failure, "scheduled": scheduled - started,
+            "lag": dispatched - scheduled, "latency": finished - dispatched, "finished": finished - started,
+        })
+
+    async def sample() -> None:
+        while not done.is_set():
+            depth = None
+            try:
+                depth = _queue_depth((await client.get("/metrics")).text)
+            except Exception:
+                pass
+            samples.append({"t": time.perf_counter() - started, "in_flight": in_flight, "inference_queue": depth})
+            try:
+                await asyncio.wait_for(done.wait(), sample_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    sampler = asyncio.create_task(sample())
+    tasks = []
+    for event in events:
+        scheduled = started + event["t"] / speed
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(send(event, scheduled)))
+    await asyncio.gather(*tasks)
+    done.set()
+    await sampler
+    return {"records": records, "samples": samples, "elapsed": time.perf_counter() - started}
+
+
+def _ms(values: List[float], pct: float) -> float:
+    return round(percentile(sorted(values), pct) * 1000.0, 3) if values else None
+
+
+def _http_errors(rows: List[Dict]) -> int:
+    return sum(r["status"] is not None and r["status"] >= 400 for r in rows)
+
+
+def _failures(rows: List[Dict]) -> Dict[str, int]:
+    counts: Dict[str, int] = defaultdict(int)
+    for r in rows:
+        if r["failure"] is not None:
+            counts[r["failure"]] += 1
+    return dict(sorted(counts.items()))
+
+
+def build_report(result: Dict) -> Dict:
+    """
+    Summarise a replay per traffic kind and per second.
+
+    ``errors`` counts HTTP error responses; ``failed`` counts requests that
+    got no response at all, broken down by exception type in ``failures``.
+    """
+    records, samples, elapsed = result["records"], result["samples"], result["elapsed"]
+    by_kind = defaultdict(list)
+    for record in records:
+        by_kind[record["kind"]].append(record)
+
+    kinds = {}
+    for kind, rows in sorted(by_kind.items()):
+        latencies = [r["latency"] for r in rows]
+        lags = [r["lag"] for r in rows]
+        kinds[kind] = {
+            "requests": len(rows),
+            "errors": _http_errors(rows),
+            "failed": sum(_failures(rows).values()),
+            "req_per_s": round(len(rows) / elapsed, 2),
+            "p50_ms": _ms(latencies, 50),
+            "p95_ms": _ms(latencies, 95),
+            "p99_ms": _ms(latencies, 99),
+            "max_ms": round(max(latencies) * 1000.0, 3),
+            "dispatch_lag_p95_ms": _ms(lags, 95),
+            "dispatch_lag_max_ms": round(max(lags) * 1000.0, 3),
+        }
+
+    timeline = defaultdict(lambda: {"scheduled": 0, "completed": 0, "in_flight_max": 0, "inference_queue_max": None})
+    for record in records:
+        timeline[int(record["scheduled"])]["scheduled"] += 1
+        timeline[int(record["finished"])]["completed"] += 1
+    for sample in samples:
+        second = timeline[int(sample["t"])]
+        second["in_flight_max"] = max(second["in_flight_max"], sample["in_flight"])
+        if sample["inference_queue"] is not None:
+            second["inference_queue_max"] = max(second["inference_queue_max"] or 0, sample["inference_queue"])
+
+    latencies = [r["latency"] for r in records]
+    return {
+        "requests": len(records),
+        "errors": _http_errors(records),
+        "failed": sum(_failures(records).values()),
+        "failures": _failures(records),
+        "elapsed_s": round(elapsed, 3),
+        "p95_ms": _ms(latencies, 95),
+        "in_flight_max": max((s["in_flight"] for s in samples), default=0),
+        "inference_queue_max": max((s["inference_queue"] or 0 for s in samples), default=0),
+        "by_kind": kinds,
+        "timeline": [{"second": s, **timeline[s]} for s in sorted(timeline)],
+    }
+
+
+async def run(args, profile: Dict) -> Dict:
+    import httpx
+
+    events = expand_profile(profile)
+    images = ImagePool(args.image_pool)
+    images.prepare(events)
+
+    if args.url:
+        if args.db_url and (args.seed_detections or args.seed_alerts):
+            from sqlalchemy import create_engine
+            from sqlalchemy.orm import sessionmaker
+
+            seed_database(sessionmaker(bind=create_engine(args.db_url)), args.seed_detections, args.seed_alerts)
+        limits = httpx.Limits(max_connections=args.max_in_flight)
+        client = httpx.AsyncClient(base_url=args.url, limits=limits, timeout=args.timeout)
+    else:
+        from database.db import SessionLocal, engine
+        from database.models import Base
+        from main import app, warm_up
+        from routes.api import upload_detector
+
+        Base.metadata.create_all(bind=engine)
+        if args.detector == "stub":
+            app.dependency_overrides[upload_detector] = BenchDetector
+        warm_up()
+        seed_database(SessionLocal, args.seed_detections, args.seed_alerts)
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://loadgen",
+                                   timeout=args.timeout)
+
+    async with client:
+        result = await replay(client, events, images, args.speed, args.max_in_flight, args.sample_interval)
+    return {
+        "profile": profile.get("name"),
+        "target": args.url or "in-process",
+        "speed": args.speed,
+        "max_in_flight": args.max_in_flight,
+        **build_report(result),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("profile", help="Synthetic profile (.json) or recorded requests (.jsonl)")
+    parser.add_argument("--url", default=None, help="Target base URL (default: in-process app)")
+    parser.add_argument("--db-url", default=None, help="With --url: database to seed")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay speed multiplier")
+    parser.add_argument("--max-in-flight", type=int, default=64, help="Concurrent request cap")
+    parser.add_argument("--sample-interval", type=float, default=0.25, help="Seconds between queue samples")
+    parser.add_argument("--image-pool", type=int, default=16, help="Distinct frames per size")
+    parser.add_argument("--seed-detections", type=int, default=0, help="Historical detections to insert first")
+    parser.add_argument("--seed-alerts", type=int, default=0, help="Alerts to insert first")
+    parser.add_argument("--detector", choices=("stub", "model"), default="stub", help="In-process detector")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Per-request timeout in seconds")
+    parser.add_argument("-o", "--output", default=None, help="Write the report here instead of stdout")
+    args = parser.parse_args()
+
+    tmpdir = None
+    if not args.url:
+        tmpdir = tempfile.TemporaryDirectory()
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmpdir.name, 'loadgen.db')}"
+        for name in ("IMAGE_STORAGE_DIR", "THUMBNAIL_CACHE_DIR", "PROFILE_DIR"):
+            os.environ[name] = os.path.join(tmpdir.name, name.lower())
+        os.environ.setdefault("GEOFENCE_PATH", os.path.join(tmpdir.name, "zones.geojson"))
+        os.environ.setdefault("ALERT_RULES_PATH", os.path.join(tmpdir.name, "alert_rules.json"))
+        if args.detector == "stub":
+            os.environ["SKIP_YOLO"] = "1"
+    logging.disable(logging.INFO)
+
+    report = asyncio.run(run(args, load_profile(args.profile)))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as fh:
+            fh.write(text + "\n")
+    else:
+        print(text)
+    if tmpdir is not None:
+        tmpdir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -12,14 +12,76 @@ Environment Variables:
     PORT: Server port number
     SMS_API_KEY: API key for SMS notifications
     EMAIL_FROM: Sender email for notifications
+    RETENTION_DAYS: Age in days after which rows are archived
+    RETENTION_BATCH_SIZE: Rows moved per archival transaction
+    ARCHIVE_DIR: Directory for compressed archive partitions
+    IMAGE_STORAGE_BACKEND: Image store backend ('local' or 's3')
+    IMAGE_STORAGE_DIR: Root directory for the local image store
+    S3_BUCKET, S3_PREFIX, S3_ENDPOINT_URL: S3-compatible image store settings
+    IMAGE_COLD_STORAGE_DIR: Directory for compressed cold images (empty = off)
+    IMAGE_COLD_AFTER_DAYS: Age after which images move to the cold tier
+    IMAGE_GC_GRACE_SECONDS: Minimum age before unreferenced images are deleted
+    THUMBNAIL_CACHE_DIR: Directory for the thumbnail/crop disk cache
+    THUMBNAIL_CACHE_MAX_BYTES: Size cap of the thumbnail cache
+    GEOFENCE_PATH: GeoJSON file with park zone polygons
+    GEOFENCE_RELOAD_SECONDS: Interval between checks for an edited zone file
+    ALERT_RULES_PATH: JSON file with automatic alert rules
+    TRACK_IOU_THRESHOLD: Minimum box IoU to continue a track
+    TRACK_MAX_GAP_SECONDS: Time after which an unseen track is closed
+    TRACK_MAX_CENTROID_DISTANCE: Fallback match radius (fraction of box diagonal)
+    TRACK_STORE: Detections written per track ('best' or 'all')
+    ROLLUP_CELL_DEGREES: Heatmap grid cell size in degrees
+    HEALTH_CACHE_SECONDS: How long a readiness probe result is reused
+    HEALTH_MAX_INFERENCE_QUEUE: Inference queue depth above which the service is not ready
+    HEALTH_MAX_NOTIFICATION_BACKLOG: Pending notifications above which the service is not ready
+    PROFILING_ENABLED: Install the request profiling middleware (True/False)
+    PROFILE_SAMPLE_RATE: Fraction of requests profiled without the X-Profile header
+    PROFILE_INTERVAL_MS: Stack sampling interval of the profiler
+    PROFILE_DIR: Directory for request profiles
+    PROFILE_MAX_FILES: Number of profiles kept
+    PROFILE_TOKEN: Bearer token required by the /profiles endpoints (unset = no access)
+    WEB_CONCURRENCY: Web worker processes sharing the host's CPUs
+    TORCH_INTRA_OP_THREADS: torch threads per operator (0 = CPU share per worker)
+    TORCH_INTER_OP_THREADS: torch threads across operators (0 = 1)
+    INFERENCE_POOL_SIZE: Concurrent model calls per worker (0 = derived from the CPU plan)
+    INFERENCE_WEIGHT_REALTIME, INFERENCE_WEIGHT_NORMAL, INFERENCE_WEIGHT_BACKFILL: Inference share per priority
+    INFERENCE_DEADLINE_REALTIME, INFERENCE_DEADLINE_NORMAL, INFERENCE_DEADLINE_BACKFILL:
+        Seconds an upload may wait for inference per priority (0 = no deadline)
+    INFERENCE_STARVATION_SECONDS: Wait after which an upload is run first whatever its priority
+    INFERENCE_CLIENT_PRIORITIES: Default priority per X-Client-Id ('client=priority,...')
+    MOTION_GATE_ENABLED: Skip or crop inference for frames without motion (True/False)
+    MOTION_GATE_WIDTH: Width of the downscaled frame compared with the background
+    MOTION_GATE_PIXEL_THRESHOLD: Grey-level difference marking a pixel changed
+    MOTION_GATE_CELL_FRACTION: Share of changed pixels marking an 8x8 cell changed
+    MOTION_GATE_ALPHA: Background learning rate per frame
+    MOTION_GATE_REFRESH_FRAMES: Skipped frames after which one is inferred anyway
+    MOTION_GATE_MAX_REGION_FRACTION: Changed area above which the full frame is inferred
 """
 
 import os
-from typing import Any, Dict
-from dotenv import load_dotenv
+from typing import Any, Dict, Optional
 
-# Load environment variables from .env file
-load_dotenv()
+
+def _find_env_file() -> Optional[str]:
+    """Nearest .env in this file's directory or its parents (as python-dotenv looks)."""
+    directory = os.path.dirname(os.path.abspath(__file__))
+    while True:
+        candidate = os.path.join(directory, '.env')
+        if os.path.isfile(candidate):
+            return candidate
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return None
+        directory = parent
+
+
+# Load environment variables from .env file; python-dotenv is only imported
+# when there is one
+_ENV_FILE = _find_env_file()
+if _ENV_FILE:
+    from dotenv import load_dotenv
+
+    load_dotenv(_ENV_FILE)
 
 
 def get_env_value(key: str, default: Any = None, required: bool = False) -> Any:
@@ -67,4 +129,78 @@ EMAIL_FROM = get_env_value(
     'EMAIL_FROM',
     'alerts@rhinoguardians.ai',
     required=True
-)
\ No newline at end of file
+)
+
+# Data retention configuration
+RETENTION_DAYS = int(get_env_value('RETENTION_DAYS', '90'))
+RETENTION_BATCH_SIZE = int(get_env_value('RETENTION_BATCH_SIZE', '500'))
+ARCHIVE_DIR = get_env_value('ARCHIVE_DIR', './archive')
+
+# Image storage configuration
+IMAGE_STORAGE_BACKEND = get_env_value('IMAGE_STORAGE_BACKEND', 'local')  # 'local' or 's3'
+IMAGE_STORAGE_DIR = get_env_value('IMAGE_STORAGE_DIR', './data/images')
+S3_BUCKET = get_env_value('S3_BUCKET', '')
+S3_PREFIX = get_env_value('S3_PREFIX', 'images')
+S3_ENDPOINT_URL = get_env_value('S3_ENDPOINT_URL', '')
+# Cold tier is disabled unless a directory is configured
+IMAGE_COLD_STORAGE_DIR = get_env_value('IMAGE_COLD_STORAGE_DIR', '')
+IMAGE_COLD_AFTER_DAYS = int(get_env_value('IMAGE_COLD_AFTER_DAYS', '30'))
+IMAGE_GC_GRACE_SECONDS = int(get_env_value('IMAGE_GC_GRACE_SECONDS', '86400'))
+
+# Thumbnail cache configuration
+THUMBNAIL_CACHE_DIR = get_env_value('THUMBNAIL_CACHE_DIR', './data/thumbnails')
+THUMBNAIL_CACHE_MAX_BYTES = int(get_env_value('THUMBNAIL_CACHE_MAX_BYTES', str(512 * 1024 * 1024)))
+
+# Geofence configuration
+GEOFENCE_PATH = get_env_value('GEOFENCE_PATH', './data/zones.geojson')
+GEOFENCE_RELOAD_SECONDS = float(get_env_value('GEOFENCE_RELOAD_SECONDS', '5'))
+
+# Alert rules configuration
+ALERT_RULES_PATH = get_env_value('ALERT_RULES_PATH', './data/alert_rules.json')
+
+# Tracking configuration
+TRACK_IOU_THRESHOLD = float(get_env_value('TRACK_IOU_THRESHOLD', '0.3'))
+TRACK_MAX_GAP_SECONDS = float(get_env_value('TRACK_MAX_GAP_SECONDS', '60'))
+TRACK_MAX_CENTROID_DISTANCE = float(get_env_value('TRACK_MAX_CENTROID_DISTANCE', '0.5'))
+TRACK_STORE = get_env_value('TRACK_STORE', 'best')  # 'best' or 'all'
+
+# Statistics rollup configuration
+ROLLUP_CELL_DEGREES = float(get_env_value('ROLLUP_CELL_DEGREES', '0.01'))
+
+# Health probe configuration
+HEALTH_CACHE_SECONDS = float(get_env_value('HEALTH_CACHE_SECONDS', '2'))
+HEALTH_MAX_INFERENCE_QUEUE = int(get_env_value('HEALTH_MAX_INFERENCE_QUEUE', '32'))
+HEALTH_MAX_NOTIFICATION_BACKLOG = int(get_env_value('HEALTH_MAX_NOTIFICATION_BACKLOG', '100'))
+
+# Request profiling configuration (off unless enabled)
+PROFILING_ENABLED = get_env_value('PROFILING_ENABLED', 'False').lower() == 'true'
+PROFILE_SAMPLE_RATE = float(get_env_value('PROFILE_SAMPLE_RATE', '0'))
+PROFILE_INTERVAL_MS = float(get_env_value('PROFILE_INTERVAL_MS', '1'))
+PROFILE_DIR = get_env_value('PROFILE_DIR', './data/profiles')
+PROFILE_MAX_FILES = int(get_env_value('PROFILE_MAX_FILES', '50'))
+PROFILE_TOKEN = get_env_value('PROFILE_TOKEN', '')
+
+# CPU thread planning (0 = derived from the CPU budget, see utils.cpu_planner)
+WEB_CONCURRENCY = int(get_env_value('WEB_CONCURRENCY', '1'))
+TORCH_INTRA_OP_THREADS = int(get_env_value('TORCH_INTRA_OP_THREADS', '0'))
+TORCH_INTER_OP_THREADS = int(get_env_value('TORCH_INTER_OP_THREADS', '0'))
+INFERENCE_POOL_SIZE = int(get_env_value('INFERENCE_POOL_SIZE', '0'))
+
+# Inference priority scheduling (see utils.inference_scheduler)
+INFERENCE_WEIGHT_REALTIME = float(get_env_value('INFERENCE_WEIGHT_REALTIME', '8'))
+INFERENCE_WEIGHT_NORMAL = float(get_env_value('INFERENCE_WEIGHT_NORMAL', '4'))
+INFERENCE_WEIGHT_BACKFILL = float(get_env_value('INFERENCE_WEIGHT_BACKFILL', '1'))
+INFERENCE_DEADLINE_REALTIME = float(get_env_value('INFERENCE_DEADLINE_REALTIME', '5'))
+INFERENCE_DEADLINE_NORMAL = float(get_env_value('INFERENCE_DEADLINE_NORMAL', '120'))
+INFERENCE_DEADLINE_BACKFILL = float(get_env_value('INFERENCE_DEADLINE_BACKFILL', '0'))
+INFERENCE_STARVATION_SECONDS = float(get_env_value('INFERENCE_STARVATION_SECONDS', '60'))
+INFERENCE_CLIENT_PRIORITIES = get_env_value('INFERENCE_CLIENT_PRIORITIES', '')
+
+# Motion gating (off unless enabled, see utils.motion_gate)
+MOTION_GATE_ENABLED = get_env_value('MOTION_GATE_ENABLED', 'False').lower() == 'true'
+MOTION_GATE_WIDTH = int(get_env_value('MOTION_GATE_WIDTH', '160'))
+MOTION_GATE_PIXEL_THRESHOLD = float(get_env_value('MOTION_GATE_PIXEL_THRESHOLD', '25'))
+MOTION_GATE_CELL_FRACTION = float(get_env_value('MOTION_GATE_CELL_FRACTION', '0.25'))
+MOTION_GATE_ALPHA = float(get_env_value('MOTION_GATE_ALPHA', '0.05'))
+MOTION_GATE_REFRESH_FRAMES = int(get_env_value('MOTION_GATE_REFRESH_FRAMES', '30'))
+MOTION_GATE_MAX_REGION_FRACTION = float(get_env_value('MOTION_GATE_MAX_REGION_FRACTION', '0.5'))
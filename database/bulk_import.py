@@ -0,0 +1,386 @@
+"""
+Bulk Import Module
+
+Loads historical detections (e.g. when onboarding a new reserve) from CSV or
+JSONL files, optionally gzip-compressed, without going through the ORM unit
+of work.
+
+The input is read in chunks. Each chunk is validated column-wise with NumPy
+masks; rejected rows go to a ``.rejects.jsonl`` file with their line number
+and reason. Valid rows are written in one transaction per chunk: with
+PostgreSQL + psycopg2 through ``COPY FROM STDIN``, elsewhere through
+multi-row ``INSERT ... VALUES`` statements. Rows without a zone label are
+labelled in bulk from the geofence. The same transaction also updates the
+stats rollups and the table version.
+
+The input offset is saved to ``import_checkpoints`` in the same
+transaction as each chunk, so an interrupted import resumes exactly after
+the last committed chunk.
+``--defer-indexes`` drops the secondary indexes on ``detections`` for the
+duration of the import and rebuilds them at the end; use it for large loads
+while nothing else writes to the table. Historical rows do not go through
+tracking or alert rules.
+
+Input columns (header row for CSV, keys for JSONL): ``timestamp``,
+``class_name``, ``confidence`` (required); ``gps_lat``, ``gps_lng``,
+``zone_label``, ``camera_id``, ``image_path``, ``box_x1`` .. ``box_y2``
+(optional).
+
+Usage:
+    python -m database.bulk_import detections.csv.gz [--chunk-size N] [--defer-indexes]
+"""
+
+import argparse
+import csv
+import gzip
+import io
+import json
+import logging
+import os
+import sys
+import time
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from sqlalchemy import delete, insert
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from database.models import Detection, ImportCheckpoint
+from database.rollups import record_detections
+from database.versions import bump_table_versions
+from utils.geofence import get_geofence
+
+logger = logging.getLogger(__name__)
+
+IMPORT_CHUNK_SIZE = 20_000
+# Rows per INSERT ... VALUES statement; keeps SQLite under its bound-parameter limit
+VALUES_BATCH_SIZE = 1_000
+
+FLOAT_COLUMNS = ("confidence", "gps_lat", "gps_lng", "box_x1", "box_y1", "box_x2", "box_y2")
+TEXT_COLUMNS = ("class_name", "zone_label", "camera_id", "image_path")
+IMPORT_COLUMNS = ("timestamp",) + TEXT_COLUMNS + FLOAT_COLUMNS
+
+
+def _open_text(path: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", newline="")
+    return open(path, "r", encoding="utf-8", newline="")
+
+
+def read_records(path: str) -> Iterator[Dict]:
+    """Yield raw records from a CSV or JSONL file (format from the suffix)."""
+    is_jsonl = path.removesuffix(".gz").endswith((".jsonl", ".ndjson"))
+    with _open_text(path) as fh:
+        if is_jsonl:
+            for line in fh:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    record = None
+                yield record if isinstance(record, dict) else {"_error": "unparsable record"}
+        else:
+            yield from csv.DictReader(fh)
+
+
+def _parse_floats(values: List) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Float array (NaN where missing or unparsable) and a 'value present' mask.
+
+    The whole column is converted by NumPy in one call; only a column that
+    contains an unparsable value is parsed element by element.
+    """
+    column = np.array(values, dtype=object)
+    present = (column != None) & (column != "")  # noqa: E711  (element-wise)
+    parsed = np.full(len(values), np.nan)
+    try:
+        parsed[present] = column[present].astype(str).astype(np.float64)
+    except ValueError:
+        for i in np.flatnonzero(present):
+            try:
+                parsed[i] = float(column[i])
+            except (TypeError, ValueError):
+                pass
+    return parsed, present
+
+
+def _parse_timestamp(value) -> Optional[datetime]:
+    try:
+        ts = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except (TypeError, ValueError):
+        return None
+    if ts.tzinfo is not None:
+        ts = (ts - ts.utcoffset()).replace(tzinfo=None)
+    return ts
+
+
+def _parse_timestamps(values: List) -> List[Optional[datetime]]:
+    """
+    ISO 8601 strings to naive UTC datetimes; None where unparsable.
+
+    Timestamps without a UTC offset (the usual export format) are parsed by
+    NumPy in one call; values with an offset, and chunks where NumPy fails,
+    go through ``datetime.fromisoformat`` one by one.
+    """
+    text = np.array(["" if v is None else str(v) for v in values])
+    if not len(text):
+        return []
+    naive = (
+        (np.char.str_len(text) >= 10)
+        & (np.char.find(text, "+") < 0)
+        & (np.char.rfind(text, "-") < 10)
+        & ~np.char.endswith(text, "Z")
+    )
+    out = np.full(len(text), None, dtype=object)
+    try:
+        out[naive] = text[naive].astype("datetime64[us]").astype(object)
+    except ValueError:
+        naive[:] = False
+    for i in np.flatnonzero(~naive):
+        out[i] = _parse_timestamp(values[i])
+    return out.tolist()
+
+
+def validate_chunk(records: List[Dict]) -> Tuple[List[Dict], List[Tuple[int, str]]]:
+    """
+    Validate a chunk of raw records.
+
+    Numeric and timestamp columns are parsed once into arrays and every rule
+    is evaluated as a mask over the whole chunk.
+
+    Returns:
+        tuple: (valid rows ready for insert, [(index in chunk, reason)] for rejects)
+    """
+    n = len(records)
+    floats = {name: _parse_floats([r.get(name) for r in records]) for name in FLOAT_COLUMNS}
+    timestamps = _parse_timestamps([r.get("timestamp") for r in records])
+    classes = np.array([bool(str(r.get("class_name") or "").strip()) for r in records], dtype=bool)
+
+    conf, conf_present = floats["confidence"]
+    lat, lat_present = floats["gps_lat"]
+    lng, lng_present = floats["gps_lng"]
+    with np.errstate(invalid="ignore"):
+        checks = [
+            (np.array(["_error" in r for r in records], dtype=bool), "unparsable record"),
+            (np.array([ts is None for ts in timestamps], dtype=bool), "invalid timestamp"),
+            (~classes, "missing class_name"),
+            (~conf_present | np.isnan(conf) | (conf < 0) | (conf > 1), "confidence must be in [0, 1]"),
+            (lat_present != lng_present, "gps_lat and gps_lng must be given together"),
+            (lat_present & (np.isnan(lat) | (np.abs(lat) > 90)), "gps_lat out of range"),
+            (lng_present & (np.isnan(lng) | (np.abs(lng) > 180)), "gps_lng out of range"),
+        ]
+        for name in ("box_x1", "box_y1", "box_x2", "box_y2"):
+            values, present = floats[name]
+            checks.append((present & np.isnan(values), f"{name} is not a number"))
+
+    failed = np.zeros(n, dtype=bool)
+    reasons: Dict[int, str] = {}
+    for mask, reason in checks:
+        for i in np.flatnonzero(mask & ~failed):
+            reasons[int(i)] = reason
+        failed |= mask
+
+    rows = []
+    for i in np.flatnonzero(~failed):
+        record = records[i]
+        row = {"timestamp": timestamps[i]}
+        for name in TEXT_COLUMNS:
+            value = record.get(name)
+            row[name] = str(value).strip() if value not in (None, "") else None
+        row["image_path"] = row["image_path"] or ""
+        for name in FLOAT_COLUMNS:
+            value = floats[name][0][i]
+            row[name] = None if np.isnan(value) else float(value)
+        rows.append(row)
+    return rows, sorted(reasons.items())
+
+
+def _copy_rows(connection: Connection, rows: List[Dict]) -> bool:
+    """COPY rows into detections via psycopg2; False if COPY is unavailable."""
+    if connection.dialect.name != "postgresql":
+        return False
+    cursor = connection.connection.driver_connection.cursor()
+    if not hasattr(cursor, "copy_expert"):
+        return False
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    for row in rows:
+        writer.writerow(["" if row[c] is None else (row[c].isoformat() if c == "timestamp" else row[c])
+                         for c in IMPORT_COLUMNS])
+    buf.seek(0)
+    # CSV COPY reads empty unquoted fields as NULL; image_path is NOT NULL and
+    # stores a missing path as the empty string, as the VALUES path does
+    cursor.copy_expert(
+        f"COPY detections ({', '.join(IMPORT_COLUMNS)}) FROM STDIN "
+        f"WITH (FORMAT csv, FORCE_NOT_NULL (image_path))", buf
+    )
+    return True
+
+
+def insert_rows(connection: Connection, rows: List[Dict]) -> None:
+    """Write validated rows with COPY where possible, else batched multi-row INSERTs."""
+    if not rows or _copy_rows(connection, rows):
+        return
+    table = Detection.__table__
+    for i in range(0, len(rows), VALUES_BATCH_SIZE):
+        connection.execute(insert(table).values(rows[i:i + VALUES_BATCH_SIZE]))
+
+
+def _label_zones(rows: List[Dict]) -> None:
+    missing = [row for row in rows if row["zone_label"] is None and row["gps_lat"] is not None]
+    if missing:
+        labels = get_geofence().lookup_many((row["gps_lat"], row["gps_lng"]) for row in missing)
+        for row, label in zip(missing, labels):
+            row["zone_label"] = label
+
+
+def _load_checkpoint(db: Session, path: str) -> Dict:
+    """Progress of an earlier run over ``path``; a fresh state if there is none."""
+    stat = os.stat(path)
+    state = {"offset": 0, "inserted": 0, "rejected": 0, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    checkpoint = db.get(ImportCheckpoint, os.path.abspath(path))
+    if checkpoint is None:
+        return state
+    if checkpoint.size != stat.st_size or checkpoint.mtime_ns != stat.st_mtime_ns:
+        raise ValueError(
+            f"{path} changed since its import was checkpointed; "
+            f"delete its row from {ImportCheckpoint.__tablename__} to restart"
+        )
+    state.update(offset=checkpoint.offset, inserted=checkpoint.inserted, rejected=checkpoint.rejected)
+    return state
+
+
+def _trim_rejects(rejects_path: Path, offset: int) -> None:
+    """Drop rejects of records past ``offset`` (written by a chunk that was not committed)."""
+    if offset == 0:
+        rejects_path.unlink(missing_ok=True)
+        return
+    if not rejects_path.exists():
+        return
+    with open(rejects_path, encoding="utf-8") as fh:
+        kept = [line for line in fh if json.loads(line)["record"] <= offset]
+    tmp = rejects_path.with_name(rejects_path.name + ".tmp")
+    tmp.write_text("".join(kept), encoding="utf-8")
+    os.replace(tmp, rejects_path)
+
+
+def _secondary_indexes():
+    return [index for index in Detection.__table__.indexes if not index.unique]
+
+
+def import_file(
+    session_factory: Callable[[], Session],
+    path: str,
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+    defer_indexes: bool = False,
+    max_chunks: Optional[int] = None,
+) -> Dict:
+    """
+    Import detections from ``path``, resuming from its checkpoint row if present.
+
+    Args:
+        session_factory: Creates one session per chunk
+        path: CSV or JSONL input, optionally ``.gz``
+        chunk_size: Records validated and committed together
+        defer_indexes: Drop secondary indexes during the import
+        max_chunks: Stop after this many chunks (the checkpoint is kept)
+
+    Returns:
+        dict: Totals for this file (``inserted``, ``rejected``, ``offset``),
+        plus ``rows_per_s`` for this run and ``complete``
+    """
+    source = os.path.abspath(path)
+    with session_factory() as db:
+        bind = db.get_bind()
+        state = _load_checkpoint(db, path)
+    records = read_records(path)
+    for _ in islice(records, state["offset"]):
+        pass
+
+    rejects_path = Path(path + ".rejects.jsonl")
+    _trim_rejects(rejects_path, state["offset"])
+    started, inserted_now, chunks = time.perf_counter(), 0, 0
+    complete = False
+
+    if defer_indexes:
+        for index in _secondary_indexes():
+            index.drop(bind, checkfirst=True)
+    try:
+        while max_chunks is None or chunks < max_chunks:
+            chunk = list(islice(records, chunk_size))
+            if not chunk:
+                complete = True
+                break
+            rows, rejects = validate_chunk(chunk)
+            _label_zones(rows)
+            # Rejects are written first: if the commit below does not happen
+            # the next run trims them back to its checkpoint
+            if rejects:
+                with open(rejects_path, "a", encoding="utf-8") as fh:
+                    for index, reason in rejects:
+                        fh.write(json.dumps({"record": state["offset"] + index + 1, "reason": reason}) + "\n")
+            with session_factory() as db:
+                connection = db.connection()
+                insert_rows(connection, rows)
+                record_detections(connection, (
+                    (r["timestamp"], r["class_name"], r["zone_label"], r["confidence"], r["gps_lat"], r["gps_lng"])
+                    for r in rows
+                ))
+                if rows:
+                    bump_table_versions(connection, [Detection.__tablename__])
+                state["offset"] += len(chunk)
+                state["inserted"] += len(rows)
+                state["rejected"] += len(rejects)
+                # The checkpoint commits with the chunk, so a crash never replays committed rows
+                db.merge(ImportCheckpoint(source=source, **state))
+                db.commit()
+
+            inserted_now += len(rows)
+            chunks += 1
+            logger.info(
+                "%s: %d records done, %d inserted, %d rejected (%.0f rows/s)",
+                path, state["offset"], state["inserted"], state["rejected"],
+                inserted_now / (time.perf_counter() - started),
+            )
+    finally:
+        if defer_indexes:
+            for index in _secondary_indexes():
+                index.create(bind, checkfirst=True)
+
+    elapsed = time.perf_counter() - started
+    if complete:
+        with session_factory() as db:
+            db.execute(delete(ImportCheckpoint).where(ImportCheckpoint.source == source))
+            db.commit()
+    return {
+        "inserted": state["inserted"],
+        "rejected": state["rejected"],
+        "offset": state["offset"],
+        "seconds": round(elapsed, 3),
+        "rows_per_s": round(inserted_now / elapsed) if elapsed > 0 else None,
+        "complete": complete,
+    }
+
+
+def main() -> None:
+    from database.db import SessionLocal
+
+    parser = argparse.ArgumentParser(description="RhinoGuardians bulk detection import")
+    parser.add_argument("paths", nargs="+", help="CSV or JSONL files (optionally .gz)")
+    parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+    parser.add_argument("--defer-indexes", action="store_true",
+                        help="Drop secondary indexes during the import and rebuild them afterwards")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    for path in args.paths:
+        print(json.dumps({"file": path, **import_file(SessionLocal, path, args.chunk_size, args.defer_indexes)}))
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,8 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config import DATABASE_URL
 from database.models import Base
+import database.versions  # noqa: F401  (registers table-version listeners)
+import database.rollups  # noqa: F401  (registers detection rollup listeners)
 
 
 def get_engine():
@@ -0,0 +1,219 @@
+"""
+Bulk Export Module
+
+Exports the ``detections`` and ``alerts`` tables as Parquet, Arrow IPC
+stream or gzip-compressed CSV. Rows are read with a server-side cursor
+(``yield_per``) in fixed-size chunks and each chunk is encoded and handed to
+the output before the next one is fetched, so memory stays flat regardless
+of the export size. The same generator backs the ``/export`` endpoint and
+the CLI.
+
+Parquet and Arrow output need ``pyarrow`` (imported lazily); CSV works
+without it.
+
+Usage:
+    python -m database.export detections --format parquet -o detections.parquet \\
+        [--class-name rhino] [--date-from 2025-01-01] [--date-to 2025-04-01]
+    python -m database.export alerts --format csv.gz -o alerts.csv.gz [--status ACTIVE]
+"""
+
+import argparse
+import csv
+import gzip
+import io
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from typing import BinaryIO, Callable, Iterator, List, Sequence
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import DateTime, Enum, Float, Integer, String, select, type_coerce
+from sqlalchemy.orm import Session
+
+from database.models import Alert, Detection
+
+EXPORT_MODELS = {Detection.__tablename__: Detection, Alert.__tablename__: Alert}
+EXPORT_CHUNK_SIZE = 10_000
+
+# format -> (media type, file extension)
+EXPORT_FORMATS = {
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows"),
+    "csv.gz": ("application/gzip", "csv.gz"),
+}
+
+
+def export_columns(model) -> list:
+    """All columns of ``model``'s table, with enums read as their stored names."""
+    return [
+        type_coerce(column, String).label(column.name) if isinstance(column.type, Enum) else column
+        for column in model.__table__.columns
+    ]
+
+
+def _arrow_schema(model):
+    import pyarrow as pa
+
+    fields = []
+    for column in model.__table__.columns:
+        if isinstance(column.type, Integer):
+            kind = pa.int64()
+        elif isinstance(column.type, Float):
+            kind = pa.float64()
+        elif isinstance(column.type, DateTime):
+            kind = pa.timestamp("us")
+        else:
+            kind = pa.string()
+        fields.append(pa.field(column.name, kind, nullable=column.nullable and not column.primary_key))
+    return pa.schema(fields)
+
+
+class _Buffer(io.RawIOBase):
+    """Write-only sink whose contents are drained after every chunk."""
+
+    def __init__(self):
+        self._parts: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._parts.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data, self._parts = b"".join(self._parts), []
+        return data
+
+
+def _fetch_chunks(db: Session, model, conditions: Sequence, chunk_size: int) -> Iterator[list]:
+    result = db.execute(
+        select(*export_columns(model))
+        .where(*conditions)
+        .order_by(model.__table__.c.id)
+        .execution_options(yield_per=chunk_size)
+    )
+    for partition in result.partitions():
+        yield partition
+
+
+def iter_export(
+    db: Session,
+    table_name: str,
+    fmt: str,
+    conditions: Sequence = (),
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+) -> Iterator[bytes]:
+    """
+    Yield the encoded export of ``table_name`` piece by piece, one piece per
+    chunk of rows plus the format's header/footer.
+
+    Args:
+        db: Session to read from
+        table_name: ``detections`` or ``alerts``
+        fmt: One of ``EXPORT_FORMATS``
+        conditions: WHERE conditions (e.g. from ``detection_filters``)
+        chunk_size: Rows fetched and encoded at a time
+    """
+    model = EXPORT_MODELS[table_name]
+    names = [column.name for column in model.__table__.columns]
+    sink = _Buffer()
+    chunks = _fetch_chunks(db, model, conditions, chunk_size)
+
+    if fmt == "csv.gz":
+        with gzip.GzipFile(fileobj=sink, mode="wb", compresslevel=6) as gz:
+            text = io.StringIO()
+            writer = csv.writer(text)
+            writer.writerow(names)
+            gz.write(text.getvalue().encode("utf-8"))
+            text.seek(0)
+            text.truncate()
+            for rows in chunks:
+                writer.writerows(
+                    [v.isoformat() if isinstance(v, datetime) else v for v in row] for row in rows
+                )
+                gz.write(text.getvalue().encode("utf-8"))
+                text.seek(0)
+                text.truncate()
+                yield sink.drain()
+        yield sink.drain()
+        return
+
+    import pyarrow as pa
+
+    schema = _arrow_schema(model)
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    else:
+        writer = pa.ipc.new_stream(sink, schema)
+    with writer:
+        for rows in chunks:
+            columns = list(zip(*rows))
+            writer.write_batch(pa.RecordBatch.from_arrays(
+                [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+                schema=schema,
+            ))
+            yield sink.drain()
+    yield sink.drain()
+
+
+def export_to_file(
+    session_factory: Callable[[], Session],
+    table_name: str,
+    fmt: str,
+    out: BinaryIO,
+    conditions: Sequence = (),
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+) -> int:
+    """Write an export to a binary file object. Returns bytes written."""
+    written = 0
+    with session_factory() as db:
+        for piece in iter_export(db, table_name, fmt, conditions, chunk_size):
+            out.write(piece)
+            written += len(piece)
+    return written
+
+
+def main() -> None:
+    from database.db import SessionLocal
+    from routes.alerts import alert_filters
+    from routes.api import detection_filters
+
+    parser = argparse.ArgumentParser(description="RhinoGuardians bulk export")
+    parser.add_argument("table", choices=sorted(EXPORT_MODELS))
+    parser.add_argument("--format", choices=sorted(EXPORT_FORMATS), default="parquet")
+    parser.add_argument("-o", "--output", required=True, help="Output file ('-' for stdout)")
+    parser.add_argument("--chunk-size", type=int, default=EXPORT_CHUNK_SIZE)
+    parser.add_argument("--class-name", help="detections: only this class")
+    parser.add_argument("--date-from", type=datetime.fromisoformat, help="detections: from this time")
+    parser.add_argument("--date-to", type=datetime.fromisoformat, help="detections: up to this time")
+    parser.add_argument("--status", help="alerts: only this status")
+    args = parser.parse_args()
+
+    if args.table == Detection.__tablename__:
+        conditions = detection_filters(args.class_name, args.date_from, args.date_to)
+    else:
+        conditions = alert_filters(args.status)
+
+    started = time.perf_counter()
+    if args.output == "-":
+        written = export_to_file(SessionLocal, args.table, args.format, sys.stdout.buffer, conditions, args.chunk_size)
+    else:
+        with open(args.output, "wb") as out:
+            written = export_to_file(SessionLocal, args.table, args.format, out, conditions, args.chunk_size)
+    print(json.dumps({"bytes": written, "seconds": round(time.perf_counter() - started, 3)}), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,7 +5,7 @@ This module defines the SQLAlchemy ORM models for the RhinoGuardians application
 It includes models for storing detection results and their associated metadata.
 """
 
-from sqlalchemy import Column, Integer, String, Float, DateTime, Enum, ForeignKey
+from sqlalchemy import BigInteger, Column, Integer, String, Float, DateTime, Enum, ForeignKey, Index
 from sqlalchemy.orm import DeclarativeBase, relationship
 from datetime import datetime
 import enum
@@ -38,6 +38,13 @@ class Detection(Base):
         image_path (str): Path to the stored image
         gps_lat (float): GPS latitude of detection
         gps_lng (float): GPS longitude of detection
+        image_sha256 (str): Content hash of the image in the image store
+        box_x1, box_y1, box_x2, box_y2 (float): Bounding box in image pixels
+        gps_source (str): Where the coordinates came from ('form' or 'exif')
+        metadata_ms (float): Time spent extracting EXIF metadata, in ms
+        zone_label (str): Park zone containing the detection
+        camera_id (str): Camera that captured the frame
+        track_id (int): Track this detection belongs to
     """
     __tablename__ = 'detections'
     
@@ -58,6 +65,28 @@ class Detection(Base):
                      comment='GPS latitude of the detection')
     gps_lng = Column(Float, nullable=True,
                      comment='GPS longitude of the detection')
+    image_sha256 = Column(String(64), nullable=True, index=True,
+                          comment='Content hash of the image in the image store')
+    box_x1 = Column(Float, nullable=True,
+                    comment='Bounding box left edge in image pixels')
+    box_y1 = Column(Float, nullable=True,
+                    comment='Bounding box top edge in image pixels')
+    box_x2 = Column(Float, nullable=True,
+                    comment='Bounding box right edge in image pixels')
+    box_y2 = Column(Float, nullable=True,
+                    comment='Bounding box bottom edge in image pixels')
+    gps_source = Column(String(8), nullable=True,
+                        comment="Where the coordinates came from: 'form' or 'exif'")
+    metadata_ms = Column(Float, nullable=True,
+                         comment='EXIF extraction latency in milliseconds')
+    zone_label = Column(String, nullable=True, index=True,
+                        comment='Park zone containing the detection')
+    camera_id = Column(String, nullable=True, index=True,
+                       comment='Camera that captured the frame')
+    track_id = Column(Integer, ForeignKey('tracks.id', ondelete='SET NULL'), nullable=True, index=True,
+                      comment='Track linking this detection across frames')
+
+    track = relationship("Track")
 
 
 class Alert(Base):
@@ -78,7 +107,8 @@ class Alert(Base):
         zone_label (str): Label of the zone where alert was triggered
         created_by (str): Operator who created the alert
         notification_sent (bool): Whether notification was sent
-        notification_timestamp (datetime): When notification was sent
+        notification_timestamp (datetime): When notification was last attempted
+            (NULL while the notification is pending)
         message (str): Alert message/description
     """
     __tablename__ = "alerts"
@@ -118,3 +148,165 @@ class Alert(Base):
                     comment='Alert message or description')
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow,
                        comment='When the alert was last updated')
+
+    # Relationship with the triggering detection
+    detection = relationship("Detection", back_populates="alerts")
+
+
+class TableVersion(Base):
+    """
+    Change counter per table, used to build ETags for list endpoints.
+
+    Attributes:
+        table_name (str): Name of the tracked table (primary key)
+        version (int): Monotonic counter bumped on every insert/update/delete
+        updated_at (datetime): When the counter was last bumped
+    """
+    __tablename__ = "table_versions"
+
+    table_name = Column(String, primary_key=True,
+                        comment='Name of the tracked table')
+    version = Column(Integer, nullable=False, default=0,
+                     comment='Monotonic change counter for the table')
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow,
+                        comment='When the counter was last bumped')
+
+
+class StoredImage(Base):
+    """
+    Content-addressed image blob tracked by the image store.
+
+    Attributes:
+        sha256 (str): Hex SHA-256 of the image bytes (primary key)
+        size (int): Size of the image in bytes
+        content_type (str): MIME type reported at upload
+        ref_count (int): Number of detections referencing the image
+        tier (str): Storage tier holding the blob ('hot' or 'cold')
+        created_at (datetime): When the blob was first stored
+        updated_at (datetime): Last upload or reference change
+    """
+    __tablename__ = "images"
+
+    sha256 = Column(String(64), primary_key=True,
+                    comment='Hex SHA-256 of the image bytes')
+    size = Column(Integer, nullable=False,
+                  comment='Size of the image in bytes')
+    content_type = Column(String, nullable=True,
+                          comment='MIME type reported at upload')
+    ref_count = Column(Integer, nullable=False, default=0,
+                       comment='Number of detections referencing the image')
+    tier = Column(String, nullable=False, default='hot',
+                  comment="Storage tier holding the blob ('hot' or 'cold')")
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow,
+                        comment='When the blob was first stored')
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow,
+                        comment='Last upload or reference change')
+
+
+class Track(Base):
+    """
+    An object followed across consecutive frames of one camera.
+
+    Attributes:
+        id (int): Primary key
+        camera_id (str): Camera the track was seen on
+        class_name (str): Detected class
+        first_seen (datetime): Timestamp of the first frame
+        last_seen (datetime): Timestamp of the latest frame
+        best_confidence (float): Highest confidence seen on the track
+        best_detection_id (int): Stored detection with that confidence
+        detection_count (int): Frames linked to the track
+        box_x1, box_y1, box_x2, box_y2 (float): Latest bounding box
+        zone_label (str): Zone of the latest frame
+    """
+    __tablename__ = "tracks"
+
+    id = Column(Integer, primary_key=True, index=True)
+    camera_id = Column(String, nullable=False,
+                       comment='Camera the track was seen on')
+    class_name = Column(String, nullable=False,
+                        comment='Detected class')
+    first_seen = Column(DateTime, nullable=False,
+                        comment='Timestamp of the first frame')
+    last_seen = Column(DateTime, nullable=False,
+                       comment='Timestamp of the latest frame')
+    best_confidence = Column(Float, nullable=False, default=0.0,
+                             comment='Highest confidence seen on the track')
+    best_detection_id = Column(Integer, nullable=True,
+                               comment='Stored detection with the best confidence')
+    detection_count = Column(Integer, nullable=False, default=0,
+                             comment='Frames linked to the track')
+    box_x1 = Column(Float, nullable=False, comment='Latest bounding box left edge')
+    box_y1 = Column(Float, nullable=False, comment='Latest bounding box top edge')
+    box_x2 = Column(Float, nullable=False, comment='Latest bounding box right edge')
+    box_y2 = Column(Float, nullable=False, comment='Latest bounding box bottom edge')
+    zone_label = Column(String, nullable=True,
+                        comment='Zone of the latest frame')
+
+    __table_args__ = (Index('ix_tracks_camera_last_seen', 'camera_id', 'last_seen'),)
+
+
+class DetectionCountRollup(Base):
+    """
+    Detections per hour, class and zone, maintained as detections are written.
+
+    Attributes:
+        bucket (datetime): Start of the hour (UTC)
+        class_name (str): Detected class
+        zone_label (str): Zone label, '' for detections outside every zone
+        count (int): Number of detections
+        confidence_sum (float): Sum of their confidences
+    """
+    __tablename__ = "detection_counts_hourly"
+
+    bucket = Column(DateTime, primary_key=True, comment='Start of the hour (UTC)')
+    class_name = Column(String, primary_key=True, comment='Detected class')
+    zone_label = Column(String, primary_key=True, default='',
+                        comment="Zone label, '' when outside every zone")
+    count = Column(Integer, nullable=False, default=0, comment='Number of detections')
+    confidence_sum = Column(Float, nullable=False, default=0.0, comment='Sum of confidences')
+
+
+class DetectionCellRollup(Base):
+    """
+    Detections per hour, class and lat/lng grid cell, for heatmaps.
+
+    Attributes:
+        bucket (datetime): Start of the hour (UTC)
+        class_name (str): Detected class
+        cell_x (int): ``floor(lng / ROLLUP_CELL_DEGREES)``
+        cell_y (int): ``floor(lat / ROLLUP_CELL_DEGREES)``
+        count (int): Number of detections
+    """
+    __tablename__ = "detection_cells_hourly"
+
+    bucket = Column(DateTime, primary_key=True, comment='Start of the hour (UTC)')
+    class_name = Column(String, primary_key=True, comment='Detected class')
+    cell_x = Column(Integer, primary_key=True, comment='Longitude grid index')
+    cell_y = Column(Integer, primary_key=True, comment='Latitude grid index')
+    count = Column(Integer, nullable=False, default=0, comment='Number of detections')
+
+
+class ImportCheckpoint(Base):
+    """
+    Progress of a bulk import, committed in the same transaction as each chunk.
+
+    Attributes:
+        source (str): Absolute path of the imported file
+        size (int): File size when the import started
+        mtime_ns (int): File modification time when the import started
+        offset (int): Records consumed (inserted or rejected)
+        inserted (int): Rows inserted so far
+        rejected (int): Records rejected so far
+        updated_at (datetime): When the last chunk was committed
+    """
+    __tablename__ = "import_checkpoints"
+
+    source = Column(String, primary_key=True, comment='Absolute path of the imported file')
+    size = Column(BigInteger, nullable=False, comment='File size when the import started')
+    mtime_ns = Column(BigInteger, nullable=False, comment='File modification time when the import started')
+    offset = Column(Integer, nullable=False, default=0, comment='Records consumed')
+    inserted = Column(Integer, nullable=False, default=0, comment='Rows inserted so far')
+    rejected = Column(Integer, nullable=False, default=0, comment='Records rejected so far')
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow,
+                        comment='When the last chunk was committed')
@@ -0,0 +1,331 @@
+"""
+Data Retention Module
+
+Moves old ``detections`` and ``alerts`` rows out of the hot tables into
+gzip-compressed JSONL archive files partitioned by month, releases their
+image-store references so unreferenced images can be garbage collected, and
+restores archived time ranges on demand.
+
+Archival runs in small batches, each in its own short transaction, so the hot
+tables are never locked for long. A batch is written and fsynced to its
+archive file before the rows are deleted, and the file is removed again if
+the delete fails, so a crash never loses rows.
+
+Archive layout::
+
+    <ARCHIVE_DIR>/<table>/<YYYY-MM>/<first_id>-<last_id>-<nonce>.jsonl.gz
+
+The random nonce keeps a batch from replacing an older file with the same id
+range, e.g. rows restored and archived again while other rows of their
+original file are still archived.
+
+Usage:
+    python -m database.retention archive [--days N] [--batch-size N]
+    python -m database.retention restore --table alerts --start 2025-01-01 --end 2025-02-01
+    python -m database.retention sweep-images [--grace-seconds N]
+    python -m database.retention cold-images [--days N]
+"""
+
+import argparse
+import enum
+import gzip
+import json
+import logging
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import DateTime, String, cast, delete, exists, insert, select
+from sqlalchemy.orm import Session
+
+from config import ARCHIVE_DIR, IMAGE_GC_GRACE_SECONDS, RETENTION_BATCH_SIZE, RETENTION_DAYS
+from database.models import Alert, Detection
+from storage.image_store import acquire_refs, get_image_store, release_refs
+
+logger = logging.getLogger(__name__)
+
+# Archivable models by table name; alerts go first so detections can follow
+ARCHIVED_MODELS = {Alert.__tablename__: Alert, Detection.__tablename__: Detection}
+
+
+def _encode(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.name
+    return value
+
+
+def _decode_row(table, record: Dict) -> Dict:
+    row = {}
+    for column in table.columns:
+        value = record.get(column.name)
+        if value is not None and isinstance(column.type, DateTime):
+            value = datetime.fromisoformat(value)
+        row[column.name] = value
+    return row
+
+
+def _write_jsonl_gz(path: Path, records: List[Dict]) -> None:
+    """Atomically write records to ``path`` (temp file, fsync, rename)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as raw:
+        with gzip.GzipFile(fileobj=raw, mode="wb") as gz:
+            for record in records:
+                gz.write(json.dumps(record, separators=(",", ":")).encode("utf-8") + b"\n")
+        raw.flush()
+        os.fsync(raw.fileno())
+    os.replace(tmp, path)
+
+
+def _read_jsonl_gz(path: Path) -> Iterator[Dict]:
+    with gzip.open(path, "rt", encoding="utf-8") as fh:
+        for line in fh:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _archivable(model, cutoff: datetime) -> list:
+    conditions = [model.timestamp < cutoff]
+    if model is Detection:
+        # Keep detections that still have live alerts; deleting them would cascade
+        conditions.append(~exists().where(Alert.detection_id == cast(Detection.id, String)))
+    return conditions
+
+
+def archive_batch(
+    db: Session,
+    model,
+    cutoff: datetime,
+    archive_dir: str = ARCHIVE_DIR,
+    batch_size: int = RETENTION_BATCH_SIZE,
+) -> int:
+    """
+    Archive and delete one batch of rows older than ``cutoff``.
+
+    Args:
+        db: Session for this batch; committed on success
+        model: ``Alert`` or ``Detection``
+        cutoff: Rows with ``timestamp`` before this are archived
+        archive_dir: Root directory for archive partitions
+        batch_size: Maximum rows moved by this call
+
+    Returns:
+        int: Number of rows archived (0 when nothing is left)
+    """
+    table = model.__table__
+    rows = db.execute(
+        select(table).where(*_archivable(model, cutoff)).order_by(table.c.id).limit(batch_size)
+    ).mappings().all()
+    if not rows:
+        return 0
+
+    partitions: Dict[str, List[Dict]] = {}
+    for row in rows:
+        record = {key: _encode(value) for key, value in row.items()}
+        partitions.setdefault(row["timestamp"].strftime("%Y-%m"), []).append(record)
+
+    written = []
+    try:
+        for month, records in partitions.items():
+            name = f"{records[0]['id']}-{records[-1]['id']}-{uuid.uuid4().hex[:12]}.jsonl.gz"
+            path = Path(archive_dir) / table.name / month / name
+            _write_jsonl_gz(path, records)
+            written.append(path)
+
+        db.execute(
+            delete(model)
+            .where(table.c.id.in_([row["id"] for row in rows]))
+            .execution_options(synchronize_session=False)
+        )
+        if model is Detection:
+            release_refs(db, (row["image_sha256"] for row in rows))
+        db.commit()
+    except Exception:
+        db.rollback()
+        for path in written:
+            path.unlink(missing_ok=True)
+        raise
+    return len(rows)
+
+
+def archive_old_rows(
+    session_factory: Callable[[], Session],
+    days: int = RETENTION_DAYS,
+    archive_dir: str = ARCHIVE_DIR,
+    batch_size: int = RETENTION_BATCH_SIZE,
+    max_batches: Optional[int] = None,
+    pause: float = 0.0,
+    now: Optional[datetime] = None,
+) -> Dict[str, int]:
+    """
+    Archive every alert and detection older than ``days``, batch by batch.
+
+    Each batch runs in a fresh session so locks are held only briefly.
+    ``max_batches`` bounds the work done per table in one call, which makes
+    the job safe to run incrementally from a scheduler; ``pause`` sleeps
+    between batches to leave room for the live workload.
+
+    Returns:
+        dict: Rows archived per table
+    """
+    cutoff = (now or datetime.utcnow()) - timedelta(days=days)
+    totals = {}
+    for name, model in ARCHIVED_MODELS.items():
+        totals[name] = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            with session_factory() as db:
+                moved = archive_batch(db, model, cutoff, archive_dir, batch_size)
+            if not moved:
+                break
+            totals[name] += moved
+            batches += 1
+            if pause:
+                time.sleep(pause)
+        logger.info("Archived %d %s rows older than %s", totals[name], name, cutoff.isoformat())
+    return totals
+
+
+def iter_archived(
+    table_name: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    archive_dir: str = ARCHIVE_DIR,
+) -> Iterator[Dict]:
+    """
+    Yield archived rows of ``table_name`` with ``start <= timestamp < end``.
+
+    Rows are decoded to column values as they would be stored in the table.
+    Either bound may be omitted to read the whole archive on that side.
+    """
+    table = ARCHIVED_MODELS[table_name].__table__
+    root = Path(archive_dir) / table_name
+    if not root.exists():
+        return
+    first_month = start.strftime("%Y-%m") if start is not None else None
+    last_month = end.strftime("%Y-%m") if end is not None else None
+    for month_dir in sorted(p for p in root.iterdir() if p.is_dir()):
+        if first_month is not None and month_dir.name < first_month:
+            continue
+        if last_month is not None and month_dir.name > last_month:
+            continue
+        for path in sorted(month_dir.glob("*.jsonl.gz")):
+            for record in _read_jsonl_gz(path):
+                row = _decode_row(table, record)
+                if (start is None or row["timestamp"] >= start) and (end is None or row["timestamp"] < end):
+                    yield row
+
+
+def restore_range(
+    session_factory: Callable[[], Session],
+    table_name: str,
+    start: datetime,
+    end: datetime,
+    archive_dir: str = ARCHIVE_DIR,
+    batch_size: int = RETENTION_BATCH_SIZE,
+) -> int:
+    """
+    Move archived rows with ``start <= timestamp < end`` back into ``table_name``.
+
+    Rows whose id already exists in the table are skipped and stay archived.
+    Restored rows are removed from their archive files once the insert has
+    been committed.
+    Restored detections take their image references back, but an image that
+    was garbage collected in the meantime stays gone.
+
+    Returns:
+        int: Number of rows restored
+    """
+    model = ARCHIVED_MODELS[table_name]
+    table = model.__table__
+    root = Path(archive_dir) / table_name
+    if not root.exists():
+        return 0
+
+    restored = 0
+    first_month, last_month = start.strftime("%Y-%m"), end.strftime("%Y-%m")
+    for month_dir in sorted(p for p in root.iterdir() if p.is_dir()):
+        if not first_month <= month_dir.name <= last_month:
+            continue
+        for path in sorted(month_dir.glob("*.jsonl.gz")):
+            records = list(_read_jsonl_gz(path))
+            wanted, kept = [], []
+            for record in records:
+                ts = datetime.fromisoformat(record["timestamp"])
+                (wanted if start <= ts < end else kept).append(record)
+            if not wanted:
+                continue
+
+            with session_factory() as db:
+                ids = [record["id"] for record in wanted]
+                existing = set(db.execute(select(table.c.id).where(table.c.id.in_(ids))).scalars())
+                rows = [_decode_row(table, r) for r in wanted if r["id"] not in existing]
+                kept.extend(r for r in wanted if r["id"] in existing)
+                for i in range(0, len(rows), batch_size):
+                    db.execute(insert(model), rows[i:i + batch_size])
+                if model is Detection:
+                    acquire_refs(db, (row["image_sha256"] for row in rows))
+                db.commit()
+            restored += len(rows)
+
+            if kept:
+                _write_jsonl_gz(path, kept)
+            else:
+                path.unlink()
+    logger.info("Restored %d %s rows in [%s, %s)", restored, table_name, start, end)
+    return restored
+
+
+def main() -> None:
+    from database.db import SessionLocal
+
+    parser = argparse.ArgumentParser(description="RhinoGuardians data retention")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    archive = sub.add_parser("archive", help="Archive rows older than the retention age")
+    archive.add_argument("--days", type=int, default=RETENTION_DAYS)
+    archive.add_argument("--batch-size", type=int, default=RETENTION_BATCH_SIZE)
+    archive.add_argument("--max-batches", type=int, default=None)
+    archive.add_argument("--pause", type=float, default=0.0, help="Seconds to sleep between batches")
+
+    restore = sub.add_parser("restore", help="Restore an archived time range")
+    restore.add_argument("--table", choices=sorted(ARCHIVED_MODELS), required=True)
+    restore.add_argument("--start", type=datetime.fromisoformat, required=True)
+    restore.add_argument("--end", type=datetime.fromisoformat, required=True)
+
+    sweep = sub.add_parser("sweep-images", help="Delete images no detection references")
+    sweep.add_argument("--grace-seconds", type=int, default=IMAGE_GC_GRACE_SECONDS)
+
+    cold = sub.add_parser("cold-images", help="Compress old images into the cold tier")
+    cold.add_argument("--days", type=int, default=None)
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    if args.command == "archive":
+        print(json.dumps(archive_old_rows(
+            SessionLocal, args.days, batch_size=args.batch_size,
+            max_batches=args.max_batches, pause=args.pause,
+        )))
+    elif args.command == "restore":
+        print(json.dumps({args.table: restore_range(SessionLocal, args.table, args.start, args.end)}))
+    elif args.command == "sweep-images":
+        with SessionLocal() as db:
+            removed = get_image_store().collect_garbage(db, grace_seconds=args.grace_seconds)
+        print(json.dumps({"removed": removed}))
+    else:
+        with SessionLocal() as db:
+            kwargs = {} if args.days is None else {"older_than_days": args.days}
+            print(json.dumps({"moved": get_image_store().move_to_cold(db, **kwargs)}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""
+Detection Rollups Module
+
+Maintains hourly rollups of detections so dashboard statistics never scan
+the ``detections`` table:
+
+- ``detection_counts_hourly``: count and confidence sum per hour, class and zone
+- ``detection_cells_hourly``: count per hour, class and lat/lng grid cell
+
+Rollups are incremented in the same transaction as every ORM insert of a
+``Detection`` (session ``after_flush``), using an upsert where the backend
+supports one. Writers that bypass the unit of work (bulk ``insert()``
+statements) call ``record_detections`` themselves. Archiving old detections
+does not decrement the rollups, so statistics keep covering archived history.
+
+Contention: rollup rows are locked by the writing transaction until it
+commits, so concurrent uploads of the same class in the same hour (and zone
+or grid cell) serialize on those rows for the rest of their transaction.
+Rows are always upserted in primary-key order, so writers wait on each
+other but cannot deadlock. If ingest rate makes this the bottleneck, keep
+write transactions short rather than moving the increments out of them:
+the rollups would then drift from ``detections`` on every failed commit.
+
+The ``backfill`` command recomputes a time range from the ``detections``
+table and the detection archives written by ``database.retention``, e.g.
+after enabling rollups on an existing database or changing
+``ROLLUP_CELL_DEGREES``, so archived hours keep their counts. Run it over
+ranges that are not being ingested or archived.
+
+Usage:
+    python -m database.rollups backfill [--start 2025-01-01] [--end 2025-02-01]
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import sys
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import delete, event, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from config import ARCHIVE_DIR, ROLLUP_CELL_DEGREES
+from database.models import Detection, DetectionCellRollup, DetectionCountRollup
+from database.retention import iter_archived
+from database.versions import bump_table_versions
+
+logger = logging.getLogger(__name__)
+
+# (timestamp, class_name, zone_label, confidence, lat, lng)
+DetectionRow = Tuple[datetime, str, Optional[str], float, Optional[float], Optional[float]]
+
+_UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def hour_bucket(ts: datetime) -> datetime:
+    """Start of the hour containing ``ts``."""
+    return ts.replace(minute=0, second=0, microsecond=0)
+
+
+def cell_of(lat: float, lng: float, cell_degrees: float = ROLLUP_CELL_DEGREES) -> Tuple[int, int]:
+    """Grid cell ``(cell_x, cell_y)`` containing a position."""
+    return math.floor(lng / cell_degrees), math.floor(lat / cell_degrees)
+
+
+def aggregate(rows: Iterable[DetectionRow], cell_degrees: float = ROLLUP_CELL_DEGREES):
+    """
+    Fold detection rows into rollup increments.
+
+    Returns:
+        tuple: ``(counts, cells)`` keyed by the rollup primary keys, with
+        ``[count, confidence_sum]`` and ``count`` values respectively
+    """
+    counts: Dict[tuple, list] = defaultdict(lambda: [0, 0.0])
+    cells: Dict[tuple, int] = defaultdict(int)
+    for ts, class_name, zone_label, confidence, lat, lng in rows:
+        bucket = hour_bucket(ts)
+        entry = counts[(bucket, class_name, zone_label or "")]
+        entry[0] += 1
+        entry[1] += confidence or 0.0
+        if lat is not None and lng is not None:
+            cells[(bucket, class_name, *cell_of(lat, lng, cell_degrees))] += 1
+    return counts, cells
+
+
+def _upsert(connection: Connection, model, keys: Tuple[str, ...], rows: list, increments: Tuple[str, ...]) -> None:
+    table = model.__table__
+    make_insert = _UPSERT_INSERTS.get(connection.dialect.name)
+    if make_insert is not None:
+        stmt = make_insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(keys),
+            set_={name: table.c[name] + stmt.excluded[name] for name in increments},
+        )
+        connection.execute(stmt, rows)
+        return
+    # Portable fallback: increment, and insert the rows that did not exist yet
+    for row in rows:
+        result = connection.execute(
+            update(table)
+            .where(*(table.c[k] == row[k] for k in keys))
+            .values({name: table.c[name] + row[name] for name in increments})
+        )
+        if result.rowcount == 0:
+            connection.execute(insert(table).values(row))
+
+
+def apply_rollups(connection: Connection, counts: Dict[tuple, list], cells: Dict[tuple, int]) -> None:
+    """Add aggregated increments to the rollup tables, in primary-key order."""
+    if counts:
+        _upsert(
+            connection, DetectionCountRollup, ("bucket", "class_name", "zone_label"),
+            [
+                {"bucket": b, "class_name": c, "zone_label": z, "count": n, "confidence_sum": s}
+                for (b, c, z), (n, s) in sorted(counts.items())
+            ],
+            ("count", "confidence_sum"),
+        )
+    if cells:
+        _upsert(
+            connection, DetectionCellRollup, ("bucket", "class_name", "cell_x", "cell_y"),
+            [
+                {"bucket": b, "class_name": c, "cell_x": x, "cell_y": y, "count": n}
+                for (b, c, x, y), n in sorted(cells.items())
+            ],
+            ("count",),
+        )
+
+
+def record_detections(connection: Connection, rows: Iterable[DetectionRow]) -> None:
+    """Roll up detections written outside the ORM unit of work."""
+    apply_rollups(connection, *aggregate(rows))
+
+
+@event.listens_for(Session, "after_flush")
+def _rollup_on_flush(session: Session, flush_context) -> None:
+    """Roll up detections inserted by this flush."""
+    now = datetime.utcnow()
+    rows = [
+        (obj.timestamp or now, obj.class_name, obj.zone_label, obj.confidence, obj.gps_lat, obj.gps_lng)
+        for obj in session.new
+        if isinstance(obj, Detection)
+    ]
+    if rows:
+        record_detections(session.connection(), rows)
+
+
+def _archived_chunks(
+    start: Optional[datetime], end: Optional[datetime], archive_dir: str, chunk_size: int
+) -> Iterator[list]:
+    chunk = []
+    for row in iter_archived(Detection.__tablename__, start, end, archive_dir):
+        chunk.append((
+            row["timestamp"], row["class_name"], row["zone_label"],
+            row["confidence"], row["gps_lat"], row["gps_lng"],
+        ))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def backfill(
+    session_factory: Callable[[], Session],
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    chunk_size: int = 50_000,
+    archive_dir: str = ARCHIVE_DIR,
+) -> int:
+    """
+    Rebuild rollups for detections with ``start <= timestamp < end``.
+
+    The range is widened to whole hours. Existing rollup rows in the range
+    are replaced in a single transaction; stored and archived detections
+    are streamed and folded in chunks of ``chunk_size``. The detections
+    table version is bumped so cached statistics revalidate.
+
+    Returns:
+        int: Number of detections rolled up, archived ones included
+    """
+    if start is not None:
+        start = hour_bucket(start)
+    if end is not None and end != hour_bucket(end):
+        end = hour_bucket(end) + timedelta(hours=1)
+
+    def in_range(column):
+        conditions = []
+        if start is not None:
+            conditions.append(column >= start)
+        if end is not None:
+            conditions.append(column < end)
+        return conditions
+
+    total = 0
+    with session_factory() as db:
+        for model in (DetectionCountRollup, DetectionCellRollup):
+            db.execute(delete(model).where(*in_range(model.bucket)))
+        connection = db.connection()
+        result = db.execute(
+            select(
+                Detection.timestamp, Detection.class_name, Detection.zone_label,
+                Detection.confidence, Detection.gps_lat, Detection.gps_lng,
+            )
+            .where(*in_range(Detection.timestamp))
+            .execution_options(yield_per=chunk_size)
+        )
+        for chunk in result.partitions():
+            apply_rollups(connection, *aggregate(chunk))
+            total += len(chunk)
+        for chunk in _archived_chunks(start, end, archive_dir, chunk_size):
+            apply_rollups(connection, *aggregate(chunk))
+            total += len(chunk)
+        bump_table_versions(connection, [Detection.__tablename__])
+        db.commit()
+    logger.info("Rolled up %d detections in [%s, %s)", total, start, end)
+    return total
+
+
+def main() -> None:
+    from database.db import SessionLocal
+
+    parser = argparse.ArgumentParser(description="RhinoGuardians detection rollups")
+    sub = parser.add_subparsers(dest="command", required=True)
+    fill = sub.add_parser("backfill", help="Recompute rollups from stored and archived detections")
+    fill.add_argument("--start", type=datetime.fromisoformat, default=None)
+    fill.add_argument("--end", type=datetime.fromisoformat, default=None)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    print(json.dumps({"detections": backfill(SessionLocal, args.start, args.end)}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Table Version Tracking Module
+
+Keeps a per-table change counter in the ``table_versions`` table. The counter
+is bumped inside the same transaction as every ORM insert, update or delete
+on a tracked table, so list endpoints can answer conditional GETs with a
+single primary-key lookup instead of re-running the list query.
+
+The counter row is upserted (``INSERT ... ON CONFLICT DO UPDATE`` on
+PostgreSQL and SQLite), so the first writers of a table cannot race to
+create it. It is also one hot row per table: every transaction writing
+detections (or alerts) holds its row lock until it commits, so those
+transactions serialize on the bump. Keep them short; the bump cannot move to
+a separate transaction, because the version must change exactly when the
+data it describes becomes visible.
+"""
+
+from datetime import datetime
+from typing import Iterable
+
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from database.models import Alert, Detection, TableVersion
+
+# Tables whose changes are tracked for HTTP caching
+TRACKED_TABLES = frozenset({Alert.__tablename__, Detection.__tablename__})
+
+_UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def bump_table_versions(connection: Connection, table_names: Iterable[str]) -> None:
+    """
+    Increment the change counter for each of the given tables.
+
+    Args:
+        connection: Connection bound to the caller's transaction
+        table_names: Names of the tables that changed
+    """
+    now = datetime.utcnow()
+    # Sorted, so transactions bumping several tables lock the rows in the same order
+    names = sorted(set(table_names) & TRACKED_TABLES)
+    if not names:
+        return
+    make_insert = _UPSERT_INSERTS.get(connection.dialect.name)
+    if make_insert is not None:
+        stmt = make_insert(TableVersion)
+        connection.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[TableVersion.table_name],
+                set_={"version": TableVersion.version + 1, "updated_at": stmt.excluded.updated_at},
+            ),
+            [{"table_name": name, "version": 1, "updated_at": now} for name in names],
+        )
+        return
+    # Portable fallback: increment, and create the row if it did not exist yet
+    for name in names:
+        result = connection.execute(
+            update(TableVersion)
+            .where(TableVersion.table_name == name)
+            .values(version=TableVersion.version + 1, updated_at=now)
+        )
+        if result.rowcount == 0:
+            connection.execute(
+                insert(TableVersion).values(table_name=name, version=1, updated_at=now)
+            )
+
+
+def get_table_version(db: Session, table_name: str) -> int:
+    """
+    Return the current change counter for a table (0 if never written).
+
+    Args:
+        db: Active database session
+        table_name: Name of the tracked table
+    """
+    version = db.execute(
+        select(TableVersion.version).where(TableVersion.table_name == table_name)
+    ).scalar_one_or_none()
+    return version or 0
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_on_flush(session: Session, flush_context) -> None:
+    """Bump versions for tables touched by ORM unit-of-work changes."""
+    changed = {
+        obj.__table__.name
+        for obj in (*session.new, *session.dirty, *session.deleted)
+        if getattr(obj, "__table__", None) is not None
+        and (obj not in session.dirty or session.is_modified(obj))
+    }
+    if changed & TRACKED_TABLES:
+        bump_table_versions(session.connection(), changed)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _bump_on_bulk_statement(orm_execute_state) -> None:
+    """Bump versions for ORM-enabled bulk INSERT/UPDATE/DELETE statements."""
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update
+            or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and mapper.local_table.name in TRACKED_TABLES:
+        bump_table_versions(orm_execute_state.session.connection(),
+                            [mapper.local_table.name])
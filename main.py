@@ -1,12 +1,3 @@
-from alembic import op
-import sqlalchemy as sa
-
-def upgrade():
-    op.alter_column('alerts', 'detection', new_column_name='detection_id', existing_type=sa.String())
-
-def downgrade():
-    op.alter_column('alerts', 'detection_id', new_column_name='detection', existing_type=sa.String())
-
 """
 RhinoGuardians Backend API
 
@@ -15,13 +6,59 @@ and includes all route handlers. The API provides endpoints for rhino detection,
 alerts, and system health monitoring.
 """
 
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
+
+from config import PROFILE_INTERVAL_MS, PROFILE_SAMPLE_RATE, PROFILING_ENABLED
 from routes.api import router as api_router
 from routes.alerts import router as alerts_router
 from routes.notifications import router as notifications_router
+from routes.images import router as images_router
+from routes.stats import router as stats_router
+from routes.export import router as export_router
+from routes.metrics import router as metrics_router
+from routes.health import router as health_router
+from routes.profiles import router as profiles_router
+from utils.profiling import ProfilingMiddleware, get_profile_store
+
+logger = logging.getLogger(__name__)
+
+
+def warm_up() -> None:
+    """
+    Load the process-wide singletons (detection model, zones, alert rules,
+    image store) so the first request doesn't pay for them. A model that
+    fails to load is only logged: /health/ready reports it, and uploads
+    retry the load and answer 503 until it succeeds.
+    """
+    from models.yolo_detector import get_detector
+    from storage.image_store import get_image_store
+    from utils.alert_rules import get_rule_engine
+    from utils.geofence import get_geofence
+
+    try:
+        get_detector()
+    except (FileNotFoundError, RuntimeError) as e:
+        logger.error("Detection model not loaded at startup: %s", e)
+    get_geofence()
+    get_rule_engine()
+    get_image_store()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Heavy imports (torch) and model loading happen here, once per worker,
+    # instead of when the application module is imported
+    await run_in_threadpool(warm_up)
+    yield
+
 
 app = FastAPI(
+    lifespan=lifespan,
     title="RhinoGuardians API",
     description="API for rhino detection and alert system",
     version="1.0.0",
@@ -41,6 +78,22 @@ app.add_middleware(
 app.include_router(api_router)
 app.include_router(alerts_router)
 app.include_router(notifications_router)
+app.include_router(images_router)
+app.include_router(stats_router)
+app.include_router(export_router)
+app.include_router(metrics_router)
+app.include_router(health_router)
+
+# Only installed when enabled, so unprofiled deployments pay nothing and
+# expose no profile endpoints
+if PROFILING_ENABLED:
+    app.include_router(profiles_router)
+    app.add_middleware(
+        ProfilingMiddleware,
+        store=get_profile_store(),
+        sample_rate=PROFILE_SAMPLE_RATE,
+        interval=PROFILE_INTERVAL_MS / 1000.0,
+    )
 
 @app.get("/")
 def read_root():
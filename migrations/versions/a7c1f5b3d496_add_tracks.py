@@ -0,0 +1,59 @@
+"""add tracks
+
+Revision ID: a7c1f5b3d496
+Revises: f6b0e4a2c385
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c1f5b3d496'
+down_revision: Union[str, Sequence[str], None] = 'f6b0e4a2c385'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('tracks',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('camera_id', sa.String(), nullable=False, comment='Camera the track was seen on'),
+    sa.Column('class_name', sa.String(), nullable=False, comment='Detected class'),
+    sa.Column('first_seen', sa.DateTime(), nullable=False, comment='Timestamp of the first frame'),
+    sa.Column('last_seen', sa.DateTime(), nullable=False, comment='Timestamp of the latest frame'),
+    sa.Column('best_confidence', sa.Float(), nullable=False, comment='Highest confidence seen on the track'),
+    sa.Column('best_detection_id', sa.Integer(), nullable=True, comment='Stored detection with the best confidence'),
+    sa.Column('detection_count', sa.Integer(), nullable=False, comment='Frames linked to the track'),
+    sa.Column('box_x1', sa.Float(), nullable=False, comment='Latest bounding box left edge'),
+    sa.Column('box_y1', sa.Float(), nullable=False, comment='Latest bounding box top edge'),
+    sa.Column('box_x2', sa.Float(), nullable=False, comment='Latest bounding box right edge'),
+    sa.Column('box_y2', sa.Float(), nullable=False, comment='Latest bounding box bottom edge'),
+    sa.Column('zone_label', sa.String(), nullable=True, comment='Zone of the latest frame'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_tracks_id'), 'tracks', ['id'], unique=False)
+    op.create_index('ix_tracks_camera_last_seen', 'tracks', ['camera_id', 'last_seen'], unique=False)
+    op.add_column('detections', sa.Column('camera_id', sa.String(), nullable=True, comment='Camera that captured the frame'))
+    op.create_index(op.f('ix_detections_camera_id'), 'detections', ['camera_id'], unique=False)
+    with op.batch_alter_table('detections') as batch_op:
+        batch_op.add_column(sa.Column('track_id', sa.Integer(), nullable=True, comment='Track linking this detection across frames'))
+        batch_op.create_index(batch_op.f('ix_detections_track_id'), ['track_id'], unique=False)
+        batch_op.create_foreign_key('fk_detections_track_id', 'tracks', ['track_id'], ['id'], ondelete='SET NULL')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('detections') as batch_op:
+        batch_op.drop_constraint('fk_detections_track_id', type_='foreignkey')
+        batch_op.drop_index(batch_op.f('ix_detections_track_id'))
+        batch_op.drop_column('track_id')
+    op.drop_index(op.f('ix_detections_camera_id'), table_name='detections')
+    op.drop_column('detections', 'camera_id')
+    op.drop_index('ix_tracks_camera_last_seen', table_name='tracks')
+    op.drop_index(op.f('ix_tracks_id'), table_name='tracks')
+    op.drop_table('tracks')
@@ -0,0 +1,37 @@
+"""add table_versions for list ETags
+
+Revision ID: b7e2c1d4a9f0
+Revises: 1a4c566c4e37
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e2c1d4a9f0'
+down_revision: Union[str, Sequence[str], None] = '1a4c566c4e37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    table_versions = op.create_table('table_versions',
+    sa.Column('table_name', sa.String(), nullable=False, comment='Name of the tracked table'),
+    sa.Column('version', sa.Integer(), nullable=False, comment='Monotonic change counter for the table'),
+    sa.Column('updated_at', sa.DateTime(), nullable=True, comment='When the counter was last bumped'),
+    sa.PrimaryKeyConstraint('table_name')
+    )
+    op.bulk_insert(table_versions, [
+        {'table_name': 'alerts', 'version': 0},
+        {'table_name': 'detections', 'version': 0},
+    ])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('table_versions')
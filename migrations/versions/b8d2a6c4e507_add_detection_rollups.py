@@ -0,0 +1,45 @@
+"""add detection rollups
+
+Revision ID: b8d2a6c4e507
+Revises: a7c1f5b3d496
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8d2a6c4e507'
+down_revision: Union[str, Sequence[str], None] = 'a7c1f5b3d496'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('detection_counts_hourly',
+    sa.Column('bucket', sa.DateTime(), nullable=False, comment='Start of the hour (UTC)'),
+    sa.Column('class_name', sa.String(), nullable=False, comment='Detected class'),
+    sa.Column('zone_label', sa.String(), nullable=False, comment="Zone label, '' when outside every zone"),
+    sa.Column('count', sa.Integer(), nullable=False, comment='Number of detections'),
+    sa.Column('confidence_sum', sa.Float(), nullable=False, comment='Sum of confidences'),
+    sa.PrimaryKeyConstraint('bucket', 'class_name', 'zone_label')
+    )
+    op.create_table('detection_cells_hourly',
+    sa.Column('bucket', sa.DateTime(), nullable=False, comment='Start of the hour (UTC)'),
+    sa.Column('class_name', sa.String(), nullable=False, comment='Detected class'),
+    sa.Column('cell_x', sa.Integer(), nullable=False, comment='Longitude grid index'),
+    sa.Column('cell_y', sa.Integer(), nullable=False, comment='Latitude grid index'),
+    sa.Column('count', sa.Integer(), nullable=False, comment='Number of detections'),
+    sa.PrimaryKeyConstraint('bucket', 'class_name', 'cell_x', 'cell_y')
+    )
+    # Existing detections are loaded with: python -m database.rollups backfill
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('detection_cells_hourly')
+    op.drop_table('detection_counts_hourly')
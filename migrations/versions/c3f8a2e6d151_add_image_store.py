@@ -0,0 +1,41 @@
+"""add content-addressed image store
+
+Revision ID: c3f8a2e6d151
+Revises: b7e2c1d4a9f0
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3f8a2e6d151'
+down_revision: Union[str, Sequence[str], None] = 'b7e2c1d4a9f0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('images',
+    sa.Column('sha256', sa.String(length=64), nullable=False, comment='Hex SHA-256 of the image bytes'),
+    sa.Column('size', sa.Integer(), nullable=False, comment='Size of the image in bytes'),
+    sa.Column('content_type', sa.String(), nullable=True, comment='MIME type reported at upload'),
+    sa.Column('ref_count', sa.Integer(), nullable=False, comment='Number of detections referencing the image'),
+    sa.Column('tier', sa.String(), nullable=False, comment="Storage tier holding the blob ('hot' or 'cold')"),
+    sa.Column('created_at', sa.DateTime(), nullable=False, comment='When the blob was first stored'),
+    sa.Column('updated_at', sa.DateTime(), nullable=False, comment='Last upload or reference change'),
+    sa.PrimaryKeyConstraint('sha256')
+    )
+    op.add_column('detections', sa.Column('image_sha256', sa.String(length=64), nullable=True, comment='Content hash of the image in the image store'))
+    op.create_index(op.f('ix_detections_image_sha256'), 'detections', ['image_sha256'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_detections_image_sha256'), table_name='detections')
+    op.drop_column('detections', 'image_sha256')
+    op.drop_table('images')
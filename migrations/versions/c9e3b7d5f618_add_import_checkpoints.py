@@ -0,0 +1,37 @@
+"""add import checkpoints
+
+Revision ID: c9e3b7d5f618
+Revises: b8d2a6c4e507
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c9e3b7d5f618'
+down_revision: Union[str, Sequence[str], None] = 'b8d2a6c4e507'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('import_checkpoints',
+    sa.Column('source', sa.String(), nullable=False, comment='Absolute path of the imported file'),
+    sa.Column('size', sa.BigInteger(), nullable=False, comment='File size when the import started'),
+    sa.Column('mtime_ns', sa.BigInteger(), nullable=False, comment='File modification time when the import started'),
+    sa.Column('offset', sa.Integer(), nullable=False, comment='Records consumed'),
+    sa.Column('inserted', sa.Integer(), nullable=False, comment='Rows inserted so far'),
+    sa.Column('rejected', sa.Integer(), nullable=False, comment='Records rejected so far'),
+    sa.Column('updated_at', sa.DateTime(), nullable=True, comment='When the last chunk was committed'),
+    sa.PrimaryKeyConstraint('source')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('import_checkpoints')
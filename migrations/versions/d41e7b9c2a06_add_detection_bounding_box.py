@@ -0,0 +1,34 @@
+"""add detection bounding box
+
+Revision ID: d41e7b9c2a06
+Revises: c3f8a2e6d151
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd41e7b9c2a06'
+down_revision: Union[str, Sequence[str], None] = 'c3f8a2e6d151'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('detections', sa.Column('box_x1', sa.Float(), nullable=True, comment='Bounding box left edge in image pixels'))
+    op.add_column('detections', sa.Column('box_y1', sa.Float(), nullable=True, comment='Bounding box top edge in image pixels'))
+    op.add_column('detections', sa.Column('box_x2', sa.Float(), nullable=True, comment='Bounding box right edge in image pixels'))
+    op.add_column('detections', sa.Column('box_y2', sa.Float(), nullable=True, comment='Bounding box bottom edge in image pixels'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('detections', 'box_y2')
+    op.drop_column('detections', 'box_x2')
+    op.drop_column('detections', 'box_y1')
+    op.drop_column('detections', 'box_x1')
@@ -0,0 +1,30 @@
+"""add detection gps source and metadata latency
+
+Revision ID: e5a9d3f1b274
+Revises: d41e7b9c2a06
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a9d3f1b274'
+down_revision: Union[str, Sequence[str], None] = 'd41e7b9c2a06'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('detections', sa.Column('gps_source', sa.String(length=8), nullable=True, comment="Where the coordinates came from: 'form' or 'exif'"))
+    op.add_column('detections', sa.Column('metadata_ms', sa.Float(), nullable=True, comment='EXIF extraction latency in milliseconds'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('detections', 'metadata_ms')
+    op.drop_column('detections', 'gps_source')
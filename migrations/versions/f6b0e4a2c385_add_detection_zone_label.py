@@ -0,0 +1,30 @@
+"""add detection zone label
+
+Revision ID: f6b0e4a2c385
+Revises: e5a9d3f1b274
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f6b0e4a2c385'
+down_revision: Union[str, Sequence[str], None] = 'e5a9d3f1b274'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('detections', sa.Column('zone_label', sa.String(), nullable=True, comment='Park zone containing the detection'))
+    op.create_index(op.f('ix_detections_zone_label'), 'detections', ['zone_label'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_detections_zone_label'), table_name='detections')
+    op.drop_column('detections', 'zone_label')
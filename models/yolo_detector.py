@@ -7,11 +7,39 @@ proper error handling and input validation.
 """
 
 import os
-import torch
-from PIL import Image
-from typing import List, Dict, Union
+from functools import lru_cache
+from io import BytesIO
+from typing import TYPE_CHECKING, List, Dict, Union
 from pathlib import Path
 
+# torch and PIL are imported where they are used, so importing this module
+# (and the app) stays cheap; torch loads with the model
+if TYPE_CHECKING:
+    from PIL import Image
+
+from utils.metrics import STAGE_SECONDS
+
+
+def decode_image(data: bytes) -> "Image.Image":
+    """Verify and fully decode an encoded image, as the detector does before inference."""
+    from PIL import Image
+
+    img = Image.open(BytesIO(data))
+    img.verify()  # verify() leaves the image unusable, so reopen
+    img = Image.open(BytesIO(data))
+    img.load()
+    return img
+
+
+def offset_boxes(
+    detections: List[Dict[str, Union[List[float], float, int, str]]], region: List[int]
+) -> List[Dict[str, Union[List[float], float, int, str]]]:
+    """Shift boxes detected on the ``region`` crop of an image back to full-image coordinates."""
+    for detection in detections:
+        x1, y1, x2, y2 = detection["box"]
+        detection["box"] = [x1 + region[0], y1 + region[1], x2 + region[0], y2 + region[1]]
+    return detections
+
 
 # Short-circuit detector for tests or environments without YOLO dependencies
 if os.getenv("SKIP_YOLO") == "1":
@@ -25,6 +53,11 @@ if os.getenv("SKIP_YOLO") == "1":
         def predict(self, image_path: str) -> List[Dict[str, Union[List[float], float, int]]]:
             # Always return empty in stub mode
             return []
+
+        def predict_bytes(
+            self, data: bytes, region: List[int] | None = None
+        ) -> List[Dict[str, Union[List[float], float, int, str]]]:
+            return []
 else:
     class YoloDetector:
         """
@@ -57,6 +90,12 @@ else:
                 raise FileNotFoundError(f"Model file not found: {model_path}")
 
             try:
+                import torch
+
+                from utils.cpu_planner import apply_torch_threads, get_cpu_plan
+
+                # Before the first forward pass, while torch still accepts it
+                apply_torch_threads(get_cpu_plan())
                 self.model = torch.hub.load(
                     'ultralytics/yolov5',
                     'custom',
@@ -81,7 +120,8 @@ else:
                     {
                         "box": [x1, y1, x2, y2],  # Bounding box coordinates
                         "confidence": float,        # Detection confidence (0-1)
-                        "class": int               # Class ID of detected object
+                        "class": int,              # Class ID of detected object
+                        "class_name": str          # Model label for the class
                     }
 
             Raises:
@@ -95,6 +135,7 @@ else:
             """
             if not os.path.exists(image_path):
                 raise FileNotFoundError(f"Image file not found: {image_path}")
+            from PIL import Image
 
             try:
                 # Verify image integrity
@@ -103,18 +144,55 @@ else:
                 img = Image.open(image_path)  # Reopen (verify closes the file)
             except Exception as e:
                 raise RuntimeError(f"Failed to open image: {str(e)}")
+            return self._predict_image(img)
 
+        def predict_bytes(
+            self, data: bytes, region: List[int] | None = None
+        ) -> List[Dict[str, Union[List[float], float, int, str]]]:
+            """
+            Perform object detection on an in-memory encoded image.
+
+            Args:
+                data (bytes): Encoded image (e.g. the raw upload body)
+                region (list, optional): Only detect inside ``[x1, y1, x2, y2]``
+                    (e.g. the changed area found by ``utils.motion_gate``);
+                    boxes are still returned in full-image coordinates
+
+            Returns:
+                List[Dict]: Same format as ``predict``
+
+            Raises:
+                RuntimeError: If the image can't be decoded or prediction fails
+            """
             try:
-                # Perform inference
-                results = self.model(img)
-                detections: List[Dict[str, Union[List[float], float, int]]] = []
+                with STAGE_SECONDS.time("decode"):
+                    img = decode_image(data)
+                    if region is not None:
+                        full, img = img, img.crop(tuple(region))
+                        full.close()
+            except Exception as e:
+                raise RuntimeError(f"Failed to open image: {str(e)}")
+            detections = self._predict_image(img)
+            if region is not None:
+                detections = offset_boxes(detections, region)
+            return detections
+
+        def _predict_image(self, img: "Image.Image") -> List[Dict[str, Union[List[float], float, int, str]]]:
+            """Run the model on an opened image and close it afterwards."""
+            try:
+                # Perform inference (YOLOv5 applies NMS inside the forward call)
+                with STAGE_SECONDS.time("inference"):
+                    results = self.model(img)
+                detections: List[Dict[str, Union[List[float], float, int, str]]] = []
+                names = getattr(self.model, "names", {})
 
                 # Convert tensor to list and process detections
                 for *box, conf, cls in results.xyxy[0].tolist():
                     detections.append({
                         "box": box,          # [x1, y1, x2, y2]
                         "confidence": float(conf),
-                        "class": int(cls)
+                        "class": int(cls),
+                        "class_name": names[int(cls)] if int(cls) in names else str(int(cls)),
                     })
                 return detections
 
@@ -122,3 +200,15 @@ else:
                 raise RuntimeError(f"Model prediction failed: {str(e)}")
             finally:
                 img.close()  # Ensure image file is closed
+
+
+@lru_cache(maxsize=1)
+def get_detector() -> "YoloDetector":
+    """
+    Process-wide detector, loaded on first use.
+
+    In stub mode (SKIP_YOLO=1) no weights are needed.
+    """
+    from config import MODEL_PATH
+
+    return YoloDetector(None if os.getenv("SKIP_YOLO") == "1" else MODEL_PATH)
@@ -5,19 +5,33 @@ This module handles all alert-related endpoints, including retrieving
 active alerts, managing alert settings, and triggering notifications.
 """
 from datetime import datetime
+from types import SimpleNamespace
 from typing import Optional
 
-from fastapi import APIRouter, HTTPException, Query, Depends, Path, Security
+from fastapi import APIRouter, HTTPException, Query, Depends, Path, Request, Security
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy import select, func, desc
+from sqlalchemy import String, exists, select, func, desc, insert, type_coerce, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 
 from database.db import get_db
 from database.models import Alert, AlertStatus as DBAlertStatus
+from utils.geofence import get_geofence
+from utils.metrics import NOTIFICATION_BACKLOG, STAGE_SECONDS
 from utils.notifications import NotificationService
 from typing import Optional
-from .schemas import AlertTriggerRequest, AlertResponse, Location, AlertStatus as APIAlertStatus, UpdateStatusRequest
+from .caching import cache_headers, not_modified
+from .responses import FastJSONResponse
+from .schemas import (
+    AlertTriggerRequest,
+    AlertResponse,
+    AlertStatus as APIAlertStatus,
+    UpdateStatusRequest,
+    BulkUpdateStatusRequest,
+    BulkUpdateStatusResponse,
+    BulkUpdateResult,
+)
 
 
 router = APIRouter(prefix="/alerts", tags=["alerts"])
@@ -26,47 +40,155 @@ security = HTTPBearer(auto_error=False)
 notification_service = NotificationService()
 
 
-@router.get("/")
+# Columns returned by GET /alerts/, in response key order
+ALERT_LIST_FIELDS = (
+    "id", "detection_id", "timestamp", "status", "type", "severity",
+    "source", "lat", "lng", "zone_label", "created_by",
+)
+_ALERT_LIST_COLUMNS = tuple(
+    # Read the raw enum name instead of building AlertStatus members per row
+    type_coerce(Alert.status, String).label("status") if name == "status" else getattr(Alert, name)
+    for name in ALERT_LIST_FIELDS
+)
+
+
+def alert_filters(status: Optional[str] = None) -> list:
+    """Build WHERE conditions for the alert list filters."""
+    conditions = []
+    if status:
+        value = getattr(DBAlertStatus, status, None) or status
+        conditions.append(Alert.status == value)
+    return conditions
+
+
+def list_alert_rows(db: Session, limit: int, skip: int, status: Optional[str] = None):
+    """
+    Fetch one page of alerts as plain dicts, newest first.
+
+    Only the listed columns are selected and rows stay tuples until they are
+    zipped into dicts, so no ORM instances are built.
+
+    Returns:
+        tuple: (total matching alerts, list of alert dicts)
+    """
+    conditions = alert_filters(status)
+
+    total = db.execute(select(func.count()).select_from(Alert).where(*conditions)).scalar_one()
+    rows = db.execute(
+        select(*_ALERT_LIST_COLUMNS)
+        .where(*conditions)
+        .order_by(desc(Alert.timestamp))
+        .offset(skip)
+        .limit(limit)
+    ).all()
+    return total, [dict(zip(ALERT_LIST_FIELDS, row)) for row in rows]
+
+
+@router.get("/", response_class=FastJSONResponse)
 async def get_alerts(
+    request: Request,
     limit: int = Query(10, ge=1, le=100),
     skip: int = Query(0, ge=0),
     status: Optional[str] = Query(None),
     db: Session = Depends(get_db),
 ):
     try:
-        # Order by available timestamp; fallback to id
-        order_col = getattr(Alert, "timestamp", None) or getattr(Alert, "created_at", None) or Alert.id
-        q = select(Alert).order_by(desc(order_col))
-        if status:
-            value = getattr(DBAlertStatus, status, None) or status
-            q = q.filter(Alert.status == value)
-
-        total = db.execute(select(func.count()).select_from(q.subquery())).scalar_one()
-        items = db.execute(q.offset(skip).limit(limit)).scalars().all()
-
-        result = []
-        for a in items:
-            st = a.status.name if hasattr(a.status, "name") else str(a.status)
-            ts = a.timestamp if hasattr(a, "timestamp") else getattr(a, "created_at", datetime.utcnow())
-            result.append({
-                "id": a.id,
-                "detection_id": a.detection_id,
-                "timestamp": ts.isoformat(),
-                "status": st,
-                "type": getattr(a, "type", None),
-                "severity": getattr(a, "severity", None),
-                "source": getattr(a, "source", None),
-                "lat": getattr(a, "lat", None),
-                "lng": getattr(a, "lng", None),
-                "zone_label": getattr(a, "zone_label", None),
-                "created_by": getattr(a, "created_by", None),
-            })
-
-        return {"alerts": result, "total": total, "timestamp": datetime.utcnow().isoformat()}
+        # Answer conditional GETs from the table version without listing
+        headers = cache_headers(db, Alert.__tablename__)
+        cached = not_modified(request, headers)
+        if cached is not None:
+            return cached
+
+        total, result = list_alert_rows(db, limit, skip, status)
+        return FastJSONResponse(
+            {"alerts": result, "total": total, "timestamp": datetime.utcnow()},
+            headers=headers,
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving alerts: {str(e)}")
 
 
+def format_alert_message(payload: AlertTriggerRequest) -> str:
+    """Build the ranger-facing notification text for a trigger request."""
+    return (
+        f"[{payload.severity.value.upper()}] {payload.type.value.replace('_',' ').title()} "
+        f"at ({payload.location.lat}, {payload.location.lng})"
+        + (f" - {payload.location.zoneLabel}" if payload.location.zoneLabel else "")
+        + (f" | {payload.notes}" if payload.notes else "")
+    )
+
+
+def build_alert_values(payload: AlertTriggerRequest, alert_id: str, now: datetime) -> dict:
+    """
+    Column values for a new alert whose notification has not been sent yet.
+
+    A pending notification is stored as ``notification_sent=0`` with a NULL
+    ``notification_timestamp``; every attempt, failed or not, sets the
+    timestamp, so pending alerts can be told apart from failed sends.
+    Pending alerts are INACTIVE (not the model default ACTIVE), so an alert
+    whose notification is still in flight is not listed under
+    ``status=ACTIVE``.
+    """
+    return dict(
+        alert_id=alert_id,
+        detection_id=payload.detection_id,
+        status=DBAlertStatus.INACTIVE,
+        type=payload.type.value,
+        severity=payload.severity.value,
+        source=payload.source,
+        notes=payload.notes,
+        lat=payload.location.lat,
+        lng=payload.location.lng,
+        zone_label=payload.location.zoneLabel,
+        created_by=payload.createdBy,
+        notification_sent=0,
+        notification_timestamp=None,
+        timestamp=now,
+        updated_at=now,
+    )
+
+
+def notification_outcome(sent: bool, now: datetime) -> dict:
+    """Column values recording the result of an alert's notification."""
+    return dict(
+        status=DBAlertStatus.ACKNOWLEDGED if sent else DBAlertStatus.INACTIVE,
+        notification_sent=1 if sent else 0,
+        notification_timestamp=now,
+        updated_at=now,
+    )
+
+
+def find_pending_alert(db: Session, alert_id: str):
+    """
+    Return the timestamps of an alert whose notification was never attempted
+    to completion, or None if the alert is missing or already notified/failed.
+    """
+    return db.execute(
+        select(Alert.timestamp, Alert.updated_at).where(
+            Alert.alert_id == alert_id,
+            Alert.notification_sent == 0,
+            Alert.notification_timestamp.is_(None),
+        )
+    ).one_or_none()
+
+
+def insert_alert(db: Session, values: dict):
+    """
+    Insert one alert row and return its server-generated timestamps.
+
+    Uses ``INSERT ... RETURNING`` where the backend supports it, so no
+    follow-up ``refresh`` is needed. The caller owns the transaction.
+
+    Returns:
+        Row with ``timestamp`` and ``updated_at``
+    """
+    stmt = insert(Alert).values(**values)
+    if db.get_bind().dialect.insert_returning:
+        return db.execute(stmt.returning(Alert.timestamp, Alert.updated_at)).one()
+    db.execute(stmt)
+    return SimpleNamespace(timestamp=values["timestamp"], updated_at=values["updated_at"])
+
+
 @router.post("/trigger", response_model=AlertResponse)
 async def trigger_alert(
     payload: AlertTriggerRequest,
@@ -78,65 +200,128 @@ async def trigger_alert(
         raise HTTPException(status_code=401, detail="Invalid authentication token")
 
     try:
-        alert = Alert(
-            alert_id=payload.detection_id,  # or generate a unique string
-            detection_id=payload.detection_id,
-            status=getattr(DBAlertStatus, "ACTIVE", None) or "created",
-            type=payload.type.value,
-            severity=payload.severity.value,
-            source=payload.source,
-            notes=payload.notes,
-            lat=payload.location.lat,
-            lng=payload.location.lng,
-            zone_label=payload.location.zoneLabel,
-            created_by=payload.createdBy,
-            timestamp=datetime.utcnow() if hasattr(Alert, "timestamp") else None,
-        )
-        db.add(alert)
-        db.commit()
-        db.refresh(alert)
+        alert_id = payload.detection_id  # or generate a unique string
+        if not payload.location.zoneLabel:
+            payload.location.zoneLabel = get_geofence().lookup(payload.location.lat, payload.location.lng)
 
-        msg = (
-            f"[{payload.severity.value.upper()}] {payload.type.value.replace('_',' ').title()} "
-            f"at ({payload.location.lat}, {payload.location.lng}) - {payload.location.zoneLabel}"
-            + (f" | {payload.notes}" if payload.notes else "")
-        )
-
-        sent = await notification_service.send_alert(alert=alert, recipient=payload.createdBy, message=msg)
-
-        # Update DB status conservatively
+        # The row is committed as pending before rangers are paged: a write
+        # that fails notifies nobody, and a retry of an alert whose outcome is
+        # recorded is rejected instead of paging again. A retry of a still
+        # pending alert (the earlier send or outcome write failed) re-attempts
+        # the notification; one racing the original send may page twice.
         try:
-            if hasattr(DBAlertStatus, "ACKNOWLEDGED"):
-                alert.status = DBAlertStatus.ACKNOWLEDGED if sent else getattr(DBAlertStatus, "INACTIVE", DBAlertStatus.ACKNOWLEDGED)
-            else:
-                alert.status = "sent" if sent else "failed"
-            if hasattr(alert, "updated_at"):
-                alert.updated_at = datetime.utcnow()
+            row = insert_alert(db, build_alert_values(payload, alert_id, datetime.utcnow()))
             db.commit()
-            db.refresh(alert)
-        except Exception:
+        except IntegrityError as e:
             db.rollback()
+            # Only a conflict on alert_id means the alert exists; anything
+            # else (e.g. an unknown detection_id) is an invalid alert
+            if not db.execute(select(exists().where(Alert.alert_id == alert_id))).scalar():
+                raise HTTPException(status_code=422, detail=f"Invalid alert: {e.orig}")
+            row = find_pending_alert(db, alert_id)
+            if row is None:
+                raise HTTPException(status_code=409, detail=f"Alert {alert_id} already exists")
 
-        api_status = APIAlertStatus.SENT if sent else APIAlertStatus.FAILED
-        created_at = alert.timestamp if hasattr(alert, "timestamp") else getattr(alert, "created_at", datetime.utcnow())
-        updated_at = getattr(alert, "updated_at", created_at)
+        NOTIFICATION_BACKLOG.inc()
+        try:
+            with STAGE_SECONDS.time("notification_send"):
+                sent = await notification_service.send_alert(
+                    alert_id=alert_id, recipient=payload.createdBy, message=format_alert_message(payload)
+                )
+        finally:
+            NOTIFICATION_BACKLOG.dec()
+
+        outcome = notification_outcome(sent, datetime.utcnow())
+        db.execute(update(Alert).where(Alert.alert_id == alert_id).values(**outcome))
+        db.commit()
 
         return AlertResponse(
-            id=str(getattr(alert, "alert_id", alert.id)),
-            detection_id=alert.detection_id,
-            status=api_status,
+            id=alert_id,
+            detection_id=payload.detection_id,
+            status=APIAlertStatus.SENT if sent else APIAlertStatus.FAILED,
             type=payload.type,
             severity=payload.severity,
-            created_at=created_at,
-            updated_at=updated_at,
-            location=Location(lat=alert.lat, lng=alert.lng, zoneLabel=alert.zone_label),
-            notes=alert.notes,
+            created_at=row.timestamp,
+            updated_at=outcome["updated_at"],
+            location=payload.location,
+            notes=payload.notes,
         )
+    except HTTPException:
+        raise
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to create alert: {str(e)}")
 
 
+def _parse_db_status(value: str) -> DBAlertStatus:
+    """Map a status string (name or value, any case) onto the DB enum."""
+    for member in DBAlertStatus:
+        if value.upper() == member.name or value.lower() == member.value:
+            return member
+    raise HTTPException(status_code=422, detail=f"Unknown alert status: {value}")
+
+
+@router.patch("/status", response_model=BulkUpdateStatusResponse)
+async def bulk_update_alert_status(
+    payload: BulkUpdateStatusRequest,
+    db: Session = Depends(get_db),
+):
+    """
+    Set the status of many alerts with a single UPDATE statement.
+
+    Alerts are selected either by ``alert_ids`` or by ``filter`` (exactly one
+    must be given). Updated rows come back through ``RETURNING`` where the
+    backend supports it; otherwise the matching rows are locked and selected
+    first in the same transaction. Every requested ID gets a per-ID result.
+    """
+    if (payload.alert_ids is None) == (payload.filter is None):
+        raise HTTPException(status_code=422, detail="Provide exactly one of alert_ids or filter")
+
+    new_status = _parse_db_status(payload.status)
+    stmt = update(Alert).values(status=new_status, updated_at=datetime.utcnow())
+    if payload.alert_ids is not None:
+        conditions = [Alert.alert_id.in_(set(payload.alert_ids))]
+    else:
+        f = payload.filter
+        conditions = []
+        if f.status:
+            conditions.append(Alert.status == _parse_db_status(f.status))
+        if f.zone_label:
+            conditions.append(Alert.zone_label == f.zone_label)
+        if f.detection_id:
+            conditions.append(Alert.detection_id == f.detection_id)
+        if not conditions:
+            raise HTTPException(status_code=422, detail="Filter must set at least one field")
+    stmt = stmt.where(*conditions).execution_options(synchronize_session=False)
+
+    try:
+        if db.get_bind().dialect.update_returning:
+            updated_ids = db.execute(stmt.returning(Alert.alert_id)).scalars().all()
+        else:
+            # Lock the matching rows first: the filter may no longer match after the update
+            updated_ids = db.execute(
+                select(Alert.alert_id).where(*conditions).with_for_update()
+            ).scalars().all()
+            if updated_ids:
+                db.execute(
+                    stmt.where(Alert.alert_id.in_(updated_ids))
+                )
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Failed to update alerts: {str(e)}")
+
+    updated = set(updated_ids)
+    requested = payload.alert_ids if payload.alert_ids is not None else updated_ids
+    results = [
+        BulkUpdateResult(id=aid, updated=True, status=new_status.name)
+        if aid in updated
+        else BulkUpdateResult(id=aid, updated=False, error="not_found")
+        for aid in dict.fromkeys(requested)
+    ]
+    return BulkUpdateStatusResponse(updated=len(updated), results=results)
+
+
 @router.patch("/{alert_id}/status")
 async def update_alert_status(
     alert_id: str = Path(..., description="The ID of the alert to update"),
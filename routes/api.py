@@ -5,8 +5,31 @@ This module defines the main API endpoints for the RhinoGuardians application,
 including health checks, upload, and detections endpoints.
 """
 
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException
+import asyncio
+import time
+from functools import partial
+from fastapi import APIRouter, UploadFile, File, Form, Header, HTTPException, Depends, Query, Request
 from datetime import datetime
+from typing import Tuple
+from sqlalchemy import select, func, desc
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from database.db import get_db
+from database.models import Detection
+from models.yolo_detector import get_detector
+from storage.image_store import acquire_refs, get_image_store
+from utils.alert_rules import get_rule_engine
+from utils.exif import ImageMetadata, extract_metadata
+from utils.geofence import get_geofence
+from utils.inference_scheduler import (
+    InferenceDeadlineExceeded, get_client_priorities, get_inference_scheduler, resolve_priority,
+)
+from utils.metrics import INFERENCE_QUEUE_DEPTH, MOTION_GATE_DECISIONS, STAGE_SECONDS
+from utils.motion_gate import FULL, SKIPPED, GateDecision, MotionGate, get_motion_gate
+from utils.tracking import assign_tracks, link_best_detections, make_tracker
+from .caching import cache_headers, not_modified
+from .responses import FastJSONResponse
 
 router = APIRouter()
 
@@ -39,48 +62,276 @@ def health():
 def health_alias():
     return {"status": "healthy"}
 
+def upload_detector():
+    """Detector dependency for /upload/; 503 while the model can't be loaded."""
+    try:
+        return get_detector()
+    except (FileNotFoundError, RuntimeError) as e:
+        raise HTTPException(status_code=503, detail=f"Detection model unavailable: {e}")
+
+
+def _timed_metadata(data: bytes) -> Tuple[ImageMetadata, float]:
+    """Extract EXIF metadata and report how long it took, in milliseconds."""
+    started = time.perf_counter()
+    metadata = extract_metadata(data)
+    return metadata, (time.perf_counter() - started) * 1000.0
+
+
+def _gate_frame(gate: MotionGate, data: bytes, camera_id: str | None) -> GateDecision:
+    """Motion gate decision for a frame, counted per action."""
+    with STAGE_SECONDS.time("motion_gate"):
+        # The EXIF camera ID is only read for gating when the form lacks one;
+        # the header-only parser makes the repeat cheap
+        try:
+            decision = gate.check(camera_id or extract_metadata(data).camera_id, data)
+        except OSError:
+            # Undecodable upload: leave the error to the detector
+            decision = GateDecision(FULL, "unreadable")
+    MOTION_GATE_DECISIONS.inc(decision.action)
+    return decision
+
+
+async def _run_inference(
+    detector, data: bytes, priority: str, camera_id: str | None = None
+) -> Tuple[list, GateDecision | None]:
+    """
+    Run the detector through the priority scheduler, counted in the inference queue depth.
+
+    The scheduler feeds the inference pool, sized by the CPU plan
+    (``utils.cpu_planner``), so concurrent uploads queue for the model by
+    priority instead of oversubscribing torch's threads. With motion gating
+    enabled, static frames skip the queue entirely and frames with a small
+    changed area are inferred on that region only.
+    """
+    gate = get_motion_gate()
+    decision = await run_in_threadpool(_gate_frame, gate, data, camera_id) if gate is not None else None
+    if decision is not None and decision.action == SKIPPED:
+        return [], decision
+    region = decision.region if decision is not None else None
+    predict = partial(detector.predict_bytes, region=region) if region is not None else detector.predict_bytes
+
+    INFERENCE_QUEUE_DEPTH.inc()
+    try:
+        return await get_inference_scheduler().run(predict, data, priority=priority), decision
+    except InferenceDeadlineExceeded as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    finally:
+        INFERENCE_QUEUE_DEPTH.dec()
+
+
+def upload_priority(
+    priority: str | None = Form(None, description="realtime, normal or backfill"),
+    x_client_id: str | None = Header(None),
+) -> str:
+    """Inference priority of an upload: form value, else the client's configured class, else normal."""
+    try:
+        return resolve_priority(priority, x_client_id, get_client_priorities())
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+def resolve_coordinates(
+    gps_lat: str | None, gps_lng: str | None, metadata: ImageMetadata
+) -> Tuple[float | None, float | None, str | None]:
+    """
+    Pick the coordinates for an upload: form values win, EXIF GPS fills in.
+
+    Returns:
+        tuple: (lat, lng, source) where source is 'form', 'exif' or None
+    """
+    if gps_lat and gps_lng:
+        return float(gps_lat), float(gps_lng), "form"
+    if metadata.gps is not None:
+        return metadata.lat, metadata.lng, "exif"
+    return None, None, None
+
+
 @router.post("/upload/")
 async def upload_image(
     file: UploadFile = File(...),
     gps_lat: str | None = Form(None),
     gps_lng: str | None = Form(None),
+    camera_id: str | None = Form(None),
+    priority: str = Depends(upload_priority),
+    db: Session = Depends(get_db),
+    detector=Depends(upload_detector),
 ):
     """
     Upload and process an image for rhino detection.
     
+    The upload is read into memory once. Storing it in the content-addressed
+    image store (identical uploads are stored once), running the detector and
+    extracting EXIF metadata all work on that buffer concurrently. Form
+    coordinates take precedence; when they are missing the EXIF GPS position
+    is used instead. The position is labelled with its park zone.
+
+    Detections from a known camera (form value, else the EXIF camera ID) are
+    linked to tracks across frames; only detections that open a track or
+    improve its best confidence are stored. The alert rules then raise at
+    most one alert per rule and track, in the same transaction.
+
+    Inference is queued by priority (see ``utils.inference_scheduler``):
+    live feeds go before normal uploads and backfill. A realtime upload
+    that waits past its deadline is dropped with 503. With motion gating
+    (``MOTION_GATE_ENABLED``), frames matching their camera's background
+    skip inference (``motion_gate`` in the response says what was done).
+    
     Args:
         file: The image file to process
         gps_lat: Optional GPS latitude
         gps_lng: Optional GPS longitude
+        camera_id: Optional camera identifier
+        priority: Optional inference priority (realtime, normal, backfill);
+            defaults to the X-Client-Id header's configured class, else normal
         
     Returns:
         JSON response with detection results
     """
     try:
-        await file.read()
+        with STAGE_SECONDS.time("upload_read"):
+            data = await file.read()
+        # return_exceptions: if inference fails first, the store may still be
+        # using ``db`` in its worker thread, so wait for it before the session
+        # is rolled back or closed
+        results = await asyncio.gather(
+            _run_inference(detector, data, priority, camera_id),
+            run_in_threadpool(_timed_metadata, data),
+            run_in_threadpool(get_image_store().put, db, data, file.content_type),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        (predictions, gate), (metadata, metadata_ms), image = results
+        with STAGE_SECONDS.time("postprocess"):
+            lat, lng, gps_source = resolve_coordinates(gps_lat, gps_lng, metadata)
+            zone_label = get_geofence().lookup(lat, lng)
+            # EXIF only names a camera through its body serial; a make and
+            # model is shared by many traps and must not key tracks
+            camera_id = camera_id or metadata.camera_id
+            now = datetime.utcnow()
+
+            detections = [
+                Detection(
+                    class_name=p.get("class_name") or str(p["class"]),
+                    confidence=p["confidence"],
+                    image_path=image.key,
+                    image_sha256=image.sha256,
+                    box_x1=p["box"][0], box_y1=p["box"][1], box_x2=p["box"][2], box_y2=p["box"][3],
+                    gps_lat=lat,
+                    gps_lng=lng,
+                    gps_source=gps_source,
+                    metadata_ms=metadata_ms,
+                    zone_label=zone_label,
+                    camera_id=camera_id,
+                    timestamp=now,
+                )
+                for p in predictions
+            ]
+            stored = assign_tracks(db, detections, make_tracker()) if detections else []
+        alert_ids = []
+        if detections:
+            with STAGE_SECONDS.time("db_write"):
+                acquire_refs(db, [image.sha256] * len(stored))
+                db.flush()
+                link_best_detections(detections)
+                alert_ids = get_rule_engine().process(db, detections)
+                db.commit()
+
         return {
             "status": "success",
             "message": "File uploaded successfully",
             "filename": file.filename,
-            "coordinates": {
-                "lat": float(gps_lat) if gps_lat else None,
-                "lng": float(gps_lng) if gps_lng else None,
+            "image": {
+                "sha256": image.sha256,
+                "size": image.size,
+                "deduplicated": image.deduplicated,
             },
-            "detections": [],
+            "coordinates": {"lat": lat, "lng": lng, "source": gps_source},
+            "zone_label": zone_label,
+            "metadata_ms": round(metadata_ms, 3),
+            "motion_gate": gate.as_dict() if gate is not None else None,
+            "detections": [
+                {
+                    "id": d.id,
+                    "class_name": d.class_name,
+                    "confidence": d.confidence,
+                    "box": [d.box_x1, d.box_y1, d.box_x2, d.box_y2],
+                    "track_id": d.track_id,
+                }
+                for d in detections
+            ],
+            "alerts": alert_ids,
         }
+    except HTTPException:
+        raise
     except Exception as e:
+        db.rollback()
         raise HTTPException(status_code=400, detail=str(e))
 
-@router.get("/detections/")
-def get_detections(limit: int = 20, class_name: str | None = None):
+# Columns returned by GET /detections/, in response key order
+DETECTION_LIST_FIELDS = (
+    "id", "class_name", "confidence", "image_path", "gps_lat", "gps_lng", "zone_label", "timestamp",
+)
+_DETECTION_LIST_COLUMNS = tuple(getattr(Detection, name) for name in DETECTION_LIST_FIELDS)
+
+
+def detection_filters(
+    class_name: str | None = None,
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+) -> list:
+    """Build WHERE conditions for the detection list filters."""
+    conditions = []
+    if class_name:
+        conditions.append(Detection.class_name == class_name)
+    if date_from:
+        conditions.append(Detection.timestamp >= date_from)
+    if date_to:
+        conditions.append(Detection.timestamp <= date_to)
+    return conditions
+
+
+@router.get("/detections/", response_class=FastJSONResponse)
+def get_detections(
+    request: Request,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    class_name: str | None = None,
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+    db: Session = Depends(get_db),
+):
     """
     Retrieve detection records with optional filtering.
     
     Args:
         limit: Maximum number of records to return
+        offset: Number of records to skip
         class_name: Optional class name filter
+        date_from: Only return detections at or after this time
+        date_to: Only return detections at or before this time
         
     Returns:
-        JSON response with detection records
+        JSON response with detection records, or 304 if the client's
+        ETag is still current
     """
-    return {"detections": [], "total": 0}
\ No newline at end of file
+    headers = cache_headers(db, Detection.__tablename__)
+    cached = not_modified(request, headers)
+    if cached is not None:
+        return cached
+
+    conditions = detection_filters(class_name, date_from, date_to)
+    total = db.execute(select(func.count()).select_from(Detection).where(*conditions)).scalar_one()
+    rows = db.execute(
+        select(*_DETECTION_LIST_COLUMNS)
+        .where(*conditions)
+        .order_by(desc(Detection.timestamp))
+        .offset(offset)
+        .limit(limit)
+    ).all()
+
+    return FastJSONResponse(
+        {"detections": [dict(zip(DETECTION_LIST_FIELDS, row)) for row in rows], "total": total},
+        headers=headers,
+    )
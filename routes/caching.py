@@ -0,0 +1,57 @@
+"""
+HTTP Caching Helpers
+
+Weak ETag support for list endpoints. The ETag is derived from the per-table
+change counter maintained by ``database.versions``, so a conditional GET can
+be answered with ``304 Not Modified`` without running the list query.
+"""
+
+from typing import Dict, Optional
+
+from fastapi import Request, Response
+from sqlalchemy.orm import Session
+
+from database.versions import get_table_version
+from utils.metrics import CACHE_REQUESTS
+
+
+def make_etag(table_name: str, version: int) -> str:
+    """Build the weak ETag for a table at a given change version."""
+    return f'W/"{table_name}-{version}"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag (RFC 9110)."""
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
+
+
+def cache_headers(db: Session, table_name: str) -> Dict[str, str]:
+    """
+    Validator headers for a list endpoint backed by ``table_name``.
+
+    Costs one primary-key lookup on ``table_versions``.
+    """
+    return {
+        "ETag": make_etag(table_name, get_table_version(db, table_name)),
+        "Cache-Control": "no-cache",
+    }
+
+
+def not_modified(request: Request, headers: Dict[str, str]) -> Optional[Response]:
+    """
+    Return a ``304 Not Modified`` response if the client's If-None-Match
+    matches the ETag in ``headers``; otherwise None. The route should return
+    the 304 as-is and attach ``headers`` to its full response otherwise.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, headers["ETag"]):
+        CACHE_REQUESTS.inc("etag", "hit")
+        return Response(status_code=304, headers=headers)
+    CACHE_REQUESTS.inc("etag", "miss")
+    return None
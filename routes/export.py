@@ -0,0 +1,88 @@
+"""
+Export Routes Module
+
+Streams bulk exports of detections and alerts as Parquet, Arrow IPC or
+gzip-compressed CSV, with the same filters as the list endpoints. The
+response body is produced chunk by chunk from a server-side cursor, so
+exports of any size run in constant memory.
+"""
+
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from database.db import get_db
+from database.export import EXPORT_FORMATS, iter_export
+from .alerts import alert_filters
+from .api import detection_filters
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+FORMAT_PATTERN = "^(" + "|".join(fmt.replace(".", r"\.") for fmt in EXPORT_FORMATS) + ")$"
+
+
+def _stream(db: Session, table_name: str, fmt: str, conditions: list) -> StreamingResponse:
+    if fmt != "csv.gz":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise HTTPException(status_code=501, detail=f"{fmt} export requires pyarrow; use format=csv.gz")
+
+    # The request session is closed before the body is streamed, so the
+    # generator reads through its own session on the same engine
+    bind = db.get_bind()
+
+    def body():
+        with Session(bind=bind) as session:
+            yield from iter_export(session, table_name, fmt, conditions)
+
+    media_type, extension = EXPORT_FORMATS[fmt]
+    filename = f"{table_name}-{datetime.utcnow():%Y%m%dT%H%M%S}.{extension}"
+    return StreamingResponse(
+        body(), media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/detections")
+def export_detections(
+    format: str = Query("parquet", pattern=FORMAT_PATTERN, description="parquet, arrow or csv.gz"),
+    class_name: str | None = None,
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+    db: Session = Depends(get_db),
+):
+    """
+    Stream all detections matching the filters.
+
+    Args:
+        format: Output format
+        class_name: Optional class name filter
+        date_from: Only detections at or after this time
+        date_to: Only detections at or before this time
+
+    Returns:
+        Streamed file attachment
+    """
+    return _stream(db, "detections", format, detection_filters(class_name, date_from, date_to))
+
+
+@router.get("/alerts")
+def export_alerts(
+    format: str = Query("parquet", pattern=FORMAT_PATTERN, description="parquet, arrow or csv.gz"),
+    status: str | None = None,
+    db: Session = Depends(get_db),
+):
+    """
+    Stream all alerts matching the filters.
+
+    Args:
+        format: Output format
+        status: Optional status filter
+
+    Returns:
+        Streamed file attachment
+    """
+    return _stream(db, "alerts", format, alert_filters(status))
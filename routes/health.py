@@ -0,0 +1,132 @@
+"""
+Health Probe Routes Module
+
+Liveness and readiness probes for orchestrators.
+
+- ``/health/live`` only shows that the process answers requests; it touches
+  no dependencies, so a slow database never gets a healthy worker restarted.
+- ``/health/ready`` checks the database, that the detection model is loaded,
+  inference queue saturation and the notification backlog, and answers 503
+  when any check fails so traffic is routed elsewhere.
+
+Readiness results are cached for ``HEALTH_CACHE_SECONDS``: however often the
+orchestrator probes, the checks run at most once per interval per worker,
+and concurrent probes wait for the one running check instead of repeating it.
+"""
+
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Optional, Tuple
+
+from fastapi import APIRouter, Depends
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from config import HEALTH_CACHE_SECONDS, HEALTH_MAX_INFERENCE_QUEUE, HEALTH_MAX_NOTIFICATION_BACKLOG
+from database.db import get_db
+from models.yolo_detector import get_detector
+from utils.metrics import INFERENCE_QUEUE_DEPTH, NOTIFICATION_BACKLOG
+from .responses import FastJSONResponse
+
+router = APIRouter(prefix="/health", tags=["health"])
+
+_STARTED = time.monotonic()
+
+
+class ProbeCache:
+    """
+    Reuse a probe result for ``ttl`` seconds.
+
+    Args:
+        ttl: Seconds a result stays valid
+        clock: Monotonic time source (injectable for tests)
+    """
+
+    def __init__(self, ttl: float, clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._result: Optional[Dict] = None
+        self._expires = 0.0
+
+    def get(self, probe: Callable[[], Dict]) -> Tuple[Dict, bool]:
+        """Return ``(result, cached)``, running ``probe`` only if the cached result expired."""
+        with self._lock:
+            if self._result is not None and self._clock() < self._expires:
+                return self._result, True
+            self._result = probe()
+            self._expires = self._clock() + self.ttl
+            return self._result, False
+
+    def clear(self) -> None:
+        with self._lock:
+            self._result = None
+
+
+readiness_cache = ProbeCache(HEALTH_CACHE_SECONDS)
+
+
+def _check_database(db: Session) -> Dict:
+    started = time.perf_counter()
+    try:
+        db.execute(text("SELECT 1"))
+    except Exception as e:
+        return {"ok": False, "error": str(e)}
+    return {"ok": True, "latency_ms": round((time.perf_counter() - started) * 1000.0, 3)}
+
+
+def _check_model() -> Dict:
+    # Report whether the model is loaded without loading it: a load (torch
+    # import, weights) is far too heavy for a probe. Startup warm-up loads
+    # it, and a failed load is retried by the next upload.
+    if get_detector.cache_info().currsize == 0:
+        return {"ok": False, "error": "detection model not loaded"}
+    return {"ok": True}
+
+
+def _check_limit(value: float, limit: int) -> Dict:
+    return {"ok": value <= limit, "value": int(value), "limit": limit}
+
+
+def run_readiness_checks(db: Session) -> Dict:
+    """Run every readiness check and summarise them."""
+    checks = {
+        "database": _check_database(db),
+        "model": _check_model(),
+        "inference_queue": _check_limit(INFERENCE_QUEUE_DEPTH.value(), HEALTH_MAX_INFERENCE_QUEUE),
+        "notification_backlog": _check_limit(NOTIFICATION_BACKLOG.value(), HEALTH_MAX_NOTIFICATION_BACKLOG),
+    }
+    return {
+        "status": "ready" if all(check["ok"] for check in checks.values()) else "not_ready",
+        "checked_at": datetime.utcnow().isoformat(),
+        "checks": checks,
+    }
+
+
+@router.get("/live", response_class=FastJSONResponse)
+def live():
+    """
+    Liveness probe.
+
+    Returns:
+        JSON with ``status`` and process ``uptime_seconds``
+    """
+    return FastJSONResponse({"status": "alive", "uptime_seconds": round(time.monotonic() - _STARTED, 3)})
+
+
+@router.get("/ready", response_class=FastJSONResponse)
+def ready(db: Session = Depends(get_db)):
+    """
+    Readiness probe.
+
+    Returns:
+        JSON with the overall ``status``, per-check results, when they were
+        taken and whether they came from the cache; 503 if not ready
+    """
+    result, cached = readiness_cache.get(lambda: run_readiness_checks(db))
+    return FastJSONResponse(
+        {**result, "cached": cached},
+        status_code=200 if result["status"] == "ready" else 503,
+        headers={"Cache-Control": "no-store"},
+    )
@@ -0,0 +1,130 @@
+"""
+Image Routes Module
+
+Serves dashboard previews of stored images and crops of detection bounding
+boxes. Renders are cached in a size-capped LRU disk cache and sent with
+validators and long-lived cache headers: thumbnails are addressed by content
+hash and therefore immutable.
+"""
+
+from functools import lru_cache
+from io import BytesIO
+
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request, Response
+from sqlalchemy.orm import Session
+
+from config import THUMBNAIL_CACHE_DIR, THUMBNAIL_CACHE_MAX_BYTES
+from database.db import get_db
+from database.models import Detection
+from storage.disk_cache import DiskLRUCache
+from storage.image_store import get_image_store
+from utils.metrics import CACHE_REQUESTS
+from utils.thumbnails import THUMBNAIL_SIZES, render_crop, render_thumbnail
+from .caching import not_modified
+
+router = APIRouter(tags=["images"])
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+CROP_MAX_AGE = "public, max-age=86400"
+
+
+@lru_cache(maxsize=1)
+def get_thumbnail_cache() -> DiskLRUCache:
+    """Process-wide thumbnail cache built from configuration."""
+    return DiskLRUCache(THUMBNAIL_CACHE_DIR, THUMBNAIL_CACHE_MAX_BYTES)
+
+
+def _check_size(size: int) -> int:
+    if size not in THUMBNAIL_SIZES:
+        raise HTTPException(status_code=422, detail=f"size must be one of {list(THUMBNAIL_SIZES)}")
+    return size
+
+
+def _open_source(db: Session, sha256: str):
+    """Seekable stream of a stored image, straight from disk when possible."""
+    store = get_image_store()
+    try:
+        path = store.local_path(db, sha256)
+        if path is not None:
+            return open(path, "rb")
+        with store.open(db, sha256) as fh:
+            return BytesIO(fh.read())
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Image {sha256} not found")
+
+
+def _serve(request: Request, cache_key: str, headers: dict, render) -> Response:
+    cached = not_modified(request, headers)
+    if cached is not None:
+        return cached
+
+    cache = get_thumbnail_cache()
+    body = cache.get(cache_key)
+    CACHE_REQUESTS.inc("thumbnail", "miss" if body is None else "hit")
+    if body is None:
+        body = render()
+        cache.put(cache_key, body)
+    return Response(content=body, media_type="image/jpeg", headers=headers)
+
+
+@router.get("/images/{sha256}/thumbnail")
+def get_thumbnail(
+    request: Request,
+    sha256: str = Path(..., pattern="^[0-9a-f]{64}$", description="Content hash of the image"),
+    size: int = Query(256, description="Longest edge in pixels (128, 256 or 512)"),
+    db: Session = Depends(get_db),
+):
+    """
+    Return a JPEG preview of a stored image.
+
+    Args:
+        sha256: Content hash returned by /upload/
+        size: Longest edge of the preview
+
+    Returns:
+        JPEG image, or 304 if the client's ETag matches
+    """
+    _check_size(size)
+    headers = {"ETag": f'"{sha256}-t{size}"', "Cache-Control": IMMUTABLE}
+
+    def render():
+        with _open_source(db, sha256) as fp:
+            return render_thumbnail(fp, size)
+
+    return _serve(request, f"thumb:{sha256}:{size}", headers, render)
+
+
+@router.get("/detections/{detection_id}/crop")
+def get_detection_crop(
+    request: Request,
+    detection_id: int,
+    size: int = Query(256, description="Longest edge in pixels (128, 256 or 512)"),
+    db: Session = Depends(get_db),
+):
+    """
+    Return a JPEG crop of a detection's bounding box.
+
+    Args:
+        detection_id: ID of the detection
+        size: Longest edge of the crop
+
+    Returns:
+        JPEG image, or 304 if the client's ETag matches
+    """
+    _check_size(size)
+    detection = db.get(Detection, detection_id)
+    if detection is None:
+        raise HTTPException(status_code=404, detail=f"Detection {detection_id} not found")
+    box = (detection.box_x1, detection.box_y1, detection.box_x2, detection.box_y2)
+    if not detection.image_sha256 or None in box:
+        raise HTTPException(status_code=404, detail=f"Detection {detection_id} has no stored image or box")
+
+    sha256 = detection.image_sha256
+    box_tag = ",".join(f"{v:.1f}" for v in box)
+    headers = {"ETag": f'"{sha256[:16]}-c{size}-{box_tag}"', "Cache-Control": CROP_MAX_AGE}
+
+    def render():
+        with _open_source(db, sha256) as fp:
+            return render_crop(fp, box, size)
+
+    return _serve(request, f"crop:{sha256}:{box_tag}:{size}", headers, render)
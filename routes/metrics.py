@@ -0,0 +1,75 @@
+"""
+Metrics Routes Module
+
+Exposes the in-process metrics of ``utils.metrics`` in the Prometheus text
+format, plus gauges for the database connection pool that are read from
+the engine at scrape time and the worker's CPU thread plan.
+"""
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from database.db import engine
+from utils.cpu_planner import get_cpu_plan
+from utils.metrics import Gauge, render_metrics
+
+router = APIRouter(tags=["metrics"])
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _pool_stat(name: str):
+    def read():
+        stat = getattr(engine.pool, name, None)
+        return stat() if callable(stat) else None
+    return read
+
+
+DB_POOL_CHECKED_OUT = Gauge(
+    "rhinoguardians_db_pool_checked_out",
+    "Database connections currently checked out of the pool.",
+    function=_pool_stat("checkedout"),
+)
+DB_POOL_SIZE = Gauge(
+    "rhinoguardians_db_pool_size",
+    "Configured size of the database connection pool.",
+    function=_pool_stat("size"),
+)
+
+
+def _plan_value(name: str):
+    return lambda: getattr(get_cpu_plan(), name)
+
+
+CPU_AVAILABLE = Gauge(
+    "rhinoguardians_cpu_available",
+    "CPUs available to the host or container (affinity capped by the cgroup quota).",
+    function=_plan_value("cpus"),
+)
+TORCH_INTRA_OP_THREADS = Gauge(
+    "rhinoguardians_torch_intra_op_threads",
+    "Planned torch intra-op threads of this worker.",
+    function=_plan_value("intra_op_threads"),
+)
+TORCH_INTER_OP_THREADS = Gauge(
+    "rhinoguardians_torch_inter_op_threads",
+    "Planned torch inter-op threads of this worker.",
+    function=_plan_value("inter_op_threads"),
+)
+INFERENCE_POOL_SIZE = Gauge(
+    "rhinoguardians_inference_pool_size",
+    "Threads of this worker's inference pool.",
+    function=_plan_value("inference_pool_size"),
+)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """
+    Prometheus scrape endpoint.
+
+    Returns:
+        Text exposition of stage latency histograms, inference queue depth,
+        DB pool, cache hit ratio and CPU thread plan gauges
+    """
+    return PlainTextResponse(render_metrics(), media_type=PROMETHEUS_CONTENT_TYPE)
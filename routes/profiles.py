@@ -0,0 +1,74 @@
+"""
+Profile Routes Module
+
+Lists and downloads request profiles recorded by the profiling middleware
+(see ``utils.profiling``). Only mounted when ``PROFILING_ENABLED`` is set.
+Profiles reveal request paths, query strings and code, so every endpoint
+requires ``Authorization: Bearer <PROFILE_TOKEN>``; without a configured
+token they always answer 401.
+"""
+
+import secrets
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Security
+from fastapi.responses import PlainTextResponse
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+
+from config import PROFILE_TOKEN
+from utils.profiling import ProfileStore, get_profile_store, to_folded
+from .responses import FastJSONResponse
+
+# auto_error=False so we can return 401 for missing token instead of 403
+security = HTTPBearer(auto_error=False)
+
+
+def require_profile_token(credentials: HTTPAuthorizationCredentials = Security(security)) -> None:
+    """Reject requests without the configured ``PROFILE_TOKEN``."""
+    if not PROFILE_TOKEN or not credentials or not secrets.compare_digest(credentials.credentials, PROFILE_TOKEN):
+        raise HTTPException(status_code=401, detail="Invalid authentication token")
+
+
+router = APIRouter(prefix="/profiles", tags=["profiles"], dependencies=[Depends(require_profile_token)])
+
+
+@router.get("/", response_class=FastJSONResponse)
+def list_profiles(store: ProfileStore = Depends(get_profile_store)):
+    """
+    List stored profiles, newest first.
+
+    Returns:
+        JSON with ``profiles`` as ``{name, created_at, method, path, status,
+        duration_ms, samples}``
+    """
+    return FastJSONResponse({"profiles": store.list()})
+
+
+@router.get("/{name}")
+def get_profile(
+    name: str,
+    format: str = Query("json", pattern="^(json|folded)$", description="json or folded stacks"),
+    store: ProfileStore = Depends(get_profile_store),
+):
+    """
+    Download one profile.
+
+    Args:
+        name: Profile name (the ``X-Profile-Id`` response header)
+        format: ``json`` (metadata and stacks) or ``folded`` (flame graph input)
+
+    Returns:
+        The profile as an attachment
+    """
+    try:
+        profile = store.load(name)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    if profile is None:
+        raise HTTPException(status_code=404, detail=f"Profile {name} not found")
+
+    if format == "folded":
+        return PlainTextResponse(
+            to_folded(profile),
+            headers={"Content-Disposition": f'attachment; filename="{name}.folded"'},
+        )
+    return FastJSONResponse(profile, headers={"Content-Disposition": f'attachment; filename="{name}.json"'})
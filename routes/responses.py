@@ -0,0 +1,41 @@
+"""
+Response Classes Module
+
+Fast JSON rendering for hot list endpoints. Routes build plain dicts from
+column tuples and return a ``FastJSONResponse`` directly, skipping FastAPI's
+response validation and ``jsonable_encoder`` pass.
+"""
+
+import json
+from datetime import date, datetime
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+
+def _json_default(value: Any) -> Any:
+    """Fallback encoder for types the stdlib json module can't handle."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson when installed.
+
+    Datetimes are emitted in ISO 8601, matching ``datetime.isoformat()``.
+    Falls back to the stdlib encoder when orjson is unavailable.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(
+            content, default=_json_default, ensure_ascii=False, separators=(",", ":")
+        ).encode("utf-8")
@@ -6,7 +6,7 @@ in the RhinoGuardians API.
 """
 
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 from enum import Enum
 from datetime import datetime
 
@@ -38,7 +38,9 @@ class AlertStatus(str, Enum):
 class Location(BaseModel):
     lat: float = Field(..., description="Latitude of the alert location")
     lng: float = Field(..., description="Longitude of the alert location")
-    zoneLabel: str = Field(..., description="Label of the zone where alert was triggered")
+    zoneLabel: Optional[str] = Field(
+        None, description="Label of the zone where alert was triggered (looked up from lat/lng if omitted)"
+    )
 
 
 class AlertTriggerRequest(BaseModel):
@@ -67,4 +69,30 @@ class AlertResponse(BaseModel):
 
 
 class UpdateStatusRequest(BaseModel):
-    status: str
\ No newline at end of file
+    status: str
+
+
+class AlertFilter(BaseModel):
+    status: Optional[str] = Field(None, description="Only alerts currently in this status")
+    zone_label: Optional[str] = Field(None, description="Only alerts in this zone")
+    detection_id: Optional[str] = Field(None, description="Only alerts for this detection")
+
+
+class BulkUpdateStatusRequest(BaseModel):
+    status: str = Field(..., description="New status for every matched alert")
+    alert_ids: Optional[List[str]] = Field(
+        None, min_length=1, max_length=1000, description="Alert IDs to update"
+    )
+    filter: Optional[AlertFilter] = Field(None, description="Select alerts by filter instead of IDs")
+
+
+class BulkUpdateResult(BaseModel):
+    id: str
+    updated: bool
+    status: Optional[str] = None
+    error: Optional[str] = None
+
+
+class BulkUpdateStatusResponse(BaseModel):
+    updated: int
+    results: List[BulkUpdateResult]
@@ -0,0 +1,145 @@
+"""
+Statistics Routes Module
+
+Dashboard aggregates served exclusively from the hourly rollup tables
+maintained by ``database.rollups``; these endpoints never scan
+``detections``. Responses carry the detections table ETag, so unchanged
+dashboards revalidate with a 304.
+"""
+
+from collections import defaultdict
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, Query, Request
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from config import ROLLUP_CELL_DEGREES
+from database.db import get_db
+from database.models import Detection, DetectionCellRollup, DetectionCountRollup
+from .caching import cache_headers, not_modified
+from .responses import FastJSONResponse
+
+router = APIRouter(prefix="/stats", tags=["stats"])
+
+
+def _rollup_filters(model, date_from, date_to, class_name) -> list:
+    conditions = []
+    if date_from:
+        conditions.append(model.bucket >= date_from.replace(minute=0, second=0, microsecond=0))
+    if date_to:
+        conditions.append(model.bucket <= date_to)
+    if class_name:
+        conditions.append(model.class_name == class_name)
+    return conditions
+
+
+@router.get("/timeseries", response_class=FastJSONResponse)
+def get_timeseries(
+    request: Request,
+    interval: str = Query("hour", pattern="^(hour|day)$", description="Bucket size"),
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+    class_name: str | None = None,
+    zone_label: str | None = None,
+    db: Session = Depends(get_db),
+):
+    """
+    Detections per time bucket, class and zone.
+
+    Args:
+        interval: ``hour`` or ``day`` buckets (UTC)
+        date_from: Only buckets starting at or after this hour
+        date_to: Only buckets starting at or before this time
+        class_name: Optional class filter
+        zone_label: Optional zone filter
+
+    Returns:
+        JSON with ``series`` rows ``{bucket, class_name, zone_label, count,
+        avg_confidence}`` ordered by bucket; ``zone_label`` is null outside
+        every zone
+    """
+    headers = cache_headers(db, Detection.__tablename__)
+    cached = not_modified(request, headers)
+    if cached is not None:
+        return cached
+
+    conditions = _rollup_filters(DetectionCountRollup, date_from, date_to, class_name)
+    if zone_label is not None:
+        conditions.append(DetectionCountRollup.zone_label == zone_label)
+    rows = db.execute(
+        select(
+            DetectionCountRollup.bucket,
+            DetectionCountRollup.class_name,
+            DetectionCountRollup.zone_label,
+            func.sum(DetectionCountRollup.count),
+            func.sum(DetectionCountRollup.confidence_sum),
+        )
+        .where(*conditions)
+        .group_by(DetectionCountRollup.bucket, DetectionCountRollup.class_name, DetectionCountRollup.zone_label)
+        .order_by(DetectionCountRollup.bucket)
+    ).all()
+
+    totals = defaultdict(lambda: [0, 0.0])
+    for bucket, cls, zone, count, confidence_sum in rows:
+        if interval == "day":
+            bucket = bucket.replace(hour=0)
+        entry = totals[(bucket, cls, zone)]
+        entry[0] += count
+        entry[1] += confidence_sum
+
+    series = [
+        {
+            "bucket": bucket,
+            "class_name": cls,
+            "zone_label": zone or None,
+            "count": count,
+            "avg_confidence": round(confidence_sum / count, 4) if count else None,
+        }
+        for (bucket, cls, zone), (count, confidence_sum) in sorted(
+            totals.items(), key=lambda item: (item[0][0], item[0][1], item[0][2])
+        )
+    ]
+    return FastJSONResponse({"interval": interval, "series": series}, headers=headers)
+
+
+@router.get("/heatmap", response_class=FastJSONResponse)
+def get_heatmap(
+    request: Request,
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+    class_name: str | None = None,
+    db: Session = Depends(get_db),
+):
+    """
+    Detection density on a lat/lng grid.
+
+    Args:
+        date_from: Only hours starting at or after this time
+        date_to: Only hours starting at or before this time
+        class_name: Optional class filter
+
+    Returns:
+        JSON with ``cell_degrees``, the densest cell's ``max`` count and
+        ``cells`` as ``{lat, lng, count}`` at each cell's centre
+    """
+    headers = cache_headers(db, Detection.__tablename__)
+    cached = not_modified(request, headers)
+    if cached is not None:
+        return cached
+
+    rows = db.execute(
+        select(DetectionCellRollup.cell_x, DetectionCellRollup.cell_y, func.sum(DetectionCellRollup.count))
+        .where(*_rollup_filters(DetectionCellRollup, date_from, date_to, class_name))
+        .group_by(DetectionCellRollup.cell_x, DetectionCellRollup.cell_y)
+    ).all()
+
+    size = ROLLUP_CELL_DEGREES
+    cells = [
+        {"lat": round((y + 0.5) * size, 6), "lng": round((x + 0.5) * size, 6), "count": count}
+        for x, y, count in rows
+    ]
+    return FastJSONResponse(
+        {"cell_degrees": size, "max": max((c["count"] for c in cells), default=0), "cells": cells},
+        headers=headers,
+    )
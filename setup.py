@@ -18,7 +18,9 @@ setup(
         "python-dotenv",
         "pillow",
         "psycopg2-binary",
-        "ultralytics"
+        "ultralytics",
+        "orjson",
+        "numpy"
     ],
     python_requires=">=3.10"
 )
\ No newline at end of file
@@ -0,0 +1,16 @@
+"""
+Storage module for RhinoGuardians
+Content-addressed image storage with pluggable backends
+"""
+
+from storage.backends import LocalBackend, S3Backend, StorageBackend
+from storage.image_store import ImageRef, ImageStore, get_image_store
+
+__all__ = [
+    "StorageBackend",
+    "LocalBackend",
+    "S3Backend",
+    "ImageRef",
+    "ImageStore",
+    "get_image_store",
+]
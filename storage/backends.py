@@ -0,0 +1,137 @@
+"""
+Storage Backends Module
+
+Blob backends for the image store. A backend maps opaque keys to bytes and
+only has to support whole-object writes from a local file, streamed reads,
+existence checks and deletes. Atomicity comes from the write primitive: the
+local backend renames a fully written file into place, and S3-compatible
+object stores only make an object visible once the upload completes.
+"""
+
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import BinaryIO, Optional
+
+
+class StorageBackend:
+    """Interface implemented by every blob backend."""
+
+    def staging_dir(self) -> str:
+        """Directory for spooling new blobs; ideally on the same device as the store."""
+        return tempfile.gettempdir()
+
+    def put_file(self, key: str, path: str) -> None:
+        """Atomically store the file at ``path`` under ``key``, consuming the file."""
+        raise NotImplementedError
+
+    def open(self, key: str) -> BinaryIO:
+        """Open a blob for streamed reading. Raises FileNotFoundError if missing."""
+        raise NotImplementedError
+
+    def exists(self, key: str) -> bool:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        """Delete a blob; missing keys are ignored."""
+        raise NotImplementedError
+
+    def local_path(self, key: str) -> Optional[str]:
+        """Filesystem path of a blob, if the backend keeps one (else None)."""
+        return None
+
+
+class LocalBackend(StorageBackend):
+    """Blobs stored as files under a root directory."""
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self._staging = self.root / ".staging"
+        self._staging.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        return self.root / key
+
+    def staging_dir(self) -> str:
+        return str(self._staging)
+
+    def put_file(self, key: str, path: str) -> None:
+        dest = self._path(key)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.replace(path, dest)
+        except OSError:
+            # Staging on another device: copy next to the target, then rename
+            tmp = dest.with_name(dest.name + ".tmp")
+            shutil.copyfile(path, tmp)
+            os.replace(tmp, dest)
+            os.unlink(path)
+
+    def open(self, key: str) -> BinaryIO:
+        return open(self._path(key), "rb")
+
+    def exists(self, key: str) -> bool:
+        return self._path(key).is_file()
+
+    def delete(self, key: str) -> None:
+        self._path(key).unlink(missing_ok=True)
+
+    def local_path(self, key: str) -> Optional[str]:
+        return str(self._path(key))
+
+
+def _is_not_found(exc: Exception) -> bool:
+    """True for botocore-style ClientErrors that mean 'no such key'."""
+    error = getattr(exc, "response", {}).get("Error", {})
+    return str(error.get("Code")) in ("404", "NoSuchKey", "NotFound")
+
+
+class S3Backend(StorageBackend):
+    """
+    Blobs stored in an S3-compatible bucket (AWS S3, MinIO, Ceph, ...).
+
+    Works with any client exposing the boto3 ``upload_file``, ``get_object``,
+    ``head_object`` and ``delete_object`` calls, so tests can pass an
+    in-process stand-in instead of a real endpoint.
+    """
+
+    def __init__(self, client, bucket: str, prefix: str = ""):
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix.strip("/") + "/" if prefix.strip("/") else ""
+
+    @classmethod
+    def from_config(cls, bucket: str, prefix: str = "", endpoint_url: Optional[str] = None):
+        """Build a backend with a boto3 client (boto3 is imported lazily)."""
+        import boto3
+
+        return cls(boto3.client("s3", endpoint_url=endpoint_url or None), bucket, prefix)
+
+    def _key(self, key: str) -> str:
+        return self.prefix + key
+
+    def put_file(self, key: str, path: str) -> None:
+        # upload_file switches to multipart for large files and streams from disk
+        self.client.upload_file(path, self.bucket, self._key(key))
+        os.unlink(path)
+
+    def open(self, key: str) -> BinaryIO:
+        try:
+            return self.client.get_object(Bucket=self.bucket, Key=self._key(key))["Body"]
+        except Exception as e:
+            if _is_not_found(e):
+                raise FileNotFoundError(key) from e
+            raise
+
+    def exists(self, key: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._key(key))
+            return True
+        except Exception as e:
+            if _is_not_found(e):
+                return False
+            raise
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=self._key(key))
@@ -0,0 +1,88 @@
+"""
+Disk Cache Module
+
+Size-capped LRU cache of small derived files (thumbnails, crops) on local
+disk. Entries are plain files named by key; recency is tracked through the
+file mtime, which is bumped on every hit, so the cache survives restarts and
+can be shared by all workers on a host. When the total size exceeds the cap,
+the least recently used files are evicted.
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Optional
+
+
+class DiskLRUCache:
+    """
+    LRU byte cache on local disk.
+
+    Args:
+        root: Directory holding cache entries
+        max_bytes: Total size above which old entries are evicted
+    """
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._size = sum(p.stat().st_size for p in self.root.glob("*/*") if p.is_file())
+
+    def _path(self, key: str) -> Path:
+        name = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return self.root / name[:2] / name
+
+    @property
+    def size(self) -> int:
+        """Approximate bytes currently held (exact within one process)."""
+        return self._size
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return cached bytes for ``key`` and mark it recently used, or None."""
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        """Store ``data`` under ``key`` atomically, then evict down to the cap."""
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+        try:
+            previous = path.stat().st_size
+        except FileNotFoundError:
+            previous = 0
+        os.replace(tmp, path)
+        with self._lock:
+            self._size += len(data) - previous
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        """Delete least recently used entries until under 90% of the cap."""
+        entries = []
+        for p in self.root.glob("*/*"):
+            try:
+                st = p.stat()
+            except FileNotFoundError:
+                continue
+            if p.suffix != ".tmp":
+                entries.append((st.st_mtime, st.st_size, p))
+        entries.sort()
+        self._size = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * 0.9)
+        for _, size, p in entries:
+            if self._size <= target:
+                break
+            p.unlink(missing_ok=True)
+            self._size -= size
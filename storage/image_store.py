@@ -0,0 +1,271 @@
+"""
+Image Store Module
+
+Content-addressed storage for uploaded images. Blobs are keyed by the SHA-256
+of their bytes and laid out in a two-level sharded tree (``ab/cd/abcd...``),
+so identical frames from retried uploads are stored once. Each blob has a row
+in the ``images`` table carrying a reference count of the detections that
+point at it; unreferenced blobs are deleted by ``collect_garbage`` once they
+are older than a grace period.
+
+Uploads are streamed through a hashing spool file on the backend's staging
+area and then atomically moved (or uploaded) into place. Optionally, blobs
+older than ``IMAGE_COLD_AFTER_DAYS`` can be gzip-compressed into a cold tier.
+"""
+
+import gzip
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import BinaryIO, Dict, Iterable, Optional, Union
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from config import (
+    IMAGE_COLD_AFTER_DAYS,
+    IMAGE_COLD_STORAGE_DIR,
+    IMAGE_GC_GRACE_SECONDS,
+    IMAGE_STORAGE_BACKEND,
+    IMAGE_STORAGE_DIR,
+    S3_BUCKET,
+    S3_ENDPOINT_URL,
+    S3_PREFIX,
+)
+from database.models import StoredImage
+from storage.backends import LocalBackend, S3Backend, StorageBackend
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024
+HOT, COLD = "hot", "cold"
+
+ImageSource = Union[bytes, BinaryIO, Iterable[bytes]]
+
+
+@dataclass(frozen=True)
+class ImageRef:
+    """Result of storing an image."""
+    sha256: str
+    key: str
+    size: int
+    deduplicated: bool
+
+
+def key_for(digest: str) -> str:
+    """Sharded storage key for a hex digest: ``ab/cd/abcd...``."""
+    return f"{digest[:2]}/{digest[2:4]}/{digest}"
+
+
+def _chunks(source: ImageSource) -> Iterable[bytes]:
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        yield bytes(source)
+    elif hasattr(source, "read"):
+        while chunk := source.read(CHUNK_SIZE):
+            yield chunk
+    else:
+        yield from source
+
+
+def acquire_refs(db: Session, digests: Iterable[str]) -> None:
+    """Add one reference per occurrence of each digest. Does not commit."""
+    _adjust_refs(db, Counter(d for d in digests if d), +1)
+
+
+def release_refs(db: Session, digests: Iterable[str]) -> None:
+    """Drop one reference per occurrence of each digest. Does not commit."""
+    _adjust_refs(db, Counter(d for d in digests if d), -1)
+
+
+def _adjust_refs(db: Session, counts: Dict[str, int], sign: int) -> None:
+    now = datetime.utcnow()
+    for digest, n in counts.items():
+        db.execute(
+            update(StoredImage)
+            .where(StoredImage.sha256 == digest)
+            .values(ref_count=StoredImage.ref_count + sign * n, updated_at=now)
+        )
+
+
+class ImageStore:
+    """
+    Content-addressed image store over a hot backend and an optional cold one.
+
+    Args:
+        backend: Backend holding hot (uncompressed) blobs
+        cold_backend: Optional backend for gzip-compressed cold blobs
+    """
+
+    def __init__(self, backend: StorageBackend, cold_backend: Optional[StorageBackend] = None):
+        self.backend = backend
+        self.cold_backend = cold_backend
+
+    def _spool(self, source: ImageSource):
+        """Stream ``source`` to a staging file, hashing as it goes."""
+        sha = hashlib.sha256()
+        size = 0
+        fd, path = tempfile.mkstemp(dir=self.backend.staging_dir(), suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                for chunk in _chunks(source):
+                    sha.update(chunk)
+                    out.write(chunk)
+                    size += len(chunk)
+                out.flush()
+                os.fsync(out.fileno())
+        except BaseException:
+            os.unlink(path)
+            raise
+        return sha.hexdigest(), size, path
+
+    def put(self, db: Session, source: ImageSource, content_type: Optional[str] = None) -> ImageRef:
+        """
+        Store an image, deduplicating by content. Commits ``db``.
+
+        The ``images`` row is created (or its ``updated_at`` refreshed, which
+        keeps the blob safe from a concurrent garbage collection) and locked
+        before the blob is moved into place. New blobs start with no
+        references; callers take one per detection with ``acquire_refs``.
+        """
+        digest, size, path = self._spool(source)
+        key = key_for(digest)
+        try:
+            for attempt in range(2):
+                try:
+                    write = self._claim(db, digest, size, content_type, key)
+                    if write:
+                        self.backend.put_file(key, path)
+                    db.commit()
+                    break
+                except IntegrityError:
+                    # A concurrent upload inserted the same digest first; dedupe against it
+                    db.rollback()
+                    if attempt:
+                        raise
+                except Exception:
+                    db.rollback()
+                    raise
+        finally:
+            if os.path.exists(path):
+                os.unlink(path)
+        return ImageRef(sha256=digest, key=key, size=size, deduplicated=not write)
+
+    def _claim(self, db: Session, digest: str, size: int,
+               content_type: Optional[str], key: str) -> bool:
+        """Create or lock-and-touch the ``images`` row; True if the blob must be written."""
+        row = db.get(StoredImage, digest, with_for_update=True)
+        now = datetime.utcnow()
+        if row is None:
+            db.add(StoredImage(sha256=digest, size=size, content_type=content_type,
+                               ref_count=0, tier=HOT, created_at=now, updated_at=now))
+            db.flush()
+            return True
+        row.updated_at = now
+        # Self-heal a hot blob that went missing underneath its row
+        return row.tier == HOT and not self.backend.exists(key)
+
+    def open(self, db: Session, digest: str) -> BinaryIO:
+        """Open an image for streamed reading, decompressing cold blobs."""
+        tier = db.execute(
+            select(StoredImage.tier).where(StoredImage.sha256 == digest)
+        ).scalar_one_or_none()
+        if tier is None:
+            raise FileNotFoundError(digest)
+        if tier == COLD:
+            return gzip.GzipFile(fileobj=self.cold_backend.open(key_for(digest) + ".gz"), mode="rb")
+        return self.backend.open(key_for(digest))
+
+    def local_path(self, db: Session, digest: str) -> Optional[str]:
+        """Filesystem path of a hot blob on a local backend, else None."""
+        tier = db.execute(
+            select(StoredImage.tier).where(StoredImage.sha256 == digest)
+        ).scalar_one_or_none()
+        return self.backend.local_path(key_for(digest)) if tier == HOT else None
+
+    def collect_garbage(self, db: Session, grace_seconds: int = IMAGE_GC_GRACE_SECONDS,
+                        batch_size: int = 500) -> int:
+        """
+        Delete unreferenced blobs untouched for ``grace_seconds``.
+
+        Each row is deleted (and thereby locked) before its blob, and the
+        delete re-checks the conditions, so an upload that raced in and bumped
+        the row keeps its blob.
+
+        Returns:
+            int: Number of blobs removed
+        """
+        cutoff = datetime.utcnow() - timedelta(seconds=grace_seconds)
+        conditions = (StoredImage.ref_count <= 0, StoredImage.updated_at <= cutoff)
+        if self.cold_backend is None:
+            conditions += (StoredImage.tier == HOT,)
+        candidates = db.execute(
+            select(StoredImage.sha256, StoredImage.tier).where(*conditions).limit(batch_size)
+        ).all()
+        removed = 0
+        for digest, tier in candidates:
+            deleted = db.execute(
+                delete(StoredImage).where(StoredImage.sha256 == digest, *conditions)
+            ).rowcount
+            if deleted:
+                if tier == COLD:
+                    self.cold_backend.delete(key_for(digest) + ".gz")
+                else:
+                    self.backend.delete(key_for(digest))
+                removed += 1
+            db.commit()
+        logger.info("Image GC removed %d blobs", removed)
+        return removed
+
+    def move_to_cold(self, db: Session, older_than_days: int = IMAGE_COLD_AFTER_DAYS,
+                     batch_size: int = 100) -> int:
+        """
+        Compress hot blobs stored more than ``older_than_days`` ago into the cold tier.
+
+        No-op when no cold backend is configured.
+
+        Returns:
+            int: Number of blobs moved
+        """
+        if self.cold_backend is None:
+            return 0
+        cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+        digests = db.execute(
+            select(StoredImage.sha256)
+            .where(StoredImage.tier == HOT, StoredImage.created_at <= cutoff)
+            .limit(batch_size)
+        ).scalars().all()
+        moved = 0
+        for digest in digests:
+            key = key_for(digest)
+            fd, path = tempfile.mkstemp(dir=self.cold_backend.staging_dir(), suffix=".gz.part")
+            try:
+                with self.backend.open(key) as src, os.fdopen(fd, "wb") as raw:
+                    with gzip.GzipFile(fileobj=raw, mode="wb") as gz:
+                        shutil.copyfileobj(src, gz, CHUNK_SIZE)
+                self.cold_backend.put_file(key + ".gz", path)
+            finally:
+                if os.path.exists(path):
+                    os.unlink(path)
+            db.execute(update(StoredImage).where(StoredImage.sha256 == digest).values(tier=COLD))
+            db.commit()
+            self.backend.delete(key)
+            moved += 1
+        return moved
+
+
+@lru_cache(maxsize=1)
+def get_image_store() -> ImageStore:
+    """Process-wide image store built from configuration."""
+    if IMAGE_STORAGE_BACKEND == "s3":
+        backend = S3Backend.from_config(S3_BUCKET, S3_PREFIX, S3_ENDPOINT_URL)
+    else:
+        backend = LocalBackend(IMAGE_STORAGE_DIR)
+    cold = LocalBackend(IMAGE_COLD_STORAGE_DIR) if IMAGE_COLD_STORAGE_DIR else None
+    return ImageStore(backend, cold)
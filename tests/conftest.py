@@ -1,11 +1,13 @@
 """Test configuration for pytest"""
 import os
 import sys
+import tempfile
 import types
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 
 # Ensure project root importable
 ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
@@ -14,6 +16,13 @@ if ROOT_DIR not in sys.path:
 
 # Keep YOLO lightweight during tests
 os.environ.setdefault("SKIP_YOLO", "1")
+# Keep uploaded images out of the working tree
+os.environ.setdefault("IMAGE_STORAGE_DIR", tempfile.mkdtemp(prefix="rg-images-"))
+os.environ.setdefault("THUMBNAIL_CACHE_DIR", tempfile.mkdtemp(prefix="rg-thumbs-"))
+# No zone polygons or alert rules unless a test provides them
+_CONFIG_DIR = tempfile.mkdtemp(prefix="rg-config-")
+os.environ.setdefault("GEOFENCE_PATH", os.path.join(_CONFIG_DIR, "zones.geojson"))
+os.environ.setdefault("ALERT_RULES_PATH", os.path.join(_CONFIG_DIR, "alert_rules.json"))
 
 from main import app  # noqa: E402
 from database.db import get_db  # noqa: E402
@@ -21,7 +30,12 @@ from database.models import Base  # noqa: E402
 
 # Isolated in-memory DB for tests
 TEST_DATABASE_URL = "sqlite+pysqlite:///:memory:"
-engine = create_engine(TEST_DATABASE_URL, connect_args={"check_same_thread": False})
+# StaticPool keeps a single connection so the TestClient worker thread sees the same DB
+engine = create_engine(
+    TEST_DATABASE_URL,
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 @pytest.fixture(scope="session", autouse=True)
@@ -38,6 +52,21 @@ def test_db():
     finally:
         db.close()
 
+@pytest.fixture()
+def session_factory():
+    """Session factory bound to the test DB, for code that opens its own sessions."""
+    return TestingSessionLocal
+
+@pytest.fixture()
+def image_store(test_db, tmp_path):
+    """Local image store on a temp dir, starting from an empty images table."""
+    from database.models import StoredImage
+    from storage import ImageStore, LocalBackend
+
+    test_db.query(StoredImage).delete()
+    test_db.commit()
+    return ImageStore(LocalBackend(str(tmp_path / "images")))
+
 def override_get_db():
     db = TestingSessionLocal()
     try:
@@ -0,0 +1,79 @@
+import json
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from database.models import Alert
+from utils.alert_rules import AlertRule, RuleEngine
+
+T0 = datetime(2026, 3, 1, 20, 0)
+
+
+def _det(class_name="person", confidence=0.9, zone="Sanctuary", ts=T0, id=1):
+    return SimpleNamespace(
+        id=id, class_name=class_name, confidence=confidence, zone_label=zone,
+        timestamp=ts, gps_lat=-23.2, gps_lng=31.8,
+    )
+
+
+def _rule(**kwargs):
+    kwargs.setdefault("name", "r")
+    return AlertRule.from_dict(kwargs)
+
+
+def test_candidates_are_indexed_by_class_and_zone():
+    engine = RuleEngine([
+        _rule(name="any"),
+        _rule(name="rhino", classes=["rhino"]),
+        _rule(name="sanctuary", zones=["Sanctuary"]),
+        _rule(name="rhino-sanctuary", classes=["rhino"], zones=["Sanctuary"]),
+    ])
+    assert [r.name for r in engine.candidates("rhino", "Sanctuary")] == ["any", "rhino", "sanctuary", "rhino-sanctuary"]
+    assert [r.name for r in engine.candidates("person", "Sanctuary")] == ["any", "sanctuary"]
+    assert [r.name for r in engine.candidates("rhino", None)] == ["any", "rhino"]
+
+
+def test_confidence_and_hours_filters():
+    engine = RuleEngine([_rule(min_confidence=0.5, hours=["18:00", "06:00"])], utc_offset_minutes=120)
+    assert engine.evaluate(_det(confidence=0.4)) == []
+    assert engine.evaluate(_det(ts=T0.replace(hour=10))) == []  # 12:00 local
+    assert len(engine.evaluate(_det(ts=T0.replace(hour=2)))) == 1  # 04:00 local, wraps midnight
+
+
+def test_repeat_count_window_and_cooldown():
+    engine = RuleEngine([_rule(min_count=3, window_seconds=600, cooldown_seconds=3600)])
+    fired = [bool(engine.evaluate(_det(ts=T0 + timedelta(minutes=m)))) for m in (0, 20, 25, 28)]
+    assert fired == [False, False, False, True]  # the first sighting fell out of the window
+    # Cooldown suppresses the rule in this zone only
+    assert engine.evaluate(_det(ts=T0 + timedelta(minutes=40))) == []
+    other_zone = [engine.evaluate(_det(zone="North", ts=T0 + timedelta(minutes=m))) for m in (40, 41, 42)]
+    assert [bool(f) for f in other_zone] == [False, False, True]
+
+
+def test_upload_creates_rule_alerts(client, session_factory, tmp_path, monkeypatch):
+    from main import app
+    from routes.api import upload_detector
+    from tests.test_upload import _FakeDetector, _make_image_bytes
+
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps({"rules": [
+        {"name": "rhino-seen", "classes": ["rhino"], "type": "rhino_sighting", "severity": "low"},
+        {"name": "elephant-seen", "classes": ["elephant"]},
+    ]}))
+    monkeypatch.setattr("routes.api.get_rule_engine", lambda engine=RuleEngine.from_file(str(path)): engine)
+    app.dependency_overrides[upload_detector] = lambda: _FakeDetector()
+    try:
+        resp = client.post("/upload/", files={"file": ("r.jpg", _make_image_bytes(), "image/jpeg")})
+    finally:
+        del app.dependency_overrides[upload_detector]
+
+    assert resp.status_code == 200
+    body = resp.json()
+    [detection] = body["detections"]
+    assert body["alerts"] == [f"rule-rhino-seen-{detection['id']}"]
+    with session_factory() as db:
+        alert = db.query(Alert).filter(Alert.alert_id == body["alerts"][0]).one()
+        assert alert.detection_id == str(detection["id"])
+        assert (alert.type, alert.severity, alert.source) == ("rhino_sighting", "low", "rule:rhino-seen")
+        # The DB is shared across test modules; leave /alerts/ empty for them
+        db.delete(alert)
+        db.commit()
@@ -75,4 +75,151 @@ def test_alerts_update_status(client):
     assert upd.status_code == 200
     updated = upd.json()
     assert updated["id"] == alert_id
-    assert updated["status"] in ("ACKNOWLEDGED", "INACTIVE", "ACTIVE", "RESOLVED")
\ No newline at end of file
+    assert updated["status"] in ("ACKNOWLEDGED", "INACTIVE", "ACTIVE", "RESOLVED")
+
+def _trigger(client, detection_id, zone="Bulk Zone"):
+    payload = {
+        "detection_id": detection_id,
+        "type": "poacher_suspected",
+        "severity": "high",
+        "source": "camera_trap",
+        "location": {"lat": 0.0, "lng": 0.0, "zoneLabel": zone},
+        "createdBy": "Bulk",
+    }
+    assert client.post("/alerts/trigger", headers=AUTH, json=payload).status_code == 200
+
+
+def test_alerts_bulk_update_by_ids(client):
+    _trigger(client, "bulk_1")
+    _trigger(client, "bulk_2")
+    etag = client.get("/alerts/").headers["etag"]
+    resp = client.patch(
+        "/alerts/status",
+        json={"status": "resolved", "alert_ids": ["bulk_1", "bulk_2", "bulk_missing"]},
+    )
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["updated"] == 2
+    by_id = {r["id"]: r for r in body["results"]}
+    assert by_id["bulk_1"] == {"id": "bulk_1", "updated": True, "status": "RESOLVED", "error": None}
+    assert by_id["bulk_2"]["updated"] is True
+    assert by_id["bulk_missing"]["updated"] is False
+    assert by_id["bulk_missing"]["error"] == "not_found"
+    # Bulk UPDATE must invalidate cached listings
+    assert client.get("/alerts/", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_alerts_bulk_update_by_filter(client):
+    _trigger(client, "bulk_f1", zone="Filter Zone")
+    _trigger(client, "bulk_f2", zone="Filter Zone")
+    resp = client.patch(
+        "/alerts/status",
+        json={"status": "RESOLVED", "filter": {"zone_label": "Filter Zone"}},
+    )
+    assert resp.status_code == 200
+    assert {r["id"] for r in resp.json()["results"]} == {"bulk_f1", "bulk_f2"}
+
+
+def test_alerts_bulk_update_validation(client):
+    assert client.patch("/alerts/status", json={"status": "resolved"}).status_code == 422
+    resp = client.patch("/alerts/status", json={"status": "bogus", "alert_ids": ["x"]})
+    assert resp.status_code == 422
+
+
+def test_alerts_trigger_records_notification_state(client, test_db):
+    from database.models import Alert, AlertStatus
+
+    _trigger(client, "det_notified")
+    alert = test_db.query(Alert).filter(Alert.alert_id == "det_notified").one()
+    assert alert.notification_sent == 1
+    assert alert.notification_timestamp is not None
+    assert alert.status == AlertStatus.ACKNOWLEDGED
+
+
+def test_alerts_trigger_duplicate_is_rejected_without_notifying(client, test_db, monkeypatch):
+    from database.models import Alert
+    from routes import alerts
+
+    sent = []
+
+    async def send_alert(**kwargs):
+        sent.append(kwargs["alert_id"])
+        return True
+
+    monkeypatch.setattr(alerts.notification_service, "send_alert", send_alert)
+    _trigger(client, "det_duplicate")
+    payload = {
+        "detection_id": "det_duplicate", "type": "poacher_suspected", "severity": "high",
+        "source": "camera_trap", "location": {"lat": -23.88, "lng": 31.52}, "createdBy": "ranger_1",
+    }
+    resp = client.post("/alerts/trigger", headers=AUTH, json=payload)
+    assert resp.status_code == 409
+    assert sent == ["det_duplicate"]
+
+    test_db.query(Alert).filter(Alert.alert_id == "det_duplicate").delete()
+    test_db.commit()
+
+
+def test_alerts_trigger_retries_pending_notification(client, test_db, monkeypatch):
+    from database.models import Alert
+    from routes import alerts
+
+    attempts = []
+
+    async def send_alert(**kwargs):
+        attempts.append(kwargs["alert_id"])
+        if len(attempts) == 1:
+            raise RuntimeError("gateway down")
+        return True
+
+    monkeypatch.setattr(alerts.notification_service, "send_alert", send_alert)
+    payload = {
+        "detection_id": "det_pending", "type": "poacher_suspected", "severity": "high",
+        "source": "camera_trap", "location": {"lat": -23.88, "lng": 31.52}, "createdBy": "ranger_1",
+    }
+    assert client.post("/alerts/trigger", headers=AUTH, json=payload).status_code == 500
+    alert = test_db.query(Alert).filter(Alert.alert_id == "det_pending").one()
+    assert alert.notification_sent == 0
+    assert alert.notification_timestamp is None
+
+    # The stored alert is still pending, so a retry pages instead of 409
+    resp = client.post("/alerts/trigger", headers=AUTH, json=payload)
+    assert resp.status_code == 200
+    assert resp.json()["status"] == "sent"
+    assert attempts == ["det_pending", "det_pending"]
+    assert client.post("/alerts/trigger", headers=AUTH, json=payload).status_code == 409
+
+    test_db.query(Alert).filter(Alert.alert_id == "det_pending").delete()
+    test_db.commit()
+
+
+def test_alerts_trigger_failed_send_is_not_pending(client, test_db, monkeypatch):
+    from database.models import Alert
+    from routes import alerts
+
+    async def send_alert(**kwargs):
+        return False
+
+    monkeypatch.setattr(alerts.notification_service, "send_alert", send_alert)
+    _trigger(client, "det_failed")
+    alert = test_db.query(Alert).filter(Alert.alert_id == "det_failed").one()
+    assert alert.notification_sent == 0
+    assert alert.notification_timestamp is not None
+
+    test_db.query(Alert).filter(Alert.alert_id == "det_failed").delete()
+    test_db.commit()
+
+
+def test_alerts_trigger_integrity_error_other_than_duplicate_is_422(client, test_db, monkeypatch):
+    from database.models import Alert
+    from routes import alerts
+
+    build = alerts.build_alert_values
+    monkeypatch.setattr(alerts, "build_alert_values", lambda *args: {**build(*args), "type": None})
+    payload = {
+        "detection_id": "det_invalid", "type": "poacher_suspected", "severity": "high",
+        "source": "camera_trap", "location": {"lat": -23.88, "lng": 31.52}, "createdBy": "ranger_1",
+    }
+    resp = client.post("/alerts/trigger", headers=AUTH, json=payload)
+    assert resp.status_code == 422
+    assert test_db.query(Alert).filter(Alert.alert_id == "det_invalid").count() == 0
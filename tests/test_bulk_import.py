@@ -0,0 +1,131 @@
+import csv
+import json
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.orm import sessionmaker
+
+import database.bulk_import
+from database.bulk_import import import_file, validate_chunk
+from database.models import Base, Detection, DetectionCountRollup, ImportCheckpoint
+
+
+def _write_csv(path, rows):
+    with open(path, "w", newline="") as fh:
+        writer = csv.DictWriter(fh, fieldnames=["timestamp", "class_name", "confidence", "gps_lat", "gps_lng", "camera_id"])
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def _row(i, **overrides):
+    row = {"timestamp": f"2019-07-01T{i % 24:02d}:15:00", "class_name": "rhino", "confidence": "0.8",
+           "gps_lat": "-23.9", "gps_lng": "31.5", "camera_id": "legacy-cam"}
+    row.update(overrides)
+    return row
+
+
+def test_validate_chunk_rejects_bad_rows():
+    records = [
+        _row(0),
+        _row(1, confidence="1.5"),
+        _row(2, timestamp="yesterday"),
+        _row(3, gps_lng=""),
+        _row(4, gps_lat="-95"),
+        _row(5, class_name=" "),
+        _row(6, timestamp="2019-07-01T08:00:00+02:00", gps_lat="", gps_lng=""),
+        {"_error": "unparsable record"},
+    ]
+    rows, rejects = validate_chunk(records)
+    assert [reason for _, reason in rejects] == [
+        "confidence must be in [0, 1]", "invalid timestamp", "gps_lat and gps_lng must be given together",
+        "gps_lat out of range", "missing class_name", "unparsable record",
+    ]
+    assert [r["timestamp"] for r in rows] == [datetime(2019, 7, 1, 0, 15), datetime(2019, 7, 1, 6, 0)]
+    assert rows[1]["gps_lat"] is None and rows[0]["confidence"] == 0.8
+
+
+def test_copy_encoding_keeps_empty_image_path_not_null():
+    copied = []
+
+    class Cursor:
+        def copy_expert(self, sql, buf):
+            copied.append((sql, buf.read()))
+
+    connection = SimpleNamespace(
+        dialect=SimpleNamespace(name="postgresql"),
+        connection=SimpleNamespace(driver_connection=SimpleNamespace(cursor=Cursor)),
+    )
+    rows, _ = validate_chunk([_row(0, gps_lat="", gps_lng="", camera_id="")])
+    assert rows[0]["image_path"] == "" and rows[0]["zone_label"] is None
+    assert database.bulk_import._copy_rows(connection, rows)
+
+    sql, data = copied[0]
+    assert "FORMAT csv" in sql and "FORCE_NOT_NULL (image_path)" in sql
+    # Empty fields: zone_label, camera_id and GPS load as NULL, image_path as ''
+    assert data == "2019-07-01T00:15:00,rhino,,,,0.8,,,,,,\r\n"
+
+
+def test_import_resumes_from_checkpoint(session_factory, tmp_path):
+    path = str(tmp_path / "history.csv")
+    rows = [_row(i, camera_id="resume-cam") for i in range(10)]
+    rows[4]["confidence"] = "high"
+    _write_csv(path, rows)
+
+    first = import_file(session_factory, path, chunk_size=3, max_chunks=2)
+    assert (first["offset"], first["inserted"], first["rejected"], first["complete"]) == (6, 5, 1, False)
+
+    second = import_file(session_factory, path, chunk_size=3)
+    assert (second["offset"], second["inserted"], second["rejected"], second["complete"]) == (10, 9, 1, True)
+    assert second["rows_per_s"] > 0
+    assert json.loads((tmp_path / "history.csv.rejects.jsonl").read_text())["record"] == 5
+
+    with session_factory() as db:
+        assert db.query(ImportCheckpoint).count() == 0
+        assert db.query(Detection).filter(Detection.camera_id == "resume-cam").count() == 9
+        bucket = db.get(DetectionCountRollup, (datetime(2019, 7, 1, 0), "rhino", ""))
+        assert bucket.count >= 1
+
+
+def test_import_crash_before_commit_does_not_duplicate(session_factory, tmp_path, monkeypatch):
+    path = str(tmp_path / "crash.csv")
+    rows = [_row(i, camera_id="crash-cam") for i in range(6)]
+    rows[4]["confidence"] = "high"
+    _write_csv(path, rows)
+
+    bump, calls = database.bulk_import.bump_table_versions, []
+
+    def crash_on_second_chunk(connection, names):
+        calls.append(names)
+        if len(calls) == 2:
+            raise RuntimeError("killed")
+        bump(connection, names)
+
+    monkeypatch.setattr(database.bulk_import, "bump_table_versions", crash_on_second_chunk)
+    with pytest.raises(RuntimeError):
+        import_file(session_factory, path, chunk_size=3)
+    monkeypatch.setattr(database.bulk_import, "bump_table_versions", bump)
+
+    result = import_file(session_factory, path, chunk_size=3)
+    assert (result["offset"], result["inserted"], result["rejected"]) == (6, 5, 1)
+    rejects = (tmp_path / "crash.csv.rejects.jsonl").read_text().splitlines()
+    assert [json.loads(line)["record"] for line in rejects] == [5]
+    with session_factory() as db:
+        assert db.query(Detection).filter(Detection.camera_id == "crash-cam").count() == 5
+
+
+def test_import_jsonl_with_deferred_indexes(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'import.db'}")
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    path = str(tmp_path / "history.jsonl")
+    with open(path, "w") as fh:
+        for i in range(5):
+            fh.write(json.dumps(_row(i, confidence=0.9)) + "\n")
+        fh.write("{broken\n")
+
+    result = import_file(factory, path, chunk_size=2, defer_indexes=True)
+    assert (result["inserted"], result["rejected"]) == (5, 1)
+    names = {ix["name"] for ix in inspect(engine).get_indexes("detections")}
+    assert "ix_detections_zone_label" in names  # rebuilt after the import
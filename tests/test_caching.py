@@ -0,0 +1,66 @@
+"""Test ETag / conditional GET support on list endpoints"""
+from sqlalchemy import delete
+
+from database.models import Detection, TableVersion
+from database.versions import bump_table_versions, get_table_version
+
+AUTH = {"Authorization": "Bearer testtoken123"}
+
+
+def test_alerts_list_returns_weak_etag(client):
+    resp = client.get("/alerts/")
+    assert resp.status_code == 200
+    assert resp.headers["etag"].startswith('W/"alerts-')
+
+
+def test_alerts_if_none_match_returns_304(client):
+    etag = client.get("/alerts/").headers["etag"]
+    resp = client.get("/alerts/", headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+    assert resp.headers["etag"] == etag
+    assert resp.content == b""
+
+
+def test_alerts_etag_changes_after_trigger(client):
+    etag = client.get("/alerts/").headers["etag"]
+    payload = {
+        "detection_id": "det_etag",
+        "type": "rhino_sighting",
+        "severity": "low",
+        "source": "camera_trap",
+        "location": {"lat": -1.0, "lng": 36.0, "zoneLabel": "Z"},
+        "createdBy": "Tester",
+    }
+    assert client.post("/alerts/trigger", headers=AUTH, json=payload).status_code == 200
+    resp = client.get("/alerts/", headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.headers["etag"] != etag
+
+
+def test_detections_version_bumped_on_insert_and_update(client, test_db):
+    before = get_table_version(test_db, "detections")
+    detection = Detection(class_name="rhino", confidence=0.9, image_path="a.jpg")
+    test_db.add(detection)
+    test_db.commit()
+    after_insert = get_table_version(test_db, "detections")
+    assert after_insert == before + 1
+
+    detection.confidence = 0.95
+    test_db.commit()
+    assert get_table_version(test_db, "detections") == after_insert + 1
+
+    etag = client.get("/detections/").headers["etag"]
+    assert etag == f'W/"detections-{after_insert + 1}"'
+    assert client.get("/detections/", headers={"If-None-Match": etag}).status_code == 304
+
+
+def test_bump_creates_missing_version_row(session_factory):
+    with session_factory() as db:
+        current = get_table_version(db, "alerts")
+        db.execute(delete(TableVersion).where(TableVersion.table_name == "alerts"))
+        bump_table_versions(db.connection(), ["alerts", "alerts", "untracked"])
+        assert get_table_version(db, "alerts") == 1
+        bump_table_versions(db.connection(), ["alerts"])
+        assert get_table_version(db, "alerts") == 2
+        db.rollback()
+        assert get_table_version(db, "alerts") == current
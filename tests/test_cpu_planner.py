@@ -0,0 +1,53 @@
+import pytest
+
+from utils.cpu_planner import available_cpus, cgroup_cpu_limit, plan_cpu
+
+
+def _write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text + "\n")
+
+
+@pytest.mark.parametrize("cpu_max, expected", [("250000 100000", 2.5), ("max 100000", None)])
+def test_cgroup_v2_limit(tmp_path, cpu_max, expected):
+    _write(tmp_path / "cpu.max", cpu_max)
+    assert cgroup_cpu_limit(str(tmp_path)) == expected
+
+
+@pytest.mark.parametrize("quota, expected", [("150000", 1.5), ("-1", None)])
+def test_cgroup_v1_limit(tmp_path, quota, expected):
+    _write(tmp_path / "cpu" / "cpu.cfs_quota_us", quota)
+    _write(tmp_path / "cpu" / "cpu.cfs_period_us", "100000")
+    assert cgroup_cpu_limit(str(tmp_path)) == expected
+
+
+def test_available_cpus_capped_by_quota(tmp_path):
+    assert cgroup_cpu_limit(str(tmp_path)) is None
+    _write(tmp_path / "cpu.max", "50000 100000")
+    assert available_cpus(str(tmp_path)) == 0.5
+
+
+def test_plan_splits_cpus_between_workers():
+    plan = plan_cpu(16, workers=4)
+    assert (plan.intra_op_threads, plan.inter_op_threads, plan.inference_pool_size) == (4, 1, 1)
+    # A fractional share still gets a thread
+    assert plan_cpu(2.5, workers=4).intra_op_threads == 1
+    assert plan_cpu(1, workers=0).workers == 1
+
+
+def test_plan_keeps_explicit_settings():
+    plan = plan_cpu(8, workers=1, intra_op_threads=2)
+    assert (plan.intra_op_threads, plan.inference_pool_size) == (2, 4)
+    plan = plan_cpu(8, workers=1, inter_op_threads=2, inference_pool_size=3)
+    assert (plan.intra_op_threads, plan.inter_op_threads, plan.inference_pool_size) == (8, 2, 3)
+
+
+def test_metrics_expose_cpu_plan(client):
+    body = client.get("/metrics").text
+    for name in (
+        "rhinoguardians_cpu_available",
+        "rhinoguardians_torch_intra_op_threads",
+        "rhinoguardians_torch_inter_op_threads",
+        "rhinoguardians_inference_pool_size",
+    ):
+        assert f"\n{name} " in body
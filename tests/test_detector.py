@@ -3,7 +3,7 @@ import os
 import pytest
 from PIL import Image
 import numpy as np
-from models.yolo_detector import YoloDetector
+from models.yolo_detector import YoloDetector, offset_boxes
 from utils import create_test_image, create_test_image_file
 
 @pytest.fixture
@@ -35,4 +35,17 @@ def test_image_detection(test_image):
         assert "confidence" in detection
         assert "class" in detection
         assert isinstance(detection["confidence"], float)
-        assert isinstance(detection["class"], int)
\ No newline at end of file
+        assert isinstance(detection["class"], int)
+
+def test_offset_boxes_maps_region_crop_to_full_image():
+    """Boxes found on a motion-gate crop are returned in full-image pixels"""
+    region = [100, 50, 300, 200]
+    img = Image.new('RGB', (640, 480), color='white')
+    img.paste((0, 0, 0), (150, 80, 190, 120))
+    crop = np.asarray(img.crop(tuple(region)).convert('L'))
+    ys, xs = np.nonzero(crop < 128)
+    detections = [{"box": [float(xs.min()), float(ys.min()), float(xs.max() + 1), float(ys.max() + 1)],
+                   "confidence": 0.9, "class": 0}]
+
+    assert offset_boxes(detections, region)[0]["box"] == [150.0, 80.0, 190.0, 120.0]
+
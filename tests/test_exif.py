@@ -0,0 +1,117 @@
+"""Test header-only EXIF metadata extraction"""
+from datetime import datetime
+import random
+import struct
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+from utils.exif import extract_metadata, extract_metadata_batch
+from utils.gps_parser import get_gps_from_image
+
+
+def _exif_jpeg(with_gps=True, fmt="JPEG", serial=None):
+    exif = Image.Exif()
+    exif[0x010F] = "Reconyx"
+    exif[0x0110] = "HP2X"
+    exif[0x0132] = "2025:11:14 03:12:45"
+    exif_ifd = exif.get_ifd(0x8769)
+    exif_ifd[0x9003] = "2025:11:14 03:12:44"
+    exif_ifd[0x9011] = "+02:00"
+    if serial:
+        exif_ifd[0xA431] = serial
+    if with_gps:
+        gps = exif.get_ifd(0x8825)
+        gps[1], gps[2] = "S", (23.0, 53.0, 9.24)
+        gps[3], gps[4] = "E", (31.0, 31.0, 13.8)
+        gps[5], gps[6] = b"\x00", 412.5
+    buf = BytesIO()
+    Image.new("RGB", (320, 240), (90, 90, 90)).save(buf, fmt, exif=exif)
+    return buf.getvalue()
+
+
+def test_extracts_all_fields_in_one_pass():
+    meta = extract_metadata(_exif_jpeg())
+    assert meta.lat == pytest.approx(-23.8859)
+    assert meta.lng == pytest.approx(31.5205)
+    assert meta.altitude == pytest.approx(412.5)
+    assert meta.timestamp == datetime(2025, 11, 14, 1, 12, 44)  # shifted to UTC
+    assert meta.camera_model == "Reconyx HP2X"
+    assert meta.camera_id is None  # a model name is not a device identity
+    assert extract_metadata(_exif_jpeg(serial="HP2X-0042")).camera_id == "HP2X-0042"
+
+
+def test_missing_or_invalid_metadata():
+    meta = extract_metadata(_exif_jpeg(with_gps=False))
+    assert meta.gps is None and meta.camera_model == "Reconyx HP2X"
+    assert extract_metadata(b"not an image") == extract_metadata(b"")
+    assert extract_metadata(b"\xff\xd8\xff\xe1\x00\x10Exif\x00\x00II*\x00").gps is None
+
+
+def _tiff(ifd0, gps=()):
+    """Little-endian TIFF with raw ``(tag, type, count, value)`` entries; GPS IFD follows IFD0."""
+    gps_at = 8 + 2 + 12 * (len(ifd0) + 1) + 4
+    entries = list(ifd0) + [(0x8825, 4, 1, gps_at)]
+    out = b"II*\x00" + struct.pack("<L", 8)
+    for group in (entries, list(gps)):
+        out += struct.pack("<H", len(group))
+        for tag, ftype, count, value in group:
+            raw = value if isinstance(value, bytes) else struct.pack("<L", value)
+            out += struct.pack("<HHL", tag, ftype, count) + raw
+        out += struct.pack("<L", 0)
+    return out
+
+
+def test_malformed_tag_types_are_ignored():
+    data = _tiff(
+        ifd0=[
+            (0x0132, 3, 2, struct.pack("<HH", 2025, 11)),  # DateTime as SHORT
+            (0x010F, 7, 2, b"ab\x00\x00"),  # Make as UNDEFINED
+            (0x0110, 2, 4, b"HP2\x00"),  # Model, valid
+            (0x8769, 3, 1, struct.pack("<HH", 0, 0)),  # Exif IFD pointer of 0
+        ],
+        gps=[
+            (1, 3, 1, struct.pack("<HH", 83, 0)),  # LatitudeRef as SHORT
+            (2, 2, 4, b"23\x00\x00"),  # Latitude as ASCII
+            (5, 2, 2, b"1\x00\x00\x00"),  # AltitudeRef as ASCII
+            (6, 3, 1, struct.pack("<HH", 5, 0)),  # Altitude as SHORT
+        ],
+    )
+    meta = extract_metadata(data)
+    assert meta.timestamp is None and meta.gps is None and meta.altitude is None
+    assert meta.camera_model == "HP2"
+
+
+def test_corrupted_exif_never_raises():
+    original = _exif_jpeg()
+    rng = random.Random(0)
+    for _ in range(2000):
+        data = bytearray(original)
+        for _ in range(rng.randint(1, 8)):
+            data[rng.randrange(2, 400)] = rng.randrange(256)
+        extract_metadata(bytes(data))
+
+
+def test_file_object_is_rewound_and_batch_keeps_order(tmp_path):
+    fh = BytesIO(_exif_jpeg())
+    extract_metadata(fh)
+    assert fh.tell() == 0
+
+    paths = []
+    for i, gps in enumerate([True, False, True]):
+        path = tmp_path / f"{i}.jpg"
+        path.write_bytes(_exif_jpeg(with_gps=gps))
+        paths.append(str(path))
+    results = extract_metadata_batch(paths, max_workers=2)
+    assert [m.gps is not None for m in results] == [True, False, True]
+
+
+def test_get_gps_from_image_jpeg_and_pil_fallback(tmp_path):
+    jpeg = tmp_path / "a.jpg"
+    jpeg.write_bytes(_exif_jpeg())
+    assert get_gps_from_image(str(jpeg)) == pytest.approx((-23.8859, 31.5205))
+
+    png = tmp_path / "a.png"
+    png.write_bytes(_exif_jpeg(fmt="PNG"))
+    assert get_gps_from_image(str(png)) == pytest.approx((-23.8859, 31.5205))
@@ -0,0 +1,69 @@
+import csv
+import gzip
+import io
+from datetime import datetime
+
+import pytest
+
+from database.export import iter_export
+from database.models import Detection
+
+DAY = datetime(2023, 2, 1)
+
+
+@pytest.fixture
+def export_rows(session_factory):
+    with session_factory() as db:
+        db.query(Detection).filter(Detection.image_path.like("export-%")).delete(synchronize_session=False)
+        db.add_all([
+            Detection(timestamp=DAY.replace(hour=h), class_name=cls, confidence=0.5 + h / 100,
+                      image_path=f"export-{h}", gps_lat=-23.9, gps_lng=31.5)
+            for h, cls in [(1, "rhino"), (2, "rhino"), (3, "elephant")]
+        ])
+        db.commit()
+    return {"date_from": "2023-02-01T00:00:00", "date_to": "2023-02-01T23:59:59"}
+
+
+def test_export_csv_gz_with_filters(client, export_rows):
+    resp = client.get("/export/detections", params={**export_rows, "format": "csv.gz", "class_name": "rhino"})
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/gzip"
+    assert 'filename="detections-' in resp.headers["content-disposition"]
+
+    rows = list(csv.DictReader(io.StringIO(gzip.decompress(resp.content).decode("utf-8"))))
+    assert [r["image_path"] for r in rows] == ["export-1", "export-2"]
+    assert rows[0]["timestamp"] == "2023-02-01T01:00:00"
+
+
+def test_export_parquet_and_arrow(client, export_rows):
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+
+    resp = client.get("/export/detections", params={**export_rows, "format": "parquet"})
+    assert resp.status_code == 200
+    table = pq.read_table(io.BytesIO(resp.content))
+    assert table.column("image_path").to_pylist() == ["export-1", "export-2", "export-3"]
+    assert table.schema.field("timestamp").type == pa.timestamp("us")
+    assert not table.schema.field("id").nullable and table.schema.field("gps_lat").nullable
+
+    resp = client.get("/export/detections", params={**export_rows, "format": "arrow", "class_name": "elephant"})
+    assert pa.ipc.open_stream(resp.content).read_all().column("class_name").to_pylist() == ["elephant"]
+
+
+def test_export_streams_in_chunks(session_factory, export_rows):
+    with session_factory() as db:
+        pieces = list(iter_export(db, "detections", "csv.gz", chunk_size=1))
+    # header/first rows, one piece per further chunk, then the gzip trailer
+    assert len(pieces) >= 4
+    assert gzip.decompress(b"".join(pieces)).count(b"\n") >= 4
+
+
+def test_export_alerts_with_status(client):
+    resp = client.get("/export/alerts", params={"format": "csv.gz", "status": "RESOLVED"})
+    assert resp.status_code == 200
+    header = gzip.decompress(resp.content).decode("utf-8").splitlines()[0]
+    assert header.startswith("id,alert_id,detection_id")
+
+
+def test_export_rejects_unknown_format(client):
+    assert client.get("/export/detections", params={"format": "xlsx"}).status_code == 422
@@ -0,0 +1,97 @@
+import json
+import os
+
+import pytest
+
+from database.models import Alert
+from utils.geofence import GeofenceLookup, ZoneIndex, zones_from_geojson
+
+AUTH = {"Authorization": "Bearer testtoken123"}
+
+
+def _square(x0, y0, x1, y1):
+    return [[x0, y0], [x1, y0], [x1, y1], [x0, y1], [x0, y0]]
+
+
+def _feature(name, *rings):
+    return {"type": "Feature", "properties": {"name": name},
+            "geometry": {"type": "Polygon", "coordinates": list(rings)}}
+
+
+PARK = {"type": "FeatureCollection", "features": [
+    # Park section with a lake (hole) in the middle
+    _feature("Section A", _square(31.0, -24.0, 32.0, -23.0), _square(31.4, -23.6, 31.6, -23.4)),
+    # Sanctuary drawn inside the section
+    _feature("Sanctuary", _square(31.7, -23.3, 31.9, -23.1)),
+]}
+
+
+@pytest.fixture
+def index():
+    return ZoneIndex(zones_from_geojson(PARK), grid_size=16)
+
+
+def test_lookup_resolves_zones(index):
+    assert index.lookup(-23.8, 31.2) == "Section A"
+    assert index.lookup(-23.5, 31.5) is None  # inside the hole
+    assert index.lookup(-23.2, 31.8) == "Sanctuary"  # smaller zone wins
+    assert index.lookup(-25.0, 31.5) is None
+    assert index.lookup(-23.0001, 31.9999) == "Section A"  # boundary cell
+
+
+def test_lookup_many_matches_single_lookups(index):
+    points = [(-23.0 - i / 37.0, 31.0 + (i * 7 % 37) / 37.0) for i in range(37)]
+    assert index.lookup_many(points) == [index.lookup(lat, lng) for lat, lng in points]
+
+
+def test_multipolygon_and_feature_id_label():
+    data = {"type": "FeatureCollection", "features": [{
+        "type": "Feature", "id": "twin", "properties": {},
+        "geometry": {"type": "MultiPolygon", "coordinates": [
+            [_square(0.0, 0.0, 1.0, 1.0)], [_square(2.0, 0.0, 3.0, 1.0)],
+        ]},
+    }]}
+    index = ZoneIndex(zones_from_geojson(data))
+    assert index.lookup(0.5, 0.5) == index.lookup(0.5, 2.5) == "twin"
+    assert index.lookup(0.5, 1.5) is None
+
+
+def test_hot_reload(tmp_path):
+    path = tmp_path / "zones.geojson"
+    lookup = GeofenceLookup(str(path), check_interval=0)
+    assert lookup.lookup(-23.8, 31.2) is None  # no file yet
+
+    path.write_text(json.dumps(PARK))
+    assert lookup.lookup(-23.8, 31.2) == "Section A"
+
+    renamed = {"type": "FeatureCollection", "features": [_feature("Section B", _square(31.0, -24.0, 32.0, -23.0))]}
+    path.write_text(json.dumps(renamed))
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1_000_000))
+    assert lookup.lookup(-23.8, 31.2) == "Section B"
+
+    # A broken edit keeps the previous zones
+    path.write_text("{not json")
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 2_000_000))
+    assert lookup.lookup(-23.8, 31.2) == "Section B"
+
+
+def test_trigger_alert_labels_zone(client, session_factory, tmp_path, monkeypatch):
+    path = tmp_path / "zones.geojson"
+    path.write_text(json.dumps(PARK))
+    lookup = GeofenceLookup(str(path))
+    monkeypatch.setattr("routes.alerts.get_geofence", lambda: lookup)
+
+    payload = {
+        "detection_id": "zone_auto_1",
+        "type": "rhino_sighting",
+        "severity": "low",
+        "source": "camera_trap",
+        "location": {"lat": -23.2, "lng": 31.8},
+        "createdBy": "Ranger",
+    }
+    resp = client.post("/alerts/trigger", headers=AUTH, json=payload)
+    assert resp.status_code == 200
+    assert resp.json()["location"]["zoneLabel"] == "Sanctuary"
+    with session_factory() as db:
+        alert = db.query(Alert).filter(Alert.alert_id == "zone_auto_1").one()
+        assert alert.zone_label == "Sanctuary"
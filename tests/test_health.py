@@ -1,7 +1,78 @@
+import pytest
+
+
 def test_health_ok(client):
     resp = client.get("/health")
     assert resp.status_code == 200
     data = resp.json()
     assert "status" in data
     assert data["status"] in ("healthy", "ok")
-    assert "timestamp" in data
\ No newline at end of file
+    assert "timestamp" in data
+
+@pytest.fixture
+def fresh_probe():
+    from routes.health import readiness_cache
+
+    readiness_cache.clear()
+    yield readiness_cache
+    readiness_cache.clear()
+
+
+def test_live_probe(client):
+    resp = client.get("/health/live")
+    assert resp.status_code == 200
+    assert resp.json()["status"] == "alive"
+
+
+def test_ready_probe_reports_checks_and_caches(client, fresh_probe):
+    from models.yolo_detector import get_detector
+
+    get_detector()  # loaded by the lifespan warm-up outside tests
+    first = client.get("/health/ready")
+    assert first.status_code == 200
+    body = first.json()
+    assert body["status"] == "ready" and body["cached"] is False
+    assert set(body["checks"]) == {"database", "model", "inference_queue", "notification_backlog"}
+
+    second = client.get("/health/ready").json()
+    assert second["cached"] is True
+    assert second["checked_at"] == body["checked_at"]
+
+
+def test_ready_probe_fails_when_queue_saturated(client, fresh_probe):
+    from utils.metrics import INFERENCE_QUEUE_DEPTH
+
+    INFERENCE_QUEUE_DEPTH.inc(amount=1000)
+    try:
+        resp = client.get("/health/ready")
+    finally:
+        INFERENCE_QUEUE_DEPTH.dec(amount=1000)
+    assert resp.status_code == 503
+    assert resp.json()["checks"]["inference_queue"]["ok"] is False
+
+
+def test_ready_probe_does_not_load_the_model(client, fresh_probe):
+    from models.yolo_detector import get_detector
+
+    get_detector.cache_clear()
+    try:
+        resp = client.get("/health/ready")
+        assert resp.status_code == 503
+        assert resp.json()["checks"]["model"]["ok"] is False
+        assert get_detector.cache_info().currsize == 0
+    finally:
+        get_detector()
+
+
+def test_probe_cache_expires():
+    from routes.health import ProbeCache
+
+    now = [0.0]
+    calls = []
+    cache = ProbeCache(2.0, clock=lambda: now[0])
+    probe = lambda: calls.append(1) or {"n": len(calls)}
+    assert cache.get(probe) == ({"n": 1}, False)
+    now[0] = 1.9
+    assert cache.get(probe) == ({"n": 1}, True)
+    now[0] = 2.1
+    assert cache.get(probe) == ({"n": 2}, False)
@@ -0,0 +1,101 @@
+"""Test the content-addressed image store"""
+import gzip
+import hashlib
+import io
+from datetime import datetime, timedelta
+
+import pytest
+
+from database.models import StoredImage
+from storage import ImageStore, LocalBackend, S3Backend
+from storage.image_store import acquire_refs, key_for, release_refs
+
+
+class _NotFound(Exception):
+    response = {"Error": {"Code": "404"}}
+
+
+class FakeS3Client:
+    """In-process stand-in for the subset of the boto3 S3 client we use."""
+
+    def __init__(self):
+        self.objects = {}
+
+    def upload_file(self, path, bucket, key):
+        with open(path, "rb") as fh:
+            self.objects[(bucket, key)] = fh.read()
+
+    def get_object(self, Bucket, Key):
+        if (Bucket, Key) not in self.objects:
+            raise _NotFound()
+        return {"Body": io.BytesIO(self.objects[(Bucket, Key)])}
+
+    def head_object(self, Bucket, Key):
+        if (Bucket, Key) not in self.objects:
+            raise _NotFound()
+        return {"ContentLength": len(self.objects[(Bucket, Key)])}
+
+    def delete_object(self, Bucket, Key):
+        self.objects.pop((Bucket, Key), None)
+
+
+def test_put_is_sharded_and_deduplicated(test_db, image_store):
+    store = image_store
+    root = store.backend.root
+    data = b"frame-bytes" * 1000
+    digest = hashlib.sha256(data).hexdigest()
+
+    first = store.put(test_db, io.BytesIO(data), "image/jpeg")
+    second = store.put(test_db, [data[:5000], data[5000:]])
+
+    assert first.sha256 == second.sha256 == digest
+    assert first.key == f"{digest[:2]}/{digest[2:4]}/{digest}"
+    assert (root / first.key).read_bytes() == data
+    assert not first.deduplicated and second.deduplicated
+    assert not list((root / ".staging").iterdir())
+    assert test_db.get(StoredImage, digest).size == len(data)
+
+
+def test_refcount_protects_from_garbage_collection(test_db, image_store):
+    store = image_store
+    ref = store.put(test_db, b"referenced")
+    acquire_refs(test_db, [ref.sha256, ref.sha256])
+    test_db.commit()
+    assert store.collect_garbage(test_db, grace_seconds=0) == 0
+
+    release_refs(test_db, [ref.sha256, ref.sha256])
+    test_db.commit()
+    assert store.collect_garbage(test_db, grace_seconds=3600) == 0  # still within grace
+    assert store.collect_garbage(test_db, grace_seconds=0) == 1
+    assert test_db.get(StoredImage, ref.sha256) is None
+    assert not store.backend.exists(ref.key)
+
+
+def test_s3_backend_with_local_stand_in(test_db, image_store):
+    client = FakeS3Client()
+    store = ImageStore(S3Backend(client, "bucket", prefix="images"))
+    ref = store.put(test_db, b"s3 frame")
+
+    assert ("bucket", f"images/{ref.key}") in client.objects
+    assert store.open(test_db, ref.sha256).read() == b"s3 frame"
+    assert store.put(test_db, b"s3 frame").deduplicated
+
+    # A blob lost from the bucket is written again on the next upload
+    client.objects.clear()
+    assert not store.put(test_db, b"s3 frame").deduplicated
+    with pytest.raises(FileNotFoundError):
+        S3Backend(client, "bucket").open("missing")
+
+
+def test_move_to_cold_compresses_and_stays_readable(test_db, image_store, tmp_path):
+    store = ImageStore(LocalBackend(str(tmp_path / "hot")), LocalBackend(str(tmp_path / "cold")))
+    ref = store.put(test_db, b"cold frame" * 100)
+    test_db.get(StoredImage, ref.sha256).created_at = datetime.utcnow() - timedelta(days=60)
+    test_db.commit()
+
+    assert store.move_to_cold(test_db, older_than_days=30) == 1
+    assert not (tmp_path / "hot" / ref.key).exists()
+    cold_path = tmp_path / "cold" / (key_for(ref.sha256) + ".gz")
+    assert gzip.decompress(cold_path.read_bytes()) == b"cold frame" * 100
+    assert store.open(test_db, ref.sha256).read() == b"cold frame" * 100
+    assert store.local_path(test_db, ref.sha256) is None
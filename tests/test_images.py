@@ -0,0 +1,66 @@
+"""Test thumbnail and crop endpoints"""
+import os
+import time
+from io import BytesIO
+
+from PIL import Image
+
+from database.models import Detection
+from storage.disk_cache import DiskLRUCache
+from utils import create_test_image
+
+
+def _upload(client, width=1600, height=1200):
+    data = create_test_image(size=(width, height), color=(10, 120, 40)).getvalue()
+    resp = client.post("/upload/", files={"file": ("frame.jpg", data, "image/jpeg")})
+    return resp.json()["image"]["sha256"]
+
+
+def test_thumbnail_is_downscaled_and_cacheable(client):
+    sha = _upload(client)
+    resp = client.get(f"/images/{sha}/thumbnail", params={"size": 128})
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "image/jpeg"
+    assert "immutable" in resp.headers["cache-control"]
+    assert max(Image.open(BytesIO(resp.content)).size) == 128
+
+    again = client.get(f"/images/{sha}/thumbnail", params={"size": 128},
+                       headers={"If-None-Match": resp.headers["etag"]})
+    assert again.status_code == 304
+
+
+def test_thumbnail_rejects_unknown_size_and_image(client):
+    sha = _upload(client)
+    assert client.get(f"/images/{sha}/thumbnail", params={"size": 300}).status_code == 422
+    assert client.get(f"/images/{'0' * 64}/thumbnail").status_code == 404
+
+
+def test_detection_crop(client, test_db):
+    sha = _upload(client, 2000, 1000)
+    detection = Detection(class_name="rhino", confidence=0.9, image_path=sha, image_sha256=sha,
+                          box_x1=1000, box_y1=400, box_x2=1400, box_y2=600)
+    test_db.add(detection)
+    test_db.commit()
+
+    resp = client.get(f"/detections/{detection.id}/crop", params={"size": 256})
+    assert resp.status_code == 200
+    w, h = Image.open(BytesIO(resp.content)).size
+    assert w == 256 and 120 <= h <= 136  # padded 480x240 box scaled to 256 wide
+
+    no_box = Detection(class_name="rhino", confidence=0.9, image_path="legacy.jpg")
+    test_db.add(no_box)
+    test_db.commit()
+    assert client.get(f"/detections/{no_box.id}/crop").status_code == 404
+
+
+def test_disk_cache_evicts_least_recently_used(tmp_path):
+    cache = DiskLRUCache(str(tmp_path), max_bytes=250)
+    cache.put("a", b"x" * 100)
+    cache.put("b", b"x" * 100)
+    assert cache.get("a") is not None  # "a" is now most recent
+    old = time.time() - 60
+    os.utime(cache._path("b"), (old, old))
+    cache.put("c", b"x" * 100)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.size <= 250
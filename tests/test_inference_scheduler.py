@@ -0,0 +1,127 @@
+import pytest
+
+from utils.inference_scheduler import (
+    InferenceDeadlineExceeded,
+    InferenceScheduler,
+    parse_client_priorities,
+    resolve_priority,
+)
+
+
+class _ManualExecutor:
+    """Holds submitted calls until the test runs them, one slot at a time."""
+
+    def __init__(self):
+        self.pending = []
+
+    def submit(self, fn, *args):
+        self.pending.append((fn, args))
+
+    def run_next(self):
+        fn, args = self.pending.pop(0)
+        fn(*args)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _scheduler(executor, clock, deadlines=None, starvation_seconds=1000.0):
+    return InferenceScheduler(
+        executor, slots=1, weights={"realtime": 2, "normal": 1, "backfill": 1},
+        deadlines=deadlines or {}, starvation_seconds=starvation_seconds, clock=clock,
+    )
+
+
+def _drain(executor, count):
+    for _ in range(count):
+        executor.run_next()
+
+
+def test_weighted_fair_order():
+    executor, order = _ManualExecutor(), []
+    scheduler = _scheduler(executor, _Clock())
+    scheduler.submit(order.append, "blocker")
+    for i in range(4):
+        scheduler.submit(order.append, "backfill", priority="backfill")
+        scheduler.submit(order.append, "realtime", priority="realtime")
+    _drain(executor, 7)
+
+    assert order[0] == "blocker"
+    assert order[1:7].count("realtime") == 4
+    assert order[1:7].count("backfill") == 2
+    # One more is already dispatched, the last is still queued
+    assert scheduler.queued("backfill") == 1
+
+
+def test_starving_call_goes_first():
+    executor, clock, order = _ManualExecutor(), _Clock(), []
+    scheduler = _scheduler(executor, clock, starvation_seconds=10)
+    scheduler.submit(order.append, "blocker")
+    scheduler.submit(order.append, "backfill", priority="backfill")
+    clock.now = 5
+    for _ in range(3):
+        scheduler.submit(order.append, "realtime", priority="realtime")
+    clock.now = 11
+    _drain(executor, 2)
+
+    assert order == ["blocker", "backfill"]
+
+
+def test_stale_realtime_call_is_dropped():
+    executor, clock, order = _ManualExecutor(), _Clock(), []
+    scheduler = _scheduler(executor, clock, deadlines={"realtime": 2})
+    scheduler.submit(order.append, "blocker", priority="backfill")
+    stale = scheduler.submit(order.append, "stale", priority="realtime")
+    clock.now = 3
+    fresh = scheduler.submit(order.append, "fresh", priority="realtime")
+    _drain(executor, 2)
+
+    assert order == ["blocker", "fresh"]
+    assert fresh.done() and fresh.exception() is None
+    with pytest.raises(InferenceDeadlineExceeded):
+        stale.result()
+
+
+def test_cancelled_call_is_skipped():
+    executor, order = _ManualExecutor(), []
+    scheduler = _scheduler(executor, _Clock())
+    scheduler.submit(order.append, "blocker")
+    scheduler.submit(order.append, "cancelled").cancel()
+    scheduler.submit(order.append, "kept")
+    _drain(executor, 2)
+
+    assert order == ["blocker", "kept"]
+    assert not executor.pending
+
+
+def test_resolve_priority():
+    clients = parse_client_priorities("drone-7=realtime, archive-sync=backfill")
+    assert clients == {"drone-7": "realtime", "archive-sync": "backfill"}
+    assert resolve_priority(None, "drone-7", clients) == "realtime"
+    assert resolve_priority("normal", "drone-7", clients) == "normal"
+    assert resolve_priority(None, "unknown", clients) == "normal"
+    with pytest.raises(ValueError):
+        resolve_priority("urgent", None, clients)
+    with pytest.raises(ValueError):
+        parse_client_priorities("drone-7=urgent")
+
+
+def test_upload_priority_parameter(client):
+    from utils import create_test_image
+
+    def upload(priority):
+        return client.post(
+            "/upload/",
+            files={"file": ("frame.jpg", create_test_image().getvalue(), "image/jpeg")},
+            data={"priority": priority},
+        )
+
+    assert upload("realtime").status_code == 200
+    resp = upload("urgent")
+    assert resp.status_code == 422
+    assert "Unknown priority" in resp.json()["detail"]
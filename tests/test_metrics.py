@@ -0,0 +1,72 @@
+import io
+
+import pytest
+from PIL import Image
+
+from utils.metrics import Counter, Gauge, Histogram, STAGE_SECONDS
+
+
+class _FakeDetector:
+    def predict_bytes(self, data):
+        return [{"box": [1.0, 2.0, 30.0, 40.0], "confidence": 0.8, "class": 0, "class_name": "metrics-rhino"}]
+
+
+@pytest.fixture
+def fake_detector():
+    from main import app
+    from routes.api import upload_detector
+
+    app.dependency_overrides[upload_detector] = lambda: _FakeDetector()
+    yield
+    del app.dependency_overrides[upload_detector]
+
+
+def test_histogram_exposition():
+    histogram = Histogram("demo_seconds", "Demo.", ("stage",), buckets=(0.1, 1.0), registry=None)
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, "read")
+    lines = list(histogram.collect())
+    assert lines[:2] == ["# HELP demo_seconds Demo.", "# TYPE demo_seconds histogram"]
+    assert lines[2:] == [
+        'demo_seconds_bucket{stage="read",le="0.1"} 2',
+        'demo_seconds_bucket{stage="read",le="1"} 3',
+        'demo_seconds_bucket{stage="read",le="+Inf"} 4',
+        'demo_seconds_sum{stage="read"} 3.65',
+        'demo_seconds_count{stage="read"} 4',
+    ]
+
+
+def test_counter_and_callback_gauge():
+    counter = Counter("demo_total", "Demo.", ("cache",), registry=None)
+    counter.inc('a"b')
+    assert list(counter.collect())[-1] == 'demo_total{cache="a\\"b"} 1'
+    gauge = Gauge("demo_depth", "Demo.", function=lambda: 3, registry=None)
+    assert list(gauge.collect())[-1] == "demo_depth 3"
+
+
+def test_metrics_endpoint_after_upload(client, fake_detector, session_factory):
+    buf = io.BytesIO()
+    Image.new("RGB", (32, 32), color=(5, 6, 7)).save(buf, format="JPEG")
+    before = STAGE_SECONDS.count("db_write")
+    resp = client.post("/upload/", files={"file": ("m.jpg", buf.getvalue(), "image/jpeg")})
+    assert resp.status_code == 200
+    assert STAGE_SECONDS.count("db_write") == before + 1
+
+    resp = client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = resp.text
+    for stage in ("upload_read", "postprocess", "db_write"):
+        assert f'rhinoguardians_stage_seconds_count{{stage="{stage}"}}' in text
+    assert "rhinoguardians_inference_queue_depth 0" in text
+    assert "rhinoguardians_db_pool_checked_out" in text
+    assert "# TYPE rhinoguardians_cache_hit_ratio gauge" in text
+
+
+def test_timed_block_records_every_observation():
+    histogram = Histogram("overhead_seconds", "Overhead.", ("stage",), registry=None)
+    n = 20_000
+    for _ in range(n):
+        with histogram.time("inference"):
+            pass
+    assert histogram.count("inference") == n
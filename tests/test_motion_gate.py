@@ -0,0 +1,100 @@
+from io import BytesIO
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from utils.motion_gate import FULL, REGION, SKIPPED, MotionGate
+
+SIZE = (640, 480)
+
+
+def _scene(brightness=0, box=None, seed=7):
+    """Blocky textured scene as JPEG; ``box`` paints a bright object into it."""
+    rng = np.random.default_rng(seed)
+    blocks = rng.integers(40, 200, size=(12, 16, 3), dtype=np.uint8)
+    pixels = np.asarray(Image.fromarray(blocks).resize(SIZE, Image.NEAREST), dtype=np.int16) + brightness
+    if box is not None:
+        x1, y1, x2, y2 = box
+        pixels[y1:y2, x1:x2] = 255
+    buf = BytesIO()
+    Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8)).save(buf, format="JPEG", quality=90)
+    return buf.getvalue()
+
+
+@pytest.fixture
+def gate():
+    return MotionGate(refresh_frames=5)
+
+
+def test_first_frame_and_unknown_camera_are_inferred(gate):
+    assert gate.check(None, _scene()).reason == "no_camera"
+    decision = gate.check("cam-1", _scene())
+    assert (decision.action, decision.reason) == (FULL, "no_background")
+
+
+def test_static_and_relit_frames_are_skipped(gate):
+    gate.check("cam-1", _scene())
+    assert gate.check("cam-1", _scene()).action == SKIPPED
+    # Global brightness change (clouds, exposure) is not motion
+    assert gate.check("cam-1", _scene(brightness=30)).action == SKIPPED
+
+
+def test_small_change_is_inferred_as_region(gate):
+    gate.check("cam-1", _scene())
+    decision = gate.check("cam-1", _scene(box=(300, 200, 360, 260)))
+    assert decision.action == REGION
+    x1, y1, x2, y2 = decision.region
+    assert x1 <= 300 and y1 <= 200 and x2 >= 360 and y2 >= 260
+    assert (x2 - x1) * (y2 - y1) < SIZE[0] * SIZE[1] / 2
+
+
+def test_large_change_is_inferred_in_full(gate):
+    gate.check("cam-1", _scene())
+    decision = gate.check("cam-1", _scene(seed=8))
+    assert (decision.action, decision.reason) == (FULL, "motion")
+
+
+def test_refresh_after_skipped_frames(gate):
+    gate.check("cam-1", _scene())
+    actions = [gate.check("cam-1", _scene()).action for _ in range(5)]
+    assert actions == [SKIPPED] * 4 + [FULL]
+
+
+def test_cameras_have_separate_backgrounds(gate):
+    gate.check("cam-1", _scene())
+    assert gate.check("cam-2", _scene(seed=8)).reason == "no_background"
+    assert gate.check("cam-1", _scene()).action == SKIPPED
+
+
+class _RecordingDetector:
+    def __init__(self):
+        self.calls = []
+
+    def predict_bytes(self, data, region=None):
+        self.calls.append(region)
+        return []
+
+
+def test_upload_skips_static_frames(client, monkeypatch):
+    import routes.api
+    from main import app
+    from routes.api import upload_detector
+
+    detector, gate = _RecordingDetector(), MotionGate()
+    app.dependency_overrides[upload_detector] = lambda: detector
+    monkeypatch.setattr(routes.api, "get_motion_gate", lambda: gate)
+    try:
+        def upload(frame):
+            return client.post(
+                "/upload/", files={"file": ("frame.jpg", frame, "image/jpeg")}, data={"camera_id": "gate-cam"}
+            ).json()["motion_gate"]
+
+        assert upload(_scene())["action"] == FULL
+        assert upload(_scene())["action"] == SKIPPED
+        assert upload(_scene(box=(300, 200, 360, 260)))["action"] == REGION
+    finally:
+        del app.dependency_overrides[upload_detector]
+
+    assert len(detector.calls) == 2
+    assert detector.calls[0] is None and detector.calls[1] is not None
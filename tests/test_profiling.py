@@ -0,0 +1,81 @@
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import routes.profiles
+from routes.profiles import router as profiles_router
+from utils.profiling import ProfileStore, ProfilingMiddleware, StackSampler, get_profile_store
+
+AUTH = {"Authorization": "Bearer profile-token"}
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ProfileStore(str(tmp_path / "profiles"), max_files=2)
+
+
+@pytest.fixture
+def profiled_client(store, monkeypatch):
+    """The application as main.py builds it with PROFILING_ENABLED set."""
+    from main import app
+
+    monkeypatch.setattr(routes.profiles, "PROFILE_TOKEN", "profile-token")
+    profiled = FastAPI()
+    profiled.include_router(profiles_router)
+    profiled.dependency_overrides[get_profile_store] = lambda: store
+    profiled.mount("/", app)
+    return TestClient(ProfilingMiddleware(profiled, store, sample_rate=0.0, interval=0.0005))
+
+
+def test_profiles_only_requests_with_header(profiled_client, store):
+    resp = profiled_client.get("/health")
+    assert "x-profile-id" not in resp.headers
+    assert store.list() == []
+
+    resp = profiled_client.get("/health", headers={"X-Profile": "1"})
+    assert resp.status_code == 200
+    name = resp.headers["x-profile-id"]
+    [entry] = store.list()
+    assert entry["name"] == name
+    assert (entry["method"], entry["path"], entry["status"]) == ("GET", "/health", 200)
+
+
+def test_profile_directory_is_bounded(profiled_client, store):
+    names = [profiled_client.get("/health", headers={"X-Profile": "1"}).headers["x-profile-id"] for _ in range(3)]
+    assert [entry["name"] for entry in store.list()] == names[:0:-1]
+
+
+def test_list_and_download_profiles(profiled_client, store):
+    name = profiled_client.get("/health", headers={"X-Profile": "1"}).headers["x-profile-id"]
+
+    assert profiled_client.get("/profiles/", headers=AUTH).json()["profiles"][0]["name"] == name
+    profile = profiled_client.get(f"/profiles/{name}", headers=AUTH).json()
+    assert profile["path"] == "/health" and "stacks" in profile
+    folded = profiled_client.get(f"/profiles/{name}", params={"format": "folded"}, headers=AUTH)
+    assert folded.status_code == 200
+    assert profiled_client.get("/profiles/20250101T000000-deadbeef", headers=AUTH).status_code == 404
+    assert profiled_client.get("/profiles/..%2Fconfig", headers=AUTH).status_code in (404, 422)
+
+
+def test_profiles_require_token(profiled_client, store, monkeypatch):
+    assert profiled_client.get("/profiles/").status_code == 401
+    assert profiled_client.get("/profiles/", headers={"Authorization": "Bearer wrong"}).status_code == 401
+    monkeypatch.setattr(routes.profiles, "PROFILE_TOKEN", "")
+    assert profiled_client.get("/profiles/", headers={"Authorization": "Bearer "}).status_code == 401
+
+
+def test_profiles_not_mounted_when_disabled(client):
+    assert client.get("/profiles/").status_code == 404
+
+
+def test_sampler_records_busy_threads():
+    sampler = StackSampler(interval=0.0005)
+    sampler.start()
+    deadline = time.perf_counter() + 0.05
+    while time.perf_counter() < deadline:
+        sum(range(1000))
+    sampler.stop()
+    assert sampler.samples > 0
+    assert any("test_sampler_records_busy_threads" in stack for stack in sampler.stacks)
@@ -0,0 +1,36 @@
+"""Test fast-path JSON serialization of list endpoints"""
+from datetime import datetime
+
+import routes.responses as responses_module
+from routes.responses import FastJSONResponse
+
+AUTH = {"Authorization": "Bearer testtoken123"}
+
+
+def test_fast_json_response_matches_stdlib_fallback(monkeypatch):
+    content = {"ts": datetime(2025, 11, 14, 10, 30, 45, 123456), "n": 1, "x": None}
+    fast = FastJSONResponse(content).body
+    monkeypatch.setattr(responses_module, "orjson", None)
+    assert FastJSONResponse(content).body == fast
+    assert fast == b'{"ts":"2025-11-14T10:30:45.123456","n":1,"x":null}'
+
+
+def test_list_payload_shape_unchanged(client):
+    payload = {
+        "detection_id": "det_shape",
+        "type": "other",
+        "severity": "medium",
+        "source": "drone",
+        "location": {"lat": 1.5, "lng": 2.5, "zoneLabel": "Shape"},
+        "createdBy": "Tester",
+    }
+    client.post("/alerts/trigger", headers=AUTH, json=payload)
+    alerts = client.get("/alerts/", params={"limit": 100}).json()["alerts"]
+    alert = next(a for a in alerts if a["detection_id"] == "det_shape")
+    assert list(alert) == [
+        "id", "detection_id", "timestamp", "status", "type", "severity",
+        "source", "lat", "lng", "zone_label", "created_by",
+    ]
+    assert alert["status"] == "ACKNOWLEDGED"
+    assert alert["lat"] == 1.5 and alert["zone_label"] == "Shape"
+    datetime.fromisoformat(alert["timestamp"])
@@ -0,0 +1,102 @@
+"""Test archival, restore and image reference release"""
+from datetime import datetime
+
+from database.models import Alert, AlertStatus, Detection, StoredImage
+from database.retention import archive_old_rows, restore_range
+from storage.image_store import acquire_refs
+
+NOW = datetime(2001, 6, 1)
+
+
+def _seed(db):
+    old = Detection(class_name="rhino", confidence=0.9, image_path="old.jpg",
+                    timestamp=datetime(2001, 1, 15))
+    kept = Detection(class_name="rhino", confidence=0.8, image_path="kept.jpg",
+                     timestamp=datetime(2001, 1, 20))
+    db.add_all([old, kept])
+    db.flush()
+    db.add_all([
+        Alert(alert_id="ret_old", detection_id=str(old.id), timestamp=datetime(2001, 2, 1),
+              status=AlertStatus.RESOLVED, type="other", severity="low", source="test"),
+        # Recent alert pins its detection in the hot table
+        Alert(alert_id="ret_new", detection_id=str(kept.id), timestamp=datetime(2001, 5, 30),
+              status=AlertStatus.ACTIVE, type="other", severity="low", source="test"),
+    ])
+    db.commit()
+    return old.id, kept.id
+
+
+def test_archive_and_restore_round_trip(session_factory, test_db, tmp_path):
+    old_id, kept_id = _seed(test_db)
+
+    totals = archive_old_rows(session_factory, days=30, archive_dir=str(tmp_path),
+                              batch_size=1, now=NOW)
+    assert totals == {"alerts": 1, "detections": 1}
+    assert (tmp_path / "alerts" / "2001-02").is_dir()
+    assert (tmp_path / "detections" / "2001-01").is_dir()
+
+    test_db.expire_all()
+    assert test_db.get(Detection, old_id) is None
+    assert test_db.get(Detection, kept_id) is not None
+    assert test_db.query(Alert).filter(Alert.alert_id == "ret_old").first() is None
+
+    restored = restore_range(session_factory, "detections", datetime(2001, 1, 1),
+                             datetime(2001, 2, 1), archive_dir=str(tmp_path))
+    assert restored == 1
+    assert restore_range(session_factory, "alerts", datetime(2001, 2, 1),
+                         datetime(2001, 3, 1), archive_dir=str(tmp_path)) == 1
+
+    test_db.expire_all()
+    detection = test_db.get(Detection, old_id)
+    assert detection.image_path == "old.jpg"
+    assert detection.timestamp == datetime(2001, 1, 15)
+    alert = test_db.query(Alert).filter(Alert.alert_id == "ret_old").one()
+    assert alert.status == AlertStatus.RESOLVED
+    assert not list((tmp_path / "detections").rglob("*.jsonl.gz"))
+
+
+def test_archive_releases_image_references(session_factory, test_db, image_store, tmp_path):
+    store = image_store
+    ref = store.put(test_db, b"archived frame")
+    test_db.add(Detection(class_name="rhino", confidence=0.5, image_path=ref.key,
+                          image_sha256=ref.sha256, timestamp=datetime(2000, 3, 1)))
+    acquire_refs(test_db, [ref.sha256])
+    test_db.commit()
+
+    archive_old_rows(session_factory, days=30, archive_dir=str(tmp_path / "archive"), now=NOW)
+    test_db.expire_all()
+    assert test_db.get(StoredImage, ref.sha256).ref_count == 0
+    assert store.collect_garbage(test_db, grace_seconds=0) == 1
+    assert not store.backend.exists(ref.key)
+
+
+def test_rearchiving_keeps_unrestored_and_skipped_rows(session_factory, test_db, tmp_path):
+    # Ids out of time order, as after a bulk import of historical rows
+    rows = [Detection(class_name="rhino", confidence=0.5, image_path=f"{day}.jpg",
+                      timestamp=datetime(1999, 1, day)) for day in (20, 5, 15)]
+    test_db.add_all(rows)
+    test_db.commit()
+    first_id, middle_id, last_id = (row.id for row in rows)
+    archive_dir = str(tmp_path)
+    now = datetime(1999, 12, 1)
+
+    assert archive_old_rows(session_factory, days=30, archive_dir=archive_dir, now=now)["detections"] == 3
+    # Restore the first and last rows; the middle one stays in the same file
+    assert restore_range(session_factory, "detections", datetime(1999, 1, 10),
+                         datetime(1999, 2, 1), archive_dir=archive_dir) == 2
+    # Archived again with the same first and last id
+    assert archive_old_rows(session_factory, days=30, archive_dir=archive_dir, now=now)["detections"] == 2
+    assert len(list((tmp_path / "detections" / "1999-01").glob("*.jsonl.gz"))) == 2
+
+    # A row already back in the table is skipped and stays archived
+    test_db.add(Detection(id=middle_id, class_name="rhino", confidence=0.5, image_path="dup.jpg",
+                          timestamp=datetime(1999, 1, 5)))
+    test_db.commit()
+    assert restore_range(session_factory, "detections", datetime(1999, 1, 1),
+                         datetime(1999, 2, 1), archive_dir=archive_dir) == 2
+    test_db.expire_all()
+    assert test_db.get(Detection, first_id) is not None and test_db.get(Detection, last_id) is not None
+    assert len(list((tmp_path / "detections").rglob("*.jsonl.gz"))) == 1
+
+    test_db.query(Detection).filter(Detection.id.in_([first_id, middle_id, last_id])).delete()
+    test_db.commit()
@@ -0,0 +1,30 @@
+import os
+import subprocess
+import sys
+
+from fastapi.testclient import TestClient
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Only imported when first used or during the lifespan warm-up
+LAZY_MODULES = ("torch", "PIL", "smtplib", "alembic", "pyarrow", "dotenv")
+
+
+def test_import_main_is_lazy():
+    script = f"import sys, main; print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=ROOT_DIR, env={**os.environ, "SKIP_YOLO": "1"}, capture_output=True, text=True, check=True,
+    )
+    loaded = [m for m in result.stdout.strip().split(",") if m]
+    assert loaded == [], f"imported at startup: {loaded}"
+
+
+def test_lifespan_warms_up_detector():
+    from main import app
+    from models.yolo_detector import get_detector
+
+    get_detector.cache_clear()
+    with TestClient(app) as client:
+        assert get_detector.cache_info().currsize == 1
+        assert client.get("/health/live").status_code == 200
@@ -0,0 +1,121 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from sqlalchemy import create_engine, delete, func, select
+from sqlalchemy.orm import sessionmaker
+
+from database.models import Base, Detection, DetectionCellRollup, DetectionCountRollup
+from database.retention import archive_old_rows
+from database.rollups import backfill, cell_of
+from database.versions import get_table_version
+
+DAY = datetime(2024, 5, 4)
+
+
+def _detection(hour, minute, class_name, zone, confidence, lat=-23.8859, lng=31.5205):
+    return Detection(
+        timestamp=DAY.replace(hour=hour, minute=minute), class_name=class_name, confidence=confidence,
+        image_path="x", zone_label=zone, gps_lat=lat, gps_lng=lng,
+    )
+
+
+def _seed(session_factory):
+    with session_factory() as db:
+        for model in (DetectionCountRollup, DetectionCellRollup):
+            db.execute(delete(model).where(model.bucket >= DAY))
+        db.add_all([
+            _detection(6, 5, "rhino", "North", 0.8),
+            _detection(6, 40, "rhino", "North", 0.6),
+            _detection(7, 15, "rhino", None, 0.9, lat=-23.5, lng=31.2),
+            _detection(7, 20, "person", "North", 0.7, lat=None, lng=None),
+        ])
+        db.commit()
+
+
+def test_rollups_maintained_on_insert(client, session_factory):
+    _seed(session_factory)
+    window = {"date_from": "2024-05-04T00:00:00", "date_to": "2024-05-04T23:59:59"}
+
+    series = client.get("/stats/timeseries", params=window).json()["series"]
+    assert [(r["bucket"], r["class_name"], r["zone_label"], r["count"]) for r in series] == [
+        ("2024-05-04T06:00:00", "rhino", "North", 2),
+        ("2024-05-04T07:00:00", "person", "North", 1),
+        ("2024-05-04T07:00:00", "rhino", None, 1),
+    ]
+    assert series[0]["avg_confidence"] == 0.7
+
+    daily = client.get("/stats/timeseries", params={**window, "interval": "day", "class_name": "rhino"}).json()
+    assert [(r["bucket"], r["zone_label"], r["count"]) for r in daily["series"]] == [
+        ("2024-05-04T00:00:00", None, 1), ("2024-05-04T00:00:00", "North", 2),
+    ]
+
+    heatmap = client.get("/stats/heatmap", params=window).json()
+    assert heatmap["max"] == 2
+    assert sorted(c["count"] for c in heatmap["cells"]) == [1, 2]  # the person has no GPS
+
+
+def test_backfill_rebuilds_range(client, session_factory):
+    _seed(session_factory)
+    with session_factory() as db:
+        before = db.query(DetectionCountRollup).filter(DetectionCountRollup.bucket >= DAY).count()
+        db.execute(delete(DetectionCountRollup).where(DetectionCountRollup.bucket >= DAY))
+        db.commit()
+
+    assert backfill(session_factory, DAY, DAY.replace(hour=23, minute=30)) >= 4
+    with session_factory() as db:
+        assert db.query(DetectionCountRollup).filter(DetectionCountRollup.bucket >= DAY).count() == before
+        north = db.get(DetectionCountRollup, (DAY.replace(hour=6), "rhino", "North"))
+        # Rebuilt from every stored detection in the range, not incremented on top
+        assert north.count == db.query(Detection).filter(
+            Detection.zone_label == "North", Detection.class_name == "rhino",
+            Detection.timestamp >= DAY.replace(hour=6), Detection.timestamp < DAY.replace(hour=7),
+        ).count()
+        x, y = cell_of(-23.5, 31.2)
+        assert db.get(DetectionCellRollup, (DAY.replace(hour=7), "rhino", x, y)).count >= 1
+
+
+def test_backfill_keeps_archived_hours(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'rollups.db'}")
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    _seed(factory)
+    archive_dir = str(tmp_path / "archive")
+    assert archive_old_rows(factory, days=0, archive_dir=archive_dir, now=DAY.replace(hour=7))["detections"] == 2
+
+    with factory() as db:
+        version = get_table_version(db, Detection.__tablename__)
+    # Full-range rebuild: the archived 06:00 hour is recomputed from the archive
+    assert backfill(factory, archive_dir=archive_dir) == 4
+    with factory() as db:
+        assert db.get(DetectionCountRollup, (DAY.replace(hour=6), "rhino", "North")).count == 2
+        assert db.get(DetectionCountRollup, (DAY.replace(hour=7), "rhino", "")).count == 1
+        assert get_table_version(db, Detection.__tablename__) > version
+    engine.dispose()
+
+
+def test_concurrent_writers_keep_rollups_exact(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'rollups.db'}", connect_args={"timeout": 30})
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+
+    def write(worker):
+        for i in range(20):
+            with factory() as db:
+                # Same hour for every writer, classes in opposite orders
+                classes = ["rhino", "elephant"] if worker % 2 else ["elephant", "rhino"]
+                db.add_all([_detection(6, i, name, "North", 0.5) for name in classes])
+                db.commit()
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(write, range(4)))
+
+    with factory() as db:
+        counts = dict(db.execute(select(DetectionCountRollup.class_name, DetectionCountRollup.count)).all())
+        cells = db.execute(select(func.sum(DetectionCellRollup.count))).scalar()
+        assert counts == {"rhino": 80, "elephant": 80}
+        assert cells == db.query(Detection).count() == 160
+    engine.dispose()
+
+
+def test_invalid_interval(client):
+    assert client.get("/stats/timeseries", params={"interval": "week"}).status_code == 422
@@ -0,0 +1,163 @@
+import json
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import numpy as np
+
+from database.models import Alert, Detection, Track
+from utils.alert_rules import RuleEngine
+from utils.tracking import Tracker, assign_tracks, iou_matrix, link_best_detections, lock_cameras, match_boxes
+
+T0 = datetime(2026, 3, 1, 6, 0)
+
+
+def test_iou_matrix():
+    a = np.array([[0, 0, 10, 10], [20, 20, 30, 30]], dtype=float)
+    b = np.array([[0, 0, 10, 10], [5, 0, 15, 10]], dtype=float)
+    assert np.allclose(iou_matrix(a, b), [[1.0, 50 / 150], [0.0, 0.0]])
+
+
+def test_match_boxes_by_iou_class_and_centroid():
+    tracks = np.array([[0, 0, 10, 10], [100, 100, 120, 140], [50, 50, 60, 60]], dtype=float)
+    boxes = np.array([
+        [1, 1, 11, 11],        # overlaps track 0
+        [106, 130, 126, 170],  # moved past any overlap, centroid still close to track 1
+        [50, 50, 60, 60],      # same place as track 2 but another class
+    ], dtype=float)
+    assigned = match_boxes(boxes, ["rhino", "rhino", "person"], tracks, ["rhino", "rhino", "rhino"],
+                           iou_threshold=0.3, max_centroid_distance=1.0)
+    assert assigned.tolist() == [0, 1, -1]
+
+
+def _detection(camera_id, ts, box, confidence):
+    return Detection(
+        class_name="rhino", confidence=confidence, image_path="x", camera_id=camera_id, timestamp=ts,
+        box_x1=box[0], box_y1=box[1], box_x2=box[2], box_y2=box[3],
+    )
+
+
+def test_assign_tracks_collapses_frames(session_factory):
+    confidences = [0.5, 0.4, 0.7, 0.6, 0.6, 0.9, 0.8, 0.5, 0.5, 0.5]
+    detections = [
+        _detection("cam-track-1", T0 + timedelta(seconds=10 * i), (10 + i, 10, 60 + i, 50), c)
+        for i, c in enumerate(confidences)
+    ]
+    # A second rhino on the same camera, and one long after the first has gone
+    detections.append(_detection("cam-track-1", T0, (300, 300, 350, 340), 0.6))
+    detections.append(_detection("cam-track-1", T0 + timedelta(hours=1), (10, 10, 60, 50), 0.6))
+
+    with session_factory() as db:
+        stored = assign_tracks(db, detections, Tracker(max_gap_seconds=60))
+        db.flush()
+        link_best_detections(detections)
+        db.commit()
+
+        # Only frames that opened a track or beat its best confidence are written
+        assert [d.confidence for d in stored] == [0.5, 0.7, 0.9, 0.6, 0.6]
+        tracks = db.query(Track).filter(Track.camera_id == "cam-track-1").order_by(Track.id).all()
+        assert len(tracks) == 3
+        first = tracks[0]
+        assert (first.detection_count, first.best_confidence) == (10, 0.9)
+        assert (first.first_seen, first.last_seen) == (T0, T0 + timedelta(seconds=90))
+        assert first.best_detection_id == stored[2].id
+        assert {d.track_id for d in detections[:10]} == {first.id}
+
+
+def test_tracking_resumes_from_database(session_factory):
+    with session_factory() as db:
+        first = _detection("cam-track-2", T0, (10, 10, 60, 50), 0.8)
+        assign_tracks(db, [first], Tracker())
+        db.commit()
+        track_id = first.track.id
+
+    with session_factory() as db:
+        later = _detection("cam-track-2", T0 + timedelta(seconds=30), (12, 10, 62, 50), 0.7)
+        assert assign_tracks(db, [later], Tracker()) == []
+        db.commit()
+        assert later.track.id == track_id
+        assert db.get(Track, track_id).detection_count == 2
+
+
+def test_lock_cameras_takes_sorted_advisory_locks(session_factory):
+    statements = []
+    postgres = SimpleNamespace(name="postgresql")
+    db = SimpleNamespace(get_bind=lambda: SimpleNamespace(dialect=postgres), execute=statements.append)
+    lock_cameras(db, {"cam-b", "cam-a"})
+    assert all("pg_advisory_xact_lock" in str(stmt) for stmt in statements)
+    assert [stmt.compile().params["hashtext_1"] for stmt in statements] == ["cam-a", "cam-b"]
+
+    with session_factory() as sqlite_db:
+        lock_cameras(sqlite_db, {"cam-a"})  # no-op without advisory locks
+
+
+def test_upload_alerts_once_per_track(client, session_factory, tmp_path, monkeypatch):
+    from main import app
+    from routes.api import upload_detector
+    from tests.test_upload import _FakeDetector, _make_image_bytes
+
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps({"rules": [{"name": "rhino-track", "classes": ["rhino"]}]}))
+    engine = RuleEngine.from_file(str(path))
+    monkeypatch.setattr("routes.api.get_rule_engine", lambda: engine)
+    app.dependency_overrides[upload_detector] = lambda: _FakeDetector()
+    try:
+        bodies = [
+            client.post(
+                "/upload/",
+                files={"file": ("f.jpg", _make_image_bytes(), "image/jpeg")},
+                data={"camera_id": "cam-track-3"},
+            ).json()
+            for _ in range(3)
+        ]
+    finally:
+        del app.dependency_overrides[upload_detector]
+
+    track_ids = {body["detections"][0]["track_id"] for body in bodies}
+    assert len(track_ids) == 1 and None not in track_ids
+    # Later frames only extend the track
+    assert bodies[0]["detections"][0]["id"] is not None
+    assert [body["detections"][0]["id"] for body in bodies[1:]] == [None, None]
+    assert bodies[0]["alerts"] == [f"rule-rhino-track-t{track_ids.pop()}"]
+    assert bodies[1]["alerts"] == bodies[2]["alerts"] == []
+
+    with session_factory() as db:
+        # The DB is shared across test modules; leave /alerts/ empty for them
+        db.query(Alert).filter(Alert.alert_id == bodies[0]["alerts"][0]).delete()
+        db.commit()
+
+
+def _jpeg_from_camera(serial=None):
+    from io import BytesIO
+
+    from PIL import Image
+
+    exif = Image.Exif()
+    exif[0x010F], exif[0x0110] = "Bushnell", "CORE DS"
+    if serial:
+        exif.get_ifd(0x8769)[0xA431] = serial
+    buf = BytesIO()
+    Image.new("RGB", (64, 64), (128, 128, 128)).save(buf, "JPEG", exif=exif)
+    buf.seek(0)
+    return buf
+
+
+def test_upload_tracks_exif_cameras_by_serial_only(client):
+    from main import app
+    from routes.api import upload_detector
+    from tests.test_upload import _FakeDetector
+
+    app.dependency_overrides[upload_detector] = lambda: _FakeDetector()
+    try:
+        def upload(serial=None):
+            files = {"file": ("f.jpg", _jpeg_from_camera(serial), "image/jpeg")}
+            return client.post("/upload/", files=files).json()["detections"][0]
+
+        # Same make and model, no serial: two traps that must not share a track
+        unnamed = [upload(), upload()]
+        serial = [upload("CORE-0017"), upload("CORE-0017")]
+    finally:
+        del app.dependency_overrides[upload_detector]
+
+    assert [d["track_id"] for d in unnamed] == [None, None]
+    assert serial[0]["track_id"] is not None
+    assert serial[0]["track_id"] == serial[1]["track_id"]
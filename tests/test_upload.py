@@ -1,6 +1,10 @@
 import io
+
+import pytest
 from PIL import Image
 
+from database.models import Detection, StoredImage
+
 def _make_image_bytes():
     img = Image.new("RGB", (64, 64), color=(128, 128, 128))
     buf = io.BytesIO()
@@ -17,4 +21,99 @@ def test_upload_image_minimal(client):
     body = resp.json()
     # Current simplified endpoint response
     assert body.get("status") == "success"
-    assert body.get("filename") in ("test.jpg", "test_image.jpg")
\ No newline at end of file
+    assert body.get("filename") in ("test.jpg", "test_image.jpg")
+def test_upload_stores_image_once(client):
+    data = _make_image_bytes().getvalue()
+    first = client.post("/upload/", files={"file": ("a.jpg", data, "image/jpeg")}).json()
+    second = client.post("/upload/", files={"file": ("b.jpg", data, "image/jpeg")}).json()
+    assert first["image"]["sha256"] == second["image"]["sha256"]
+    assert first["image"]["size"] == len(data)
+    assert second["image"]["deduplicated"] is True
+
+
+class _FakeDetector:
+    def predict_bytes(self, data):
+        return [{"box": [4.0, 6.0, 40.0, 50.0], "confidence": 0.91, "class": 0, "class_name": "rhino"}]
+
+
+def _jpeg_with_gps(lat_dms, lng_dms, color=(10, 120, 30)):
+    img = Image.new("RGB", (64, 64), color=color)
+    exif = Image.Exif()
+    gps = exif.get_ifd(0x8825)
+    gps[1], gps[2] = "S", lat_dms
+    gps[3], gps[4] = "E", lng_dms
+    buf = io.BytesIO()
+    img.save(buf, format="JPEG", exif=exif)
+    return buf.getvalue()
+
+
+@pytest.fixture
+def fake_detector():
+    from main import app
+    from routes.api import upload_detector
+
+    app.dependency_overrides[upload_detector] = lambda: _FakeDetector()
+    yield
+    del app.dependency_overrides[upload_detector]
+
+
+def test_upload_falls_back_to_exif_gps(client, fake_detector, session_factory):
+    data = _jpeg_with_gps((23.0, 53.0, 9.24), (31.0, 31.0, 13.8))
+    resp = client.post("/upload/", files={"file": ("cam.jpg", data, "image/jpeg")})
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["coordinates"]["source"] == "exif"
+    assert body["coordinates"]["lat"] == pytest.approx(-23.8859, abs=1e-4)
+    assert body["coordinates"]["lng"] == pytest.approx(31.5205, abs=1e-4)
+
+    [det] = body["detections"]
+    with session_factory() as db:
+        row = db.get(Detection, det["id"])
+        assert row.gps_source == "exif"
+        assert row.metadata_ms is not None and row.metadata_ms >= 0
+        assert (row.box_x1, row.box_y2) == (4.0, 50.0)
+        assert db.get(StoredImage, row.image_sha256).ref_count >= 1
+
+
+def test_upload_form_coordinates_win_over_exif(client, fake_detector):
+    data = _jpeg_with_gps((1.0, 0.0, 0.0), (2.0, 0.0, 0.0), color=(200, 10, 10))
+    resp = client.post(
+        "/upload/",
+        files={"file": ("cam.jpg", data, "image/jpeg")},
+        data={"gps_lat": "-23.5", "gps_lng": "31.25"},
+    )
+    assert resp.status_code == 200
+    assert resp.json()["coordinates"] == {"lat": -23.5, "lng": 31.25, "source": "form"}
+
+
+class _FailingDetector:
+    def predict_bytes(self, data):
+        raise RuntimeError("Model prediction failed: boom")
+
+
+def test_failed_inference_waits_for_image_store(client, monkeypatch):
+    import time
+
+    import routes.api
+    from main import app
+    from routes.api import upload_detector
+
+    store, finished = routes.api.get_image_store(), []
+
+    class _SlowStore:
+        def put(self, db, data, content_type=None):
+            time.sleep(0.2)
+            ref = store.put(db, data, content_type)
+            finished.append(ref)
+            return ref
+
+    monkeypatch.setattr(routes.api, "get_image_store", lambda: _SlowStore())
+    app.dependency_overrides[upload_detector] = lambda: _FailingDetector()
+    try:
+        resp = client.post("/upload/", files={"file": ("f.jpg", _make_image_bytes().getvalue(), "image/jpeg")})
+    finally:
+        del app.dependency_overrides[upload_detector]
+
+    assert resp.status_code == 400
+    # The session was only rolled back and closed after the store was done with it
+    assert len(finished) == 1
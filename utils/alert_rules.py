@@ -0,0 +1,268 @@
+"""
+Alert Rules Module
+
+Creates alerts automatically from new detections. Rules are loaded from a
+JSON file and compiled once into an index keyed by (class, zone), so each
+detection is only checked against the rules that can apply to it rather
+than against every rule.
+
+A rule matches a detection on class, minimum confidence, zone and local time
+of day. It fires once ``min_count`` matching detections have been seen in
+the same zone within ``window_seconds``, and then stays quiet for
+``cooldown_seconds``. Repeat counts and cooldowns live in process memory.
+Detections linked to a track raise at most one alert per rule and track.
+
+Rules file::
+
+    {
+      "utc_offset_minutes": 120,
+      "rules": [
+        {
+          "name": "sanctuary-night-person",
+          "classes": ["person"],
+          "zones": ["Sanctuary"],
+          "min_confidence": 0.6,
+          "hours": ["18:00", "06:00"],
+          "min_count": 2,
+          "window_seconds": 600,
+          "cooldown_seconds": 1800,
+          "type": "poacher_suspected",
+          "severity": "high"
+        }
+      ]
+    }
+
+Omitted ``classes``/``zones``/``hours`` match anything.
+"""
+
+import json
+import logging
+import threading
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Deque, Dict, FrozenSet, Iterable, List, Optional, Tuple, Union
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from database.models import Alert, AlertStatus
+
+logger = logging.getLogger(__name__)
+
+# Index key component meaning "any class" / "any zone"
+ANY = None
+
+
+def _minute_of_day(value: Union[str, int, float]) -> int:
+    """Parse ``"HH:MM"`` or an hour number into minutes after midnight."""
+    if isinstance(value, str):
+        hours, _, minutes = value.partition(":")
+        return int(hours) * 60 + int(minutes or 0)
+    return int(round(float(value) * 60))
+
+
+@dataclass(frozen=True)
+class AlertRule:
+    """
+    A compiled alert rule.
+
+    Attributes:
+        name (str): Unique rule name, used in alert IDs and sources
+        classes (frozenset): Class names the rule applies to (None = any)
+        zones (frozenset): Zone labels the rule applies to (None = any)
+        min_confidence (float): Lowest confidence that counts
+        hours (tuple): Active local time window as minutes after midnight
+            ``(start, end)``, wrapping past midnight when start > end
+        min_count (int): Matching detections needed within the window
+        window_seconds (int): Length of the repeat-count window
+        cooldown_seconds (int): Quiet period per zone after the rule fires
+        type (str): Alert type of created alerts
+        severity (str): Alert severity of created alerts
+    """
+    name: str
+    classes: Optional[FrozenSet[str]] = None
+    zones: Optional[FrozenSet[str]] = None
+    min_confidence: float = 0.0
+    hours: Optional[Tuple[int, int]] = None
+    min_count: int = 1
+    window_seconds: int = 0
+    cooldown_seconds: int = 0
+    type: str = "other"
+    severity: str = "medium"
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "AlertRule":
+        """Compile one rule from its JSON form."""
+        hours = data.get("hours")
+        return cls(
+            name=str(data["name"]),
+            classes=frozenset(data["classes"]) if data.get("classes") else None,
+            zones=frozenset(data["zones"]) if data.get("zones") else None,
+            min_confidence=float(data.get("min_confidence", 0.0)),
+            hours=(_minute_of_day(hours[0]), _minute_of_day(hours[1])) if hours else None,
+            min_count=max(1, int(data.get("min_count", 1))),
+            window_seconds=int(data.get("window_seconds", 0)),
+            cooldown_seconds=int(data.get("cooldown_seconds", 0)),
+            type=str(data.get("type", "other")),
+            severity=str(data.get("severity", "medium")),
+        )
+
+    def in_hours(self, minute: int) -> bool:
+        """Whether a local minute-of-day falls in the rule's time window."""
+        if self.hours is None:
+            return True
+        start, end = self.hours
+        if start <= end:
+            return start <= minute < end
+        return minute >= start or minute < end
+
+
+class RuleEngine:
+    """
+    Evaluates detections against an indexed rule set.
+
+    Args:
+        rules: Compiled rules, in precedence order
+        utc_offset_minutes: Offset of the park's local time from the UTC
+            detection timestamps, used for ``hours`` windows
+    """
+
+    def __init__(self, rules: Iterable[AlertRule], utc_offset_minutes: int = 0):
+        self.rules = list(rules)
+        self.utc_offset = timedelta(minutes=utc_offset_minutes)
+        self._index: Dict[Tuple[Optional[str], Optional[str]], List[Tuple[int, AlertRule]]] = {}
+        for order, rule in enumerate(self.rules):
+            for class_name in rule.classes or (ANY,):
+                for zone in rule.zones or (ANY,):
+                    self._index.setdefault((class_name, zone), []).append((order, rule))
+        # Merged candidate lists per concrete (class, zone), built on first use
+        self._candidates: Dict[Tuple[Optional[str], Optional[str]], Tuple[AlertRule, ...]] = {}
+        self._windows: Dict[Tuple[str, Optional[str]], Deque[datetime]] = {}
+        self._last_fired: Dict[Tuple[str, Optional[str]], datetime] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, path: str) -> "RuleEngine":
+        """Load a rules file; a missing file means no rules."""
+        try:
+            with open(path, "r", encoding="utf-8") as fh:
+                data = json.load(fh)
+        except FileNotFoundError:
+            return cls([])
+        rules = [AlertRule.from_dict(r) for r in data.get("rules", [])]
+        logger.info("Loaded %d alert rules from %s", len(rules), path)
+        return cls(rules, int(data.get("utc_offset_minutes", 0)))
+
+    def candidates(self, class_name: Optional[str], zone: Optional[str]) -> Tuple[AlertRule, ...]:
+        """Rules that can apply to a (class, zone) pair, in precedence order."""
+        key = (class_name, zone)
+        found = self._candidates.get(key)
+        if found is None:
+            index = self._index
+            buckets = [index.get(k, ()) for k in {key, (class_name, ANY), (ANY, zone), (ANY, ANY)}]
+            found = tuple(rule for _, rule in sorted(entry for bucket in buckets for entry in bucket))
+            self._candidates[key] = found
+        return found
+
+    def evaluate(self, detection) -> List[AlertRule]:
+        """
+        Rules that fire for a detection, updating repeat counts and cooldowns.
+
+        ``detection`` needs ``class_name``, ``confidence``, ``zone_label`` and
+        ``timestamp`` attributes.
+        """
+        rules = self.candidates(detection.class_name, detection.zone_label)
+        if not rules:
+            return []
+        ts = detection.timestamp
+        local = ts + self.utc_offset
+        minute = local.hour * 60 + local.minute
+        fired = []
+        with self._lock:
+            for rule in rules:
+                if detection.confidence < rule.min_confidence or not rule.in_hours(minute):
+                    continue
+                key = (rule.name, detection.zone_label)
+                last = self._last_fired.get(key)
+                if last is not None and (ts - last).total_seconds() < rule.cooldown_seconds:
+                    continue
+                if rule.min_count > 1:
+                    window = self._windows.setdefault(key, deque())
+                    window.append(ts)
+                    while (ts - window[0]).total_seconds() > rule.window_seconds:
+                        window.popleft()
+                    if len(window) < rule.min_count:
+                        continue
+                    window.clear()
+                self._last_fired[key] = ts
+                fired.append(rule)
+        return fired
+
+    @staticmethod
+    def alert_id(rule: AlertRule, detection) -> str:
+        """Alert ID: one per rule and track, or per rule and detection if untracked."""
+        track_id = getattr(detection, "track_id", None)
+        if track_id is not None:
+            return f"rule-{rule.name}-t{track_id}"
+        return f"rule-{rule.name}-{detection.id}"
+
+    @classmethod
+    def alert_values(cls, rule: AlertRule, detection, now: datetime) -> dict:
+        """Column values for an alert raised by ``rule`` for ``detection``."""
+        detection_id = detection.id
+        if detection_id is None and detection.track is not None:
+            # Frame collapsed into its track: point at the track's stored detection
+            detection_id = detection.track.best_detection_id
+        return dict(
+            alert_id=cls.alert_id(rule, detection),
+            detection_id=str(detection_id),
+            status=AlertStatus.ACTIVE,
+            type=rule.type,
+            severity=rule.severity,
+            source=f"rule:{rule.name}",
+            lat=detection.gps_lat,
+            lng=detection.gps_lng,
+            zone_label=detection.zone_label,
+            created_by="rules-engine",
+            notification_sent=0,
+            message=(
+                f"Rule {rule.name}: {detection.class_name} ({detection.confidence:.0%})"
+                + (f" in {detection.zone_label}" if detection.zone_label else "")
+            ),
+            timestamp=now,
+            updated_at=now,
+        )
+
+    def process(self, db: Session, detections: Iterable) -> List[str]:
+        """
+        Evaluate flushed detections and insert the resulting alerts in one
+        statement, skipping tracks that already have an alert from the same
+        rule. Does not commit.
+
+        Returns:
+            list: IDs of the created alerts
+        """
+        now = datetime.utcnow()
+        values = {}
+        for detection in detections:
+            for rule in self.evaluate(detection):
+                alert_id = self.alert_id(rule, detection)
+                if alert_id not in values:
+                    values[alert_id] = self.alert_values(rule, detection, now)
+        if values:
+            existing = set(db.execute(select(Alert.alert_id).where(Alert.alert_id.in_(values))).scalars())
+            rows = [v for alert_id, v in values.items() if alert_id not in existing]
+            if rows:
+                db.execute(insert(Alert), rows)
+            return [v["alert_id"] for v in rows]
+        return []
+
+
+@lru_cache(maxsize=1)
+def get_rule_engine() -> RuleEngine:
+    """Process-wide rule engine built from configuration."""
+    from config import ALERT_RULES_PATH
+
+    return RuleEngine.from_file(ALERT_RULES_PATH)
@@ -0,0 +1,146 @@
+"""
+CPU Thread Planning Module
+
+Sizes torch's thread pools and the inference thread pool from the CPUs a
+worker may actually use, so several web workers on one host don't each
+start a full set of torch threads and oversubscribe the cores.
+
+The CPU budget is the smaller of the scheduler affinity mask and the cgroup
+CPU quota (cgroup v2 ``cpu.max`` or v1 ``cpu.cfs_quota_us`` /
+``cpu.cfs_period_us``), since containers commonly see every host core but
+may only use a fraction of them. It is divided evenly between the
+``WEB_CONCURRENCY`` workers of the host. Per worker:
+
+- torch intra-op threads = the worker's share of CPUs
+- torch inter-op threads = 1 (the YOLO graph has no parallel branches)
+- inference pool size = share // intra-op threads, i.e. one model call at a
+  time unless the intra-op threads are pinned lower
+
+Each value can be fixed with ``TORCH_INTRA_OP_THREADS``,
+``TORCH_INTER_OP_THREADS`` and ``INFERENCE_POOL_SIZE``; ``0`` means auto.
+"""
+
+import logging
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+CGROUP_ROOT = "/sys/fs/cgroup"
+
+
+@dataclass(frozen=True)
+class CpuPlan:
+    """Thread settings of one worker."""
+
+    cpus: float  # CPUs available to the whole host/container
+    workers: int
+    intra_op_threads: int
+    inter_op_threads: int
+    inference_pool_size: int
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def _read(path: str) -> Optional[str]:
+    try:
+        with open(path) as fh:
+            return fh.read().strip()
+    except OSError:
+        return None
+
+
+def cgroup_cpu_limit(root: str = CGROUP_ROOT) -> Optional[float]:
+    """
+    CPU quota of the current cgroup in CPUs, or None when unlimited.
+
+    Reads cgroup v2 ``cpu.max`` (``"<quota> <period>"`` or ``"max <period>"``),
+    falling back to the v1 CFS quota and period files.
+    """
+    value = _read(os.path.join(root, "cpu.max"))
+    if value:
+        quota, _, period = value.partition(" ")
+        if quota != "max" and period:
+            return int(quota) / int(period)
+        return None
+
+    quota = _read(os.path.join(root, "cpu", "cpu.cfs_quota_us"))
+    period = _read(os.path.join(root, "cpu", "cpu.cfs_period_us"))
+    if quota and period and int(quota) > 0 and int(period) > 0:
+        return int(quota) / int(period)
+    return None
+
+
+def available_cpus(root: str = CGROUP_ROOT) -> float:
+    """CPUs this process may use: affinity mask capped by the cgroup quota."""
+    try:
+        cpus = float(len(os.sched_getaffinity(0)))
+    except AttributeError:  # not available on macOS / Windows
+        cpus = float(os.cpu_count() or 1)
+    limit = cgroup_cpu_limit(root)
+    return min(cpus, limit) if limit else cpus
+
+
+def plan_cpu(
+    cpus: float,
+    workers: int = 1,
+    intra_op_threads: int = 0,
+    inter_op_threads: int = 0,
+    inference_pool_size: int = 0,
+) -> CpuPlan:
+    """
+    Split ``cpus`` between ``workers`` and derive the per-worker thread counts.
+
+    Explicit (non-zero) settings are kept as given; a fractional quota is
+    rounded up, since a worker can still use part of a CPU.
+    """
+    workers = max(1, workers)
+    share = max(1, math.ceil(cpus / workers))
+    intra = intra_op_threads or share
+    inter = inter_op_threads or 1
+    pool = inference_pool_size or max(1, share // intra)
+    return CpuPlan(
+        cpus=cpus, workers=workers, intra_op_threads=intra, inter_op_threads=inter, inference_pool_size=pool
+    )
+
+
+@lru_cache(maxsize=1)
+def get_cpu_plan() -> CpuPlan:
+    """Plan for this worker, built from configuration and the detected CPU budget."""
+    from config import INFERENCE_POOL_SIZE, TORCH_INTER_OP_THREADS, TORCH_INTRA_OP_THREADS, WEB_CONCURRENCY
+
+    return plan_cpu(
+        available_cpus(),
+        workers=WEB_CONCURRENCY,
+        intra_op_threads=TORCH_INTRA_OP_THREADS,
+        inter_op_threads=TORCH_INTER_OP_THREADS,
+        inference_pool_size=INFERENCE_POOL_SIZE,
+    )
+
+
+def apply_torch_threads(plan: CpuPlan) -> None:
+    """
+    Configure torch's intra- and inter-op pools.
+
+    Must run before the first forward pass: torch refuses to resize the
+    inter-op pool once it has been used, which is only logged.
+    """
+    import torch
+
+    torch.set_num_threads(plan.intra_op_threads)
+    try:
+        torch.set_num_interop_threads(plan.inter_op_threads)
+    except RuntimeError as e:
+        logger.warning("Could not set torch inter-op threads: %s", e)
+    logger.info("CPU plan: %s", plan.as_dict())
+
+
+@lru_cache(maxsize=1)
+def get_inference_executor() -> ThreadPoolExecutor:
+    """Dedicated pool for model calls, sized by the CPU plan."""
+    return ThreadPoolExecutor(max_workers=get_cpu_plan().inference_pool_size, thread_name_prefix="inference")
@@ -0,0 +1,273 @@
+"""
+EXIF Metadata Module
+
+Extracts capture metadata (timestamp, GPS position, altitude and camera
+identity) from image bytes without decoding pixels or going through PIL.
+For JPEGs only the marker headers are walked until the APP1 ``Exif`` segment
+is found, and only the handful of TIFF tags we need are decoded from it; raw
+TIFF files are parsed directly. Everything comes out of a single pass over
+the first few kilobytes of the upload buffer.
+"""
+
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import BinaryIO, Dict, Iterable, List, Optional, Tuple, Union
+
+# Bytes read from a file before giving up on finding the EXIF segment. APP1 is
+# capped at 64 KiB and normally follows SOI or a short APP0/JFIF block.
+HEADER_BYTES = 256 * 1024
+
+# IFD0 tags
+_MAKE, _MODEL, _DATETIME = 0x010F, 0x0110, 0x0132
+_EXIF_IFD, _GPS_IFD = 0x8769, 0x8825
+# Exif IFD tags
+_DATETIME_ORIGINAL, _OFFSET_TIME_ORIGINAL = 0x9003, 0x9011
+_BODY_SERIAL = 0xA431
+# GPS IFD tags
+_LAT_REF, _LAT, _LNG_REF, _LNG, _ALT_REF, _ALT = 1, 2, 3, 4, 5, 6
+
+# TIFF field type -> (struct code, size in bytes)
+_TYPES = {
+    1: ("B", 1), 2: ("s", 1), 3: ("H", 2), 4: ("L", 4), 5: ("LL", 8),
+    7: ("B", 1), 9: ("l", 4), 10: ("ll", 8),
+}
+
+Source = Union[bytes, bytearray, memoryview, str, BinaryIO]
+
+
+@dataclass(frozen=True)
+class ImageMetadata:
+    """
+    Capture metadata of an image. Fields are None when not recorded.
+
+    Attributes:
+        timestamp (datetime): Capture time, converted to UTC when the camera
+            recorded its offset, otherwise the camera's local clock
+        lat (float): Latitude in decimal degrees (south negative)
+        lng (float): Longitude in decimal degrees (west negative)
+        altitude (float): Altitude in metres (below sea level negative)
+        camera_id (str): Body serial number, the only tag unique per device
+        camera_model (str): "Make Model"; shared by every unit of a model, so
+            never used as a camera ID
+    """
+    timestamp: Optional[datetime] = None
+    lat: Optional[float] = None
+    lng: Optional[float] = None
+    altitude: Optional[float] = None
+    camera_id: Optional[str] = None
+    camera_model: Optional[str] = None
+
+    @property
+    def gps(self) -> Optional[Tuple[float, float]]:
+        """(lat, lng) if both are present."""
+        if self.lat is None or self.lng is None:
+            return None
+        return (self.lat, self.lng)
+
+
+def find_tiff_block(data: bytes) -> Optional[memoryview]:
+    """
+    Locate the TIFF structure holding EXIF data.
+
+    Returns the APP1 payload for JPEGs (stopping at start-of-scan, before any
+    entropy-coded data), the whole buffer for TIFF files, or None.
+    """
+    view = memoryview(data)
+    if data[:4] in (b"II*\x00", b"MM\x00*"):
+        return view
+    if data[:2] != b"\xff\xd8":
+        return None
+
+    i, n = 2, len(data)
+    while i + 4 <= n:
+        if data[i] != 0xFF:
+            return None
+        marker = data[i + 1]
+        if marker == 0xFF:  # fill byte
+            i += 1
+            continue
+        if marker in (0xD9, 0xDA):  # EOI / SOS: no metadata past this point
+            return None
+        if 0xD0 <= marker <= 0xD7 or marker == 0x01:  # standalone markers
+            i += 2
+            continue
+        length = (data[i + 2] << 8) | data[i + 3]
+        if marker == 0xE1 and data[i + 4:i + 10] == b"Exif\x00\x00":
+            return view[i + 10:i + 2 + length]
+        i += 2 + length
+    return None
+
+
+class _TiffReader:
+    """Minimal reader for the tags ``extract_metadata`` needs."""
+
+    def __init__(self, buf: memoryview):
+        self.buf = buf
+        self.endian = "<" if bytes(buf[:2]) == b"II" else ">"
+
+    def _unpack(self, fmt: str, offset: int):
+        return struct.unpack_from(self.endian + fmt, self.buf, offset)
+
+    def ifd(self, offset: int, wanted: frozenset) -> Dict[int, object]:
+        """Decode the ``wanted`` tags of the IFD at ``offset``."""
+        values = {}
+        if offset <= 0 or offset + 2 > len(self.buf):
+            return values
+        (count,) = self._unpack("H", offset)
+        for k in range(count):
+            entry = offset + 2 + 12 * k
+            if entry + 12 > len(self.buf):
+                break
+            tag, ftype, n = self._unpack("HHL", entry)
+            if tag not in wanted or ftype not in _TYPES:
+                continue
+            code, size = _TYPES[ftype]
+            total = size * n
+            data_at = entry + 8 if total <= 4 else self._unpack("L", entry + 8)[0]
+            if data_at + total > len(self.buf):
+                continue
+            if ftype == 2:
+                raw = bytes(self.buf[data_at:data_at + n])
+                values[tag] = raw.split(b"\x00", 1)[0].decode("ascii", "replace").strip()
+            elif ftype in (5, 10):
+                parts = self._unpack(code[0] * (2 * n), data_at)
+                values[tag] = tuple(
+                    parts[j] / parts[j + 1] if parts[j + 1] else 0.0 for j in range(0, 2 * n, 2)
+                )
+            elif ftype == 7:
+                values[tag] = bytes(self.buf[data_at:data_at + n])
+            else:
+                values[tag] = self._unpack(code * n, data_at)
+        return values
+
+
+# Decoded values come typed by the TIFF field type, which a corrupt or
+# non-conforming file may get wrong; these accessors return None for a value
+# of the wrong type or count instead of letting it raise further down.
+
+def _text(value) -> Optional[str]:
+    """ASCII value (type 2)."""
+    return value if isinstance(value, str) else None
+
+
+def _integer(value) -> Optional[int]:
+    """First element of a BYTE/SHORT/LONG value (types 1, 3, 4, 7)."""
+    if isinstance(value, (tuple, bytes)) and value and isinstance(value[0], int):
+        return value[0]
+    return None
+
+
+def _rationals(value, count: int) -> Optional[Tuple[float, ...]]:
+    """First ``count`` elements of a RATIONAL value (types 5, 10)."""
+    if isinstance(value, tuple) and len(value) >= count and all(isinstance(v, float) for v in value[:count]):
+        return value[:count]
+    return None
+
+
+def _to_degrees(dms, ref, negative_ref: str) -> Optional[float]:
+    dms = _rationals(dms, 3)
+    if dms is None:
+        return None
+    degrees = dms[0] + dms[1] / 60.0 + dms[2] / 3600.0
+    return -degrees if _text(ref) == negative_ref else degrees
+
+
+def _parse_timestamp(value, offset) -> Optional[datetime]:
+    value, offset = _text(value), _text(offset)
+    if not value:
+        return None
+    try:
+        ts = datetime.strptime(value[:19], "%Y:%m:%d %H:%M:%S")
+    except ValueError:
+        return None
+    if offset and len(offset) == 6 and offset[0] in "+-":
+        try:
+            delta = timedelta(hours=int(offset[1:3]), minutes=int(offset[4:6]))
+        except ValueError:
+            return ts
+        ts = ts - delta if offset[0] == "+" else ts + delta
+    return ts
+
+
+_IFD0_TAGS = frozenset({_MAKE, _MODEL, _DATETIME, _EXIF_IFD, _GPS_IFD})
+_EXIF_TAGS = frozenset({_DATETIME_ORIGINAL, _OFFSET_TIME_ORIGINAL, _BODY_SERIAL})
+_GPS_TAGS = frozenset({_LAT_REF, _LAT, _LNG_REF, _LNG, _ALT_REF, _ALT})
+
+
+def parse_metadata(data: bytes) -> ImageMetadata:
+    """
+    Parse capture metadata from an in-memory image (JPEG or TIFF).
+
+    Never raises on malformed input; missing or unreadable fields are None.
+    A tag with an unexpected type or count is treated as missing.
+    """
+    block = find_tiff_block(data)
+    if block is None or len(block) < 8:
+        return ImageMetadata()
+    reader = _TiffReader(block)
+
+    def sub_ifd(tag: int, wanted: frozenset) -> Dict[int, object]:
+        offset = _integer(ifd0.get(tag))
+        return reader.ifd(offset, wanted) if offset is not None else {}
+
+    try:
+        ifd0 = reader.ifd(reader._unpack("L", 4)[0], _IFD0_TAGS)
+        exif = sub_ifd(_EXIF_IFD, _EXIF_TAGS)
+        gps = sub_ifd(_GPS_IFD, _GPS_TAGS)
+    except struct.error:
+        return ImageMetadata()
+
+    lat = _to_degrees(gps.get(_LAT), gps.get(_LAT_REF), "S")
+    lng = _to_degrees(gps.get(_LNG), gps.get(_LNG_REF), "W")
+    altitude = _rationals(gps.get(_ALT), 1)
+    if altitude is not None:
+        altitude = altitude[0]
+        # AltitudeRef is a BYTE: 1 means below sea level
+        if _integer(gps.get(_ALT_REF)) == 1:
+            altitude = -altitude
+
+    timestamp = _parse_timestamp(exif.get(_DATETIME_ORIGINAL), exif.get(_OFFSET_TIME_ORIGINAL))
+    if timestamp is None:
+        timestamp = _parse_timestamp(ifd0.get(_DATETIME), None)
+
+    camera_id = _text(exif.get(_BODY_SERIAL)) or None
+    camera_model = " ".join(v for v in (_text(ifd0.get(_MAKE)), _text(ifd0.get(_MODEL))) if v) or None
+
+    return ImageMetadata(
+        timestamp=timestamp, lat=lat, lng=lng, altitude=altitude,
+        camera_id=camera_id, camera_model=camera_model,
+    )
+
+
+def extract_metadata(source: Source) -> ImageMetadata:
+    """
+    Extract capture metadata from bytes, a file path or a binary file object.
+
+    Files are read only up to ``HEADER_BYTES``; file objects are rewound to
+    their original position afterwards.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return parse_metadata(bytes(source) if isinstance(source, memoryview) else source)
+    if isinstance(source, str):
+        with open(source, "rb") as fh:
+            return parse_metadata(fh.read(HEADER_BYTES))
+    position = source.tell()
+    try:
+        return parse_metadata(source.read(HEADER_BYTES))
+    finally:
+        source.seek(position)
+
+
+def extract_metadata_batch(sources: Iterable[Source], max_workers: int = 8) -> List[ImageMetadata]:
+    """
+    Extract metadata from many images, overlapping file reads across threads.
+
+    Results are returned in input order.
+    """
+    sources = list(sources)
+    if len(sources) < 2 or max_workers <= 1:
+        return [extract_metadata(s) for s in sources]
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(extract_metadata, sources, chunksize=32))
@@ -0,0 +1,280 @@
+"""
+Geofence Module
+
+Resolves GPS positions to park zone labels using zone polygons loaded from a
+GeoJSON file.
+
+Zones are indexed on a uniform lat/lng grid. Every grid cell that a zone
+covers is classified once at load time as either fully inside the zone or
+crossed by its boundary. A lookup hashes the point to its cell and returns
+the label straight away for fully covered cells; only boundary cells run a
+point-in-polygon test, and that test only looks at the edges overlapping the
+point's grid row. Overlapping zones resolve to the smallest one, so a rhino
+sanctuary drawn inside a larger park section wins.
+
+``GeofenceLookup`` wraps an index and reloads it when the GeoJSON file
+changes, so workers pick up edited zones without a restart.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+Edge = Tuple[float, float, float, float]  # x1, y1, x2, y2 with x = lng, y = lat
+
+# Cell classification
+_INSIDE, _BOUNDARY = 0, 1
+
+
+@dataclass(frozen=True)
+class Zone:
+    """
+    A labelled zone.
+
+    Attributes:
+        label (str): Zone label written to ``zone_label`` columns
+        rings (tuple): Outer rings and holes of all parts, as (lng, lat) tuples
+        bbox (tuple): (min_lng, min_lat, max_lng, max_lat)
+        area (float): Planar area in square degrees (used for precedence)
+    """
+    label: str
+    rings: Tuple[Tuple[Tuple[float, float], ...], ...]
+    bbox: Tuple[float, float, float, float]
+    area: float
+
+
+def _ring_area(ring: Sequence[Tuple[float, float]]) -> float:
+    return 0.5 * sum(x1 * y2 - x2 * y1 for (x1, y1), (x2, y2) in zip(ring, ring[1:] + ring[:1]))
+
+
+def _parse_polygons(geometry: Dict) -> List[List[List[Tuple[float, float]]]]:
+    kind = geometry.get("type")
+    if kind == "Polygon":
+        polygons = [geometry["coordinates"]]
+    elif kind == "MultiPolygon":
+        polygons = geometry["coordinates"]
+    else:
+        raise ValueError(f"Unsupported zone geometry: {kind}")
+    return [[[(float(p[0]), float(p[1])) for p in ring] for ring in polygon] for polygon in polygons]
+
+
+def zones_from_geojson(data: Dict, label_property: str = "name") -> List[Zone]:
+    """
+    Build zones from a GeoJSON FeatureCollection of (Multi)Polygon features.
+
+    The label comes from ``properties[label_property]``, falling back to the
+    feature ``id``. Features without a label are skipped.
+    """
+    zones = []
+    for feature in data.get("features", []):
+        properties = feature.get("properties") or {}
+        label = properties.get(label_property) or feature.get("id")
+        geometry = feature.get("geometry")
+        if not label or not geometry:
+            continue
+        rings, area = [], 0.0
+        for polygon in _parse_polygons(geometry):
+            for i, ring in enumerate(polygon):
+                if len(ring) > 1 and ring[0] == ring[-1]:
+                    ring = ring[:-1]
+                if len(ring) < 3:
+                    continue
+                area += abs(_ring_area(ring)) * (1 if i == 0 else -1)
+                rings.append(tuple(ring))
+        if not rings:
+            continue
+        xs = [x for ring in rings for x, _ in ring]
+        ys = [y for ring in rings for _, y in ring]
+        zones.append(Zone(str(label), tuple(rings), (min(xs), min(ys), max(xs), max(ys)), area))
+    return zones
+
+
+class ZoneIndex:
+    """
+    Grid index over a set of zones.
+
+    Args:
+        zones: Zones to index
+        grid_size: Number of cells along the longer side of the zones' extent
+    """
+
+    def __init__(self, zones: Sequence[Zone], grid_size: int = 256):
+        # Smallest zone first: the first hit in a cell is the most specific
+        self.zones = sorted(zones, key=lambda z: z.area)
+        self._cells: Dict[Tuple[int, int], List[Tuple[int, int]]] = {}
+        self._strips: List[Dict[int, List[Edge]]] = []
+        if not self.zones:
+            self.origin, self.cell = (0.0, 0.0), 1.0
+            return
+
+        min_x = min(z.bbox[0] for z in self.zones)
+        min_y = min(z.bbox[1] for z in self.zones)
+        max_x = max(z.bbox[2] for z in self.zones)
+        max_y = max(z.bbox[3] for z in self.zones)
+        self.origin = (min_x, min_y)
+        self.cell = max(max_x - min_x, max_y - min_y, 1e-9) / grid_size
+
+        for zone_id, zone in enumerate(self.zones):
+            self._strips.append(self._index_zone(zone_id, zone))
+
+    @classmethod
+    def from_file(cls, path: str, label_property: str = "name", grid_size: int = 256) -> "ZoneIndex":
+        """Load and index a GeoJSON file."""
+        with open(path, "r", encoding="utf-8") as fh:
+            return cls(zones_from_geojson(json.load(fh), label_property), grid_size)
+
+    def _col(self, x: float) -> int:
+        return int((x - self.origin[0]) // self.cell)
+
+    def _row(self, y: float) -> int:
+        return int((y - self.origin[1]) // self.cell)
+
+    def _index_zone(self, zone_id: int, zone: Zone) -> Dict[int, List[Edge]]:
+        """Classify the zone's cells and bucket its edges by grid row."""
+        ox, oy, cell = self.origin[0], self.origin[1], self.cell
+        strips: Dict[int, List[Edge]] = {}
+        boundary = set()
+
+        for ring in zone.rings:
+            for (x1, y1), (x2, y2) in zip(ring, ring[1:] + ring[:1]):
+                edge = (x1, y1, x2, y2)
+                for row in range(self._row(min(y1, y2)), self._row(max(y1, y2)) + 1):
+                    strips.setdefault(row, []).append(edge)
+                    # Part of the edge inside this row, as an x range
+                    lo_y, hi_y = max(min(y1, y2), oy + row * cell), min(max(y1, y2), oy + (row + 1) * cell)
+                    if y1 == y2:
+                        xa, xb = x1, x2
+                    else:
+                        xa = x1 + (lo_y - y1) * (x2 - x1) / (y2 - y1)
+                        xb = x1 + (hi_y - y1) * (x2 - x1) / (y2 - y1)
+                    for col in range(self._col(min(xa, xb)), self._col(max(xa, xb)) + 1):
+                        boundary.add((col, row))
+
+        col_lo, col_hi = self._col(zone.bbox[0]), self._col(zone.bbox[2])
+        for row in range(self._row(zone.bbox[1]), self._row(zone.bbox[3]) + 1):
+            # Crossings of the row's centre line; cells between an odd and the
+            # next even crossing are inside
+            cy = oy + (row + 0.5) * cell
+            crossings = sorted(
+                x1 + (cy - y1) * (x2 - x1) / (y2 - y1)
+                for x1, y1, x2, y2 in strips.get(row, ())
+                if (y1 > cy) != (y2 > cy)
+            )
+            for col in range(col_lo, col_hi + 1):
+                key = (col, row)
+                if key in boundary:
+                    kind = _BOUNDARY
+                elif bisect_left(crossings, ox + (col + 0.5) * cell) % 2:
+                    kind = _INSIDE
+                else:
+                    continue
+                self._cells.setdefault(key, []).append((zone_id, kind))
+        return strips
+
+    @staticmethod
+    def _contains(edges: Iterable[Edge], x: float, y: float) -> bool:
+        inside = False
+        for x1, y1, x2, y2 in edges:
+            if (y1 > y) != (y2 > y) and x < x1 + (y - y1) * (x2 - x1) / (y2 - y1):
+                inside = not inside
+        return inside
+
+    def lookup(self, lat: float, lng: float) -> Optional[str]:
+        """Label of the smallest zone containing the point, or None."""
+        row = int((lat - self.origin[1]) // self.cell)
+        entries = self._cells.get((int((lng - self.origin[0]) // self.cell), row))
+        if not entries:
+            return None
+        for zone_id, kind in entries:
+            if kind == _INSIDE or self._contains(self._strips[zone_id].get(row, ()), lng, lat):
+                return self.zones[zone_id].label
+        return None
+
+    def lookup_many(self, points: Iterable[Tuple[float, float]]) -> List[Optional[str]]:
+        """Labels for many ``(lat, lng)`` points, in input order."""
+        lookup = self.lookup
+        return [lookup(lat, lng) for lat, lng in points]
+
+    def __len__(self) -> int:
+        return len(self.zones)
+
+
+class GeofenceLookup:
+    """
+    Zone lookup backed by a GeoJSON file that is reloaded when it changes.
+
+    The file's modification time is checked at most every ``check_interval``
+    seconds. A new index is built off to the side and swapped in atomically;
+    if the edited file fails to parse, the previous index stays in use. A
+    missing file means no zones.
+
+    Args:
+        path: GeoJSON file with zone polygons
+        check_interval: Seconds between modification checks
+        label_property: Feature property holding the zone label
+    """
+
+    def __init__(self, path: str, check_interval: float = 5.0, label_property: str = "name"):
+        self.path = path
+        self.check_interval = check_interval
+        self.label_property = label_property
+        self._index = ZoneIndex([])
+        self._mtime: Optional[int] = None
+        self._checked = float("-inf")
+        self._lock = threading.Lock()
+        self.reload()
+
+    def _stat(self) -> Optional[int]:
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except (FileNotFoundError, TypeError):
+            return None
+
+    def reload(self) -> bool:
+        """Rebuild the index if the file changed. Returns True if it was swapped."""
+        with self._lock:
+            self._checked = time.monotonic()
+            mtime = self._stat()
+            if mtime == self._mtime:
+                return False
+            try:
+                index = ZoneIndex.from_file(self.path, self.label_property) if mtime else ZoneIndex([])
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                logger.error("Failed to load zones from %s, keeping previous index: %s", self.path, e)
+                return False
+            self._index, self._mtime = index, mtime
+            logger.info("Loaded %d zones from %s", len(index), self.path)
+            return True
+
+    @property
+    def index(self) -> ZoneIndex:
+        """Current index, reloaded first if the check interval has passed."""
+        if time.monotonic() - self._checked >= self.check_interval:
+            self.reload()
+        return self._index
+
+    def lookup(self, lat: Optional[float], lng: Optional[float]) -> Optional[str]:
+        """Zone label for a position; None for unknown positions or outside all zones."""
+        if lat is None or lng is None:
+            return None
+        return self.index.lookup(lat, lng)
+
+    def lookup_many(self, points: Iterable[Tuple[float, float]]) -> List[Optional[str]]:
+        """Zone labels for many ``(lat, lng)`` points against one index snapshot."""
+        return self.index.lookup_many(points)
+
+
+@lru_cache(maxsize=1)
+def get_geofence() -> GeofenceLookup:
+    """Process-wide zone lookup built from configuration."""
+    from config import GEOFENCE_PATH, GEOFENCE_RELOAD_SECONDS
+
+    return GeofenceLookup(GEOFENCE_PATH, GEOFENCE_RELOAD_SECONDS)
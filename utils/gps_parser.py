@@ -6,13 +6,17 @@ and handling geographic data in the RhinoGuardians system.
 """
 
 from typing import Optional, Tuple
-from PIL import Image
-from PIL.ExifTags import TAGS, GPSTAGS
+
+from utils.exif import extract_metadata, HEADER_BYTES
+
 
 def get_gps_from_image(image_path: str) -> Optional[Tuple[float, float]]:
     """
     Extract GPS coordinates from image EXIF data.
     
+    JPEG and TIFF files are handled by the header-only parser in
+    ``utils.exif``; other formats fall back to PIL.
+    
     Args:
         image_path (str): Path to the image file
         
@@ -21,45 +25,36 @@ def get_gps_from_image(image_path: str) -> Optional[Tuple[float, float]]:
                                      None if no GPS data exists
     """
     try:
-        with Image.open(image_path) as img:
-            exif = img._getexif()
-            if not exif:
-                return None
-                
-            gps_info = None
-            for tag_id in exif:
-                tag = TAGS.get(tag_id, tag_id)
-                if tag == "GPSInfo":
-                    gps_info = exif[tag_id]
-                    break
-                    
-            if not gps_info:
-                return None
-                
-            lat_data = gps_info.get(2)  # Latitude data
-            lon_data = gps_info.get(4)  # Longitude data
-            lat_ref = gps_info.get(1, 'N')  # North/South
-            lon_ref = gps_info.get(3, 'E')  # East/West
-            
-            if not (lat_data and lon_data):
-                return None
-                
-            # Convert coordinates to degrees
-            lat = _convert_to_degrees(lat_data)
-            lon = _convert_to_degrees(lon_data)
-            
-            # Apply hemisphere reference
-            if lat_ref == 'S':
-                lat = -lat
-            if lon_ref == 'W':
-                lon = -lon
-                
-            return (lat, lon)
-            
+        with open(image_path, "rb") as fh:
+            head = fh.read(HEADER_BYTES)
+        if head[:2] == b"\xff\xd8" or head[:4] in (b"II*\x00", b"MM\x00*"):
+            return extract_metadata(head).gps
+        return _get_gps_with_pil(image_path)
     except Exception as e:
         print(f"Error extracting GPS data: {e}")
         return None
 
+
+def _get_gps_with_pil(image_path: str) -> Optional[Tuple[float, float]]:
+    """Fallback for formats the header parser doesn't cover (PNG, WebP, ...)."""
+    from PIL import Image
+
+    with Image.open(image_path) as img:
+        gps_info = img.getexif().get_ifd(0x8825)
+    lat_data = gps_info.get(2)  # Latitude data
+    lon_data = gps_info.get(4)  # Longitude data
+    if not (lat_data and lon_data):
+        return None
+
+    lat = _convert_to_degrees(lat_data)
+    lon = _convert_to_degrees(lon_data)
+    if gps_info.get(1, 'N') == 'S':
+        lat = -lat
+    if gps_info.get(3, 'E') == 'W':
+        lon = -lon
+    return (lat, lon)
+
+
 def _convert_to_degrees(value: tuple) -> float:
     """
     Helper function to convert GPS coordinates to decimal degrees.
@@ -74,4 +69,4 @@ def _convert_to_degrees(value: tuple) -> float:
     minutes = value[1]
     seconds = value[2]
     
-    return degrees + (minutes / 60.0) + (seconds / 3600.0)
\ No newline at end of file
+    return float(degrees) + (float(minutes) / 60.0) + (float(seconds) / 3600.0)
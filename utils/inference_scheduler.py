@@ -0,0 +1,236 @@
+"""
+Inference Scheduling Module
+
+Orders model calls by priority so live feeds are not stuck behind backfill.
+
+Uploads are queued in one of three classes:
+
+- ``realtime``: live drone and camera feeds; short deadline
+- ``normal``: the default
+- ``backfill``: syncs of old camera-trap images; no deadline
+
+Whenever one of the ``slots`` (the inference pool size) is free, the next
+call is picked by weighted fair queuing (stride scheduling): each class
+advances a virtual clock by ``1 / weight`` per dispatched call and the
+non-empty class with the lowest clock goes next, so with weights 8/4/1 a
+saturated worker still gives backfill 1 call in 13. A class that was idle
+restarts at the current virtual time instead of cashing in credit from its
+idle period. On top of that, a call waiting longer than
+``starvation_seconds`` is dispatched first, whatever its class.
+
+Calls still queued past their class deadline are dropped with
+``InferenceDeadlineExceeded`` rather than run: a live frame that has waited
+that long is superseded by newer frames. Cancelled calls (the client went
+away) are skipped.
+
+The scheduler is thread-based (``concurrent.futures``) so it works from any
+event loop; ``run`` awaits a call from async code.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor, Future
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Callable, Deque, Dict, Optional
+
+from utils.metrics import INFERENCE_DROPPED, INFERENCE_QUEUED, INFERENCE_WAIT_SECONDS
+
+PRIORITIES = ("realtime", "normal", "backfill")
+DEFAULT_PRIORITY = "normal"
+
+
+class InferenceDeadlineExceeded(Exception):
+    """A queued call passed its class deadline and was dropped."""
+
+
+@dataclass
+class _Job:
+    fn: Callable
+    args: tuple
+    priority: str
+    enqueued: float
+    deadline: Optional[float]
+    future: Future = field(default_factory=Future)
+
+
+def parse_client_priorities(value: str) -> Dict[str, str]:
+    """
+    Parse ``"client=priority,client=priority"`` (e.g. ``INFERENCE_CLIENT_PRIORITIES``).
+
+    Raises:
+        ValueError: On a malformed entry or an unknown priority
+    """
+    mapping = {}
+    for entry in filter(None, (part.strip() for part in value.split(","))):
+        client, sep, priority = entry.partition("=")
+        if not sep or priority.strip() not in PRIORITIES:
+            raise ValueError(f"Invalid client priority entry: {entry!r}")
+        mapping[client.strip()] = priority.strip()
+    return mapping
+
+
+def resolve_priority(requested: Optional[str], client_id: Optional[str], clients: Dict[str, str]) -> str:
+    """
+    Priority of an upload: the explicit request wins, then the caller's
+    configured class, then ``normal``.
+
+    Raises:
+        ValueError: If ``requested`` is not a known priority
+    """
+    if requested:
+        if requested not in PRIORITIES:
+            raise ValueError(f"Unknown priority {requested!r}; expected one of {', '.join(PRIORITIES)}")
+        return requested
+    return clients.get(client_id or "", DEFAULT_PRIORITY)
+
+
+class InferenceScheduler:
+    """
+    Priority queues in front of an executor.
+
+    Args:
+        executor: Runs the calls; should have at least ``slots`` threads
+        slots: Calls running at once
+        weights: Share of dispatches per priority
+        deadlines: Seconds a call may wait per priority (0 = no deadline)
+        starvation_seconds: Wait after which a call goes first regardless of weight
+        clock: Monotonic time source (injectable for tests)
+    """
+
+    def __init__(
+        self,
+        executor: Executor,
+        slots: int,
+        weights: Dict[str, float],
+        deadlines: Dict[str, float],
+        starvation_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.executor = executor
+        self.slots = max(1, slots)
+        self.weights = {p: max(float(weights.get(p, 1.0)), 1e-6) for p in PRIORITIES}
+        self.deadlines = {p: float(deadlines.get(p, 0.0)) for p in PRIORITIES}
+        self.starvation_seconds = starvation_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._queues: Dict[str, Deque[_Job]] = {p: deque() for p in PRIORITIES}
+        self._pass = {p: 0.0 for p in PRIORITIES}
+        self._virtual_time = 0.0
+        self._running = 0
+
+    def queued(self, priority: str) -> int:
+        return len(self._queues[priority])
+
+    def submit(self, fn: Callable, *args, priority: str = DEFAULT_PRIORITY) -> Future:
+        """Queue ``fn(*args)``; the returned future resolves when it ran or was dropped."""
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority: {priority}")
+        now = self._clock()
+        deadline = self.deadlines[priority]
+        job = _Job(fn, args, priority, now, now + deadline if deadline > 0 else None)
+        with self._lock:
+            queue = self._queues[priority]
+            if not queue:
+                # Back from idle: no credit for the time nothing was queued
+                self._pass[priority] = max(self._pass[priority], self._virtual_time)
+            queue.append(job)
+            INFERENCE_QUEUED.inc(priority)
+            self._dispatch()
+        return job.future
+
+    async def run(self, fn: Callable, *args, priority: str = DEFAULT_PRIORITY):
+        """Await ``fn(*args)`` through the queues; cancelling the await dequeues the call."""
+        return await asyncio.wrap_future(self.submit(fn, *args, priority=priority))
+
+    def _pop(self, priority: str) -> _Job:
+        job = self._queues[priority].popleft()
+        INFERENCE_QUEUED.dec(priority)
+        return job
+
+    def _discard_dead(self, now: float) -> None:
+        """Drop cancelled calls and calls past their deadline from the queue heads."""
+        for priority, queue in self._queues.items():
+            while queue:
+                job = queue[0]
+                if job.future.cancelled():
+                    self._pop(priority)
+                elif job.deadline is not None and now > job.deadline:
+                    self._pop(priority)
+                    if not job.future.set_running_or_notify_cancel():
+                        continue
+                    INFERENCE_DROPPED.inc(priority)
+                    job.future.set_exception(InferenceDeadlineExceeded(
+                        f"{priority} inference waited {now - job.enqueued:.2f}s, "
+                        f"past its {self.deadlines[priority]:g}s deadline"
+                    ))
+                else:
+                    break
+
+    def _next(self, now: float) -> Optional[_Job]:
+        self._discard_dead(now)
+        heads = {p: q[0] for p, q in self._queues.items() if q}
+        if not heads:
+            return None
+        starving = [p for p, job in heads.items() if now - job.enqueued >= self.starvation_seconds]
+        if starving:
+            priority = min(starving, key=lambda p: heads[p].enqueued)
+        else:
+            # Ties go to the more urgent class (PRIORITIES order)
+            priority = min(heads, key=lambda p: (self._pass[p], PRIORITIES.index(p)))
+        self._virtual_time = max(self._virtual_time, self._pass[priority])
+        self._pass[priority] += 1.0 / self.weights[priority]
+        return self._pop(priority)
+
+    def _dispatch(self) -> None:
+        """Start queued calls while slots are free; caller holds the lock."""
+        while self._running < self.slots:
+            now = self._clock()
+            job = self._next(now)
+            if job is None:
+                return
+            if not job.future.set_running_or_notify_cancel():
+                continue
+            INFERENCE_WAIT_SECONDS.observe(now - job.enqueued, job.priority)
+            self._running += 1
+            self.executor.submit(self._execute, job)
+
+    def _execute(self, job: _Job) -> None:
+        try:
+            job.future.set_result(job.fn(*job.args))
+        except BaseException as e:
+            job.future.set_exception(e)
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._dispatch()
+
+
+@lru_cache(maxsize=1)
+def get_inference_scheduler() -> InferenceScheduler:
+    """Process-wide scheduler over the inference pool, configured from settings."""
+    from config import (
+        INFERENCE_DEADLINE_BACKFILL, INFERENCE_DEADLINE_NORMAL, INFERENCE_DEADLINE_REALTIME,
+        INFERENCE_STARVATION_SECONDS, INFERENCE_WEIGHT_BACKFILL, INFERENCE_WEIGHT_NORMAL,
+        INFERENCE_WEIGHT_REALTIME,
+    )
+    from utils.cpu_planner import get_cpu_plan, get_inference_executor
+
+    return InferenceScheduler(
+        get_inference_executor(),
+        slots=get_cpu_plan().inference_pool_size,
+        weights=dict(zip(PRIORITIES, (INFERENCE_WEIGHT_REALTIME, INFERENCE_WEIGHT_NORMAL, INFERENCE_WEIGHT_BACKFILL))),
+        deadlines=dict(zip(PRIORITIES, (
+            INFERENCE_DEADLINE_REALTIME, INFERENCE_DEADLINE_NORMAL, INFERENCE_DEADLINE_BACKFILL,
+        ))),
+        starvation_seconds=INFERENCE_STARVATION_SECONDS,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_client_priorities() -> Dict[str, str]:
+    from config import INFERENCE_CLIENT_PRIORITIES
+
+    return parse_client_priorities(INFERENCE_CLIENT_PRIORITIES)
@@ -0,0 +1,284 @@
+"""
+Metrics Module
+
+Minimal in-process instrumentation exposed in the Prometheus text format
+(version 0.0.4) by ``GET /metrics``.
+
+Histograms and counters are updated on the request path: an observation is
+one bisect plus an increment under an uncontended lock, so instrumentation
+can stay on in production. Gauges that describe shared state (DB pool
+checkouts, cache hit ratios) are computed from callbacks only when the
+endpoint is scraped and cost nothing in between.
+
+Metrics are created once at import time and registered in ``REGISTRY``
+(pass ``registry=None`` for a standalone metric); ``render_metrics``
+serialises every registered metric.
+"""
+
+import bisect
+import math
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Seconds; covers sub-millisecond decode steps up to multi-second inference
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+REGISTRY: List["_Metric"] = []
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence, extra: Tuple[str, str] = None) -> str:
+    pairs = list(zip(names, values))
+    if extra is not None:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        registry: Optional[list] = REGISTRY,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        if registry is not None:
+            registry.append(self)
+
+    def collect(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.kind}"
+        yield from self._samples()
+
+    def _samples(self) -> Iterator[str]:
+        return iter(())
+
+
+class Counter(_Metric):
+    """Monotonic counter, one series per label-value tuple."""
+
+    kind = "counter"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        registry: Optional[list] = REGISTRY,
+    ):
+        super().__init__(name, documentation, labelnames, registry)
+        self._values: Dict[tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels) -> float:
+        return self._values.get(labels, 0.0)
+
+    def _samples(self) -> Iterator[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+class Gauge(_Metric):
+    """
+    Gauge set from the request path (``set``/``inc``/``dec``) or, when
+    ``function`` is given, computed at scrape time. The function returns a
+    number, or a dict of label-value tuple to number.
+    """
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        function: Optional[Callable[[], object]] = None,
+        registry: Optional[list] = REGISTRY,
+    ):
+        super().__init__(name, documentation, labelnames, registry)
+        self._values: Dict[tuple, float] = {}
+        self._function = function
+
+    def set(self, value: float, *labels) -> None:
+        self._values[labels] = value
+
+    def inc(self, *labels, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def dec(self, *labels, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def value(self, *labels) -> float:
+        return self._values.get(labels, 0.0)
+
+    def _samples(self) -> Iterator[str]:
+        if self._function is not None:
+            result = self._function()
+            values = result if isinstance(result, dict) else {(): result}
+        else:
+            with self._lock:
+                values = dict(self._values)
+        for labels, value in sorted(values.items()):
+            if value is not None:
+                yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+class _Timer:
+    __slots__ = ("_histogram", "_labels", "_started")
+
+    def __init__(self, histogram: "Histogram", labels: tuple):
+        self._histogram = histogram
+        self._labels = labels
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._histogram.observe(time.perf_counter() - self._started, *self._labels)
+        return False
+
+
+class Histogram(_Metric):
+    """
+    Cumulative histogram with fixed upper bounds.
+
+    Bucket counts are stored per bucket and accumulated only when scraped.
+    """
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        registry: Optional[list] = REGISTRY,
+    ):
+        super().__init__(name, documentation, labelnames, registry)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts (last one is +Inf), sum]
+        self._series: Dict[tuple, list] = {}
+
+    def observe(self, value: float, *labels) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def time(self, *labels) -> _Timer:
+        """Context manager observing the elapsed wall time of its block."""
+        return _Timer(self, labels)
+
+    def count(self, *labels) -> int:
+        series = self._series.get(labels)
+        return sum(series[0]) if series else 0
+
+    def _samples(self) -> Iterator[str]:
+        with self._lock:
+            items = sorted((labels, (list(counts), total)) for labels, (counts, total) in self._series.items())
+        for labels, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = ("le", _format_value(bound))
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}"
+            label_text = _format_labels(self.labelnames, labels)
+            yield f"{self.name}_sum{label_text} {_format_value(total)}"
+            yield f"{self.name}_count{label_text} {cumulative}"
+
+
+def render_metrics() -> str:
+    """All registered metrics in the Prometheus text exposition format."""
+    lines: List[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.collect())
+    return "\n".join(lines) + "\n"
+
+
+# Pipeline stages: upload_read, motion_gate, decode, inference, postprocess, db_write, notification_send
+STAGE_SECONDS = Histogram(
+    "rhinoguardians_stage_seconds",
+    "Time spent per request pipeline stage.",
+    ("stage",),
+)
+INFERENCE_QUEUE_DEPTH = Gauge(
+    "rhinoguardians_inference_queue_depth",
+    "Inference calls submitted and not yet finished.",
+)
+INFERENCE_QUEUED = Gauge(
+    "rhinoguardians_inference_queued",
+    "Inference calls waiting for a slot, by priority.",
+    ("priority",),
+)
+INFERENCE_DROPPED = Counter(
+    "rhinoguardians_inference_dropped_total",
+    "Queued inference calls dropped past their deadline, by priority.",
+    ("priority",),
+)
+INFERENCE_WAIT_SECONDS = Histogram(
+    "rhinoguardians_inference_wait_seconds",
+    "Time inference calls waited in the priority queues.",
+    ("priority",),
+)
+MOTION_GATE_DECISIONS = Counter(
+    "rhinoguardians_motion_gate_total",
+    "Frames checked by the motion gate, by action (skipped, region, full).",
+    ("action",),
+)
+NOTIFICATION_BACKLOG = Gauge(
+    "rhinoguardians_notification_backlog",
+    "Alert notifications being sent and not yet finished.",
+)
+CACHE_REQUESTS = Counter(
+    "rhinoguardians_cache_requests_total",
+    "Cache lookups by cache and result (hit or miss).",
+    ("cache", "result"),
+)
+
+
+def _cache_hit_ratios() -> Dict[tuple, Optional[float]]:
+    caches = {labels[0] for labels in list(CACHE_REQUESTS._values)}
+    ratios = {}
+    for cache in caches:
+        hits, misses = CACHE_REQUESTS.value(cache, "hit"), CACHE_REQUESTS.value(cache, "miss")
+        ratios[(cache,)] = hits / (hits + misses) if hits + misses else None
+    return ratios
+
+
+CACHE_HIT_RATIO = Gauge(
+    "rhinoguardians_cache_hit_ratio",
+    "Share of cache lookups served from the cache since startup.",
+    ("cache",),
+    function=_cache_hit_ratios,
+)
@@ -0,0 +1,212 @@
+"""
+Motion Gating Module
+
+Cheap pre-filter in front of the detector for fixed cameras. Most
+camera-trap frames are empty (wind, grass, lighting changes), and a frame
+that matches the camera's background does not need the model.
+
+Per camera a background model is kept: a running average of downscaled
+greyscale frames (``MOTION_GATE_WIDTH`` pixels wide; JPEGs are decoded at
+reduced scale by libjpeg, so this costs a few milliseconds). Each new frame
+is compared with it in NumPy:
+
+1. Both images are mean-centred, so a global brightness change (cloud,
+   dusk, auto-exposure) does not count as motion.
+2. Pixels differing by more than ``MOTION_GATE_PIXEL_THRESHOLD`` grey
+   levels are marked changed.
+3. The mask is pooled into ``CELL`` x ``CELL`` cells; a cell is changed when
+   more than ``MOTION_GATE_CELL_FRACTION`` of its pixels are, which ignores
+   isolated noise and swaying grass blades.
+
+No changed cell: inference is skipped. Changed cells covering a small part
+of the frame: the detector only sees the padded bounding box of those cells
+(``region``). Otherwise the full frame is inferred. The first frame of a
+camera, frames of unknown cameras and every ``MOTION_GATE_REFRESH_FRAMES``-th
+frame without inference always go to the model, which bounds how long an
+animal that stopped moving (and was absorbed into the background) goes
+unseen.
+"""
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import lru_cache
+from io import BytesIO
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+CELL = 8
+ROI_MARGIN = 0.25  # Padding around the changed region, relative to its size
+
+SKIPPED, REGION, FULL = "skipped", "region", "full"
+
+
+@dataclass
+class GateDecision:
+    """
+    Outcome of gating one frame.
+
+    Attributes:
+        action: ``skipped``, ``region`` or ``full``
+        reason: Why (``static``, ``motion``, ``no_background``, ``refresh``, ``no_camera``)
+        region: ``[x1, y1, x2, y2]`` in full-frame pixels for ``region``
+        changed_fraction: Share of cells that changed
+    """
+
+    action: str
+    reason: str
+    region: Optional[List[int]] = None
+    changed_fraction: float = 0.0
+
+    def as_dict(self) -> Dict:
+        return {
+            "action": self.action,
+            "reason": self.reason,
+            "region": self.region,
+            "changed_fraction": round(self.changed_fraction, 4),
+        }
+
+
+@dataclass
+class _Background:
+    mean: np.ndarray
+    frames_since_inference: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+def downscale(data: bytes, width: int) -> Tuple[np.ndarray, Tuple[int, int]]:
+    """
+    Greyscale copy of an encoded image, ``width`` pixels wide and a multiple
+    of ``CELL`` high, plus the full-resolution size.
+    """
+    from PIL import Image
+
+    with Image.open(BytesIO(data)) as img:
+        size = img.size
+        height = max(CELL, round(width * size[1] / size[0] / CELL) * CELL)
+        img.draft("L", (width, height))  # JPEG: decode at 1/2..1/8 scale
+        small = img.convert("L").resize((width, height), Image.BILINEAR)
+    return np.asarray(small, dtype=np.float32), size
+
+
+class MotionGate:
+    """
+    Per-camera background models deciding which frames need inference.
+
+    Args:
+        width: Width of the downscaled comparison image (multiple of ``CELL``)
+        pixel_threshold: Grey-level difference marking a pixel changed
+        cell_fraction: Share of changed pixels marking a cell changed
+        alpha: Background learning rate per frame
+        refresh_frames: Frames without inference after which one is forced
+        max_region_fraction: Larger changed regions are inferred as full frames
+        max_cameras: Background models kept (least recently used dropped)
+    """
+
+    def __init__(
+        self,
+        width: int = 160,
+        pixel_threshold: float = 25.0,
+        cell_fraction: float = 0.25,
+        alpha: float = 0.05,
+        refresh_frames: int = 30,
+        max_region_fraction: float = 0.5,
+        max_cameras: int = 1024,
+    ):
+        self.width = width - width % CELL or CELL
+        self.pixel_threshold = pixel_threshold
+        self.cell_fraction = cell_fraction
+        self.alpha = alpha
+        self.refresh_frames = refresh_frames
+        self.max_region_fraction = max_region_fraction
+        self.max_cameras = max_cameras
+        self._lock = threading.Lock()
+        self._cameras: "OrderedDict[str, _Background]" = OrderedDict()
+
+    def _background(self, camera_id: str, frame: np.ndarray) -> Optional[_Background]:
+        """The camera's model, or None after creating one from ``frame``."""
+        with self._lock:
+            state = self._cameras.get(camera_id)
+            if state is not None and state.mean.shape == frame.shape:
+                self._cameras.move_to_end(camera_id)
+                return state
+            self._cameras[camera_id] = _Background(frame.copy())
+            self._cameras.move_to_end(camera_id)
+            while len(self._cameras) > self.max_cameras:
+                self._cameras.popitem(last=False)
+            return None
+
+    def changed_cells(self, frame: np.ndarray, background: np.ndarray) -> np.ndarray:
+        """Boolean cell grid of where ``frame`` differs from ``background``."""
+        diff = np.abs((frame - frame.mean()) - (background - background.mean())) > self.pixel_threshold
+        rows, cols = diff.shape[0] // CELL, diff.shape[1] // CELL
+        cells = diff[:rows * CELL, :cols * CELL].reshape(rows, CELL, cols, CELL).mean(axis=(1, 3))
+        return cells > self.cell_fraction
+
+    def _region(self, cells: np.ndarray, size: Tuple[int, int]) -> Optional[List[int]]:
+        """Padded bounding box of the changed cells in full-frame pixels; None if too large."""
+        rows, cols = np.flatnonzero(cells.any(axis=1)), np.flatnonzero(cells.any(axis=0))
+        scale_x, scale_y = size[0] / (cells.shape[1] * CELL), size[1] / (cells.shape[0] * CELL)
+        x1, x2 = cols[0] * CELL * scale_x, (cols[-1] + 1) * CELL * scale_x
+        y1, y2 = rows[0] * CELL * scale_y, (rows[-1] + 1) * CELL * scale_y
+        # At least one cell of context: parts of an animal that did not move still matter
+        pad_x = max((x2 - x1) * ROI_MARGIN, CELL * scale_x)
+        pad_y = max((y2 - y1) * ROI_MARGIN, CELL * scale_y)
+        box = [
+            int(max(0.0, x1 - pad_x)), int(max(0.0, y1 - pad_y)),
+            int(min(size[0], x2 + pad_x)), int(min(size[1], y2 + pad_y)),
+        ]
+        if (box[2] - box[0]) * (box[3] - box[1]) > self.max_region_fraction * size[0] * size[1]:
+            return None
+        return box
+
+    def check(self, camera_id: Optional[str], data: bytes) -> GateDecision:
+        """
+        Decide whether (and where) to run the detector on an encoded frame,
+        and fold the frame into the camera's background.
+        """
+        if not camera_id:
+            return GateDecision(FULL, "no_camera")
+        frame, size = downscale(data, self.width)
+        state = self._background(camera_id, frame)
+        if state is None:
+            return GateDecision(FULL, "no_background", changed_fraction=1.0)
+
+        with state.lock:
+            cells = self.changed_cells(frame, state.mean)
+            state.mean *= 1.0 - self.alpha
+            state.mean += self.alpha * frame
+            changed = float(cells.mean())
+            if not cells.any():
+                if state.frames_since_inference + 1 < self.refresh_frames:
+                    state.frames_since_inference += 1
+                    return GateDecision(SKIPPED, "static")
+                state.frames_since_inference = 0
+                return GateDecision(FULL, "refresh")
+            state.frames_since_inference = 0
+
+        region = self._region(cells, size)
+        if region is None:
+            return GateDecision(FULL, "motion", changed_fraction=changed)
+        return GateDecision(REGION, "motion", region=region, changed_fraction=changed)
+
+
+@lru_cache(maxsize=1)
+def get_motion_gate() -> Optional[MotionGate]:
+    """Process-wide gate from configuration; None when gating is disabled."""
+    from config import (
+        MOTION_GATE_ALPHA, MOTION_GATE_CELL_FRACTION, MOTION_GATE_ENABLED, MOTION_GATE_MAX_REGION_FRACTION,
+        MOTION_GATE_PIXEL_THRESHOLD, MOTION_GATE_REFRESH_FRAMES, MOTION_GATE_WIDTH,
+    )
+
+    if not MOTION_GATE_ENABLED:
+        return None
+    return MotionGate(
+        width=MOTION_GATE_WIDTH,
+        pixel_threshold=MOTION_GATE_PIXEL_THRESHOLD,
+        cell_fraction=MOTION_GATE_CELL_FRACTION,
+        alpha=MOTION_GATE_ALPHA,
+        refresh_frames=MOTION_GATE_REFRESH_FRAMES,
+        max_region_fraction=MOTION_GATE_MAX_REGION_FRACTION,
+    )
@@ -11,9 +11,6 @@ from database.models import Alert
 from typing import Optional
 import os
 import logging
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 from fastapi import APIRouter
 
 logger = logging.getLogger(__name__)
@@ -93,7 +90,12 @@ class NotificationService:
         """Send email alerts using configured SMTP server."""
         if not recipients:
             return False
-            
+
+        # Imported here: only needed when email is actually sent
+        import smtplib
+        from email.mime.text import MIMEText
+        from email.mime.multipart import MIMEMultipart
+
         try:
             for recipient in recipients:
                 msg = MIMEMultipart()
@@ -0,0 +1,233 @@
+"""
+Request Profiling Module
+
+Opt-in, per-request profiling for investigating slow requests in production.
+
+When ``PROFILING_ENABLED`` is set, ``ProfilingMiddleware`` wraps the app and
+profiles a request if it carries ``X-Profile: 1`` or is picked by sampling
+(``PROFILE_SAMPLE_RATE``). When profiling is disabled the middleware is not
+installed at all, so unprofiled deployments pay nothing.
+
+The profiler is a wall-clock stack sampler (in the style of pyinstrument):
+a background thread records the Python stack of every thread of the worker
+each ``PROFILE_INTERVAL_MS``. Unlike cProfile this also covers work handed to
+the thread pool (inference, EXIF, storage), which is where upload time is
+spent. Threads that are idle (waiting on a lock, queue or the event loop
+selector) are skipped. Since all threads are sampled, concurrent requests
+show up in each other's profiles; one request is profiled at a time.
+
+Profiles are JSON files in ``PROFILE_DIR``; only the newest
+``PROFILE_MAX_FILES`` are kept. Stacks are stored in the folded format
+(``outer;inner;leaf`` -> sample count) understood by flamegraph.pl and
+speedscope. They are listed and downloaded through ``/profiles``, which is
+only mounted while profiling is enabled and requires ``PROFILE_TOKEN``.
+"""
+
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_ID_HEADER = b"x-profile-id"
+PROFILE_NAME_PATTERN = re.compile(r"^[0-9T]+-[0-9a-f]{8}$")
+
+# Leaf frames of threads blocked without doing work
+_IDLE_FRAMES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+}
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _is_idle(frame) -> bool:
+    return (os.path.basename(frame.f_code.co_filename), frame.f_code.co_name) in _IDLE_FRAMES
+
+
+class StackSampler:
+    """
+    Samples the stacks of all other threads at a fixed interval.
+
+    Args:
+        interval: Seconds between samples
+    """
+
+    def __init__(self, interval: float = 0.001):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own or _is_idle(frame):
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+
+class ProfileStore:
+    """
+    Directory of request profiles capped at ``max_files`` (oldest removed).
+
+    Args:
+        directory: Where profiles are written
+        max_files: Number of profiles kept
+    """
+
+    def __init__(self, directory: str, max_files: int):
+        self.directory = Path(directory)
+        self.max_files = max_files
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def new_name() -> str:
+        return f"{datetime.utcnow():%Y%m%dT%H%M%S%f}-{uuid.uuid4().hex[:8]}"
+
+    def path(self, name: str) -> Path:
+        if not PROFILE_NAME_PATTERN.match(name):
+            raise ValueError(f"Invalid profile name: {name}")
+        return self.directory / f"{name}.json"
+
+    def save(self, name: str, profile: Dict) -> None:
+        """Write a profile atomically, then prune down to ``max_files``."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump(profile, fh)
+        os.replace(tmp, self.path(name))
+        with self._lock:
+            files = sorted(self.directory.glob("*.json"))
+            for old in files[:max(0, len(files) - self.max_files)]:
+                old.unlink(missing_ok=True)
+
+    def list(self) -> List[Dict]:
+        """Summaries of stored profiles, newest first."""
+        entries = []
+        for path in sorted(self.directory.glob("*.json"), reverse=True):
+            try:
+                profile = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                continue
+            entries.append({
+                "name": path.stem,
+                **{key: profile.get(key) for key in ("created_at", "method", "path", "status", "duration_ms", "samples")},
+            })
+        return entries
+
+    def load(self, name: str) -> Optional[Dict]:
+        try:
+            return json.loads(self.path(name).read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+
+
+def to_folded(profile: Dict) -> str:
+    """Folded-stack text (one ``stack count`` per line) for flame graph tools."""
+    return "".join(f"{stack} {count}\n" for stack, count in profile["stacks"].items())
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware profiling requests selected by header or sampling.
+
+    The response carries ``X-Profile-Id`` with the name of the stored profile.
+
+    Args:
+        app: Wrapped ASGI application
+        store: Where profiles are saved
+        sample_rate: Fraction of requests profiled without the header
+        interval: Sampling interval in seconds
+    """
+
+    def __init__(self, app, store: ProfileStore, sample_rate: float = 0.0, interval: float = 0.001):
+        self.app = app
+        self.store = store
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self._busy = threading.Lock()
+
+    def _wanted(self, scope) -> bool:
+        if scope["type"] != "http" or scope["path"].startswith("/profiles"):
+            return False
+        if any(name == PROFILE_HEADER and value == b"1" for name, value in scope["headers"]):
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if not self._wanted(scope) or not self._busy.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        name = self.store.new_name()
+        status = {}
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                message = {**message, "headers": [*message.get("headers", []), (PROFILE_ID_HEADER, name.encode())]}
+            await send(message)
+
+        sampler = StackSampler(self.interval)
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            sampler.stop()
+            duration_ms = (time.perf_counter() - started) * 1000.0
+            self._busy.release()
+            # Serializing and writing the stacks is file I/O; keep it off the event loop
+            await run_in_threadpool(self.store.save, name, {
+                "created_at": datetime.utcnow().isoformat(),
+                "method": scope["method"],
+                "path": scope["path"],
+                "query": scope.get("query_string", b"").decode("latin-1"),
+                "status": status.get("code"),
+                "duration_ms": round(duration_ms, 3),
+                "interval_ms": self.interval * 1000.0,
+                "samples": sampler.samples,
+                "stacks": dict(sampler.stacks.most_common()),
+            })
+
+
+@lru_cache(maxsize=1)
+def get_profile_store() -> ProfileStore:
+    """Process-wide profile store built from configuration."""
+    from config import PROFILE_DIR, PROFILE_MAX_FILES
+
+    return ProfileStore(PROFILE_DIR, PROFILE_MAX_FILES)
@@ -0,0 +1,81 @@
+"""
+Thumbnail Rendering Module
+
+Renders dashboard previews and detection crops from full-size frames. JPEG
+sources are decoded at reduced scale with ``Image.draft`` (DCT scaling), so a
+20 MB frame is never fully decoded just to produce a 256px preview; the final
+resize goes through ``thumbnail`` with a reducing gap, which uses the cheap
+``Image.reduce`` box filter before resampling. PIL is imported on the first
+render.
+"""
+
+from io import BytesIO
+from typing import TYPE_CHECKING, BinaryIO, Sequence
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+# Allowed preview edge lengths in pixels
+THUMBNAIL_SIZES = (128, 256, 512)
+JPEG_QUALITY = 80
+# Fraction of the box size added on each side of a detection crop
+CROP_PADDING = 0.1
+
+
+def _encode_jpeg(img: "Image.Image") -> bytes:
+    if img.mode not in ("RGB", "L"):
+        img = img.convert("RGB")
+    buf = BytesIO()
+    img.save(buf, format="JPEG", quality=JPEG_QUALITY, optimize=True)
+    return buf.getvalue()
+
+
+def render_thumbnail(fp: BinaryIO, size: int) -> bytes:
+    """
+    Render a JPEG preview whose longest edge is at most ``size`` pixels.
+
+    Args:
+        fp: Seekable binary stream of the source image
+        size: Longest edge of the output
+
+    Returns:
+        bytes: Encoded JPEG
+    """
+    from PIL import Image
+
+    with Image.open(fp) as img:
+        img.draft("RGB", (size, size))
+        img.thumbnail((size, size), reducing_gap=2.0)
+        return _encode_jpeg(img)
+
+
+def render_crop(fp: BinaryIO, box: Sequence[float], size: int) -> bytes:
+    """
+    Render a JPEG of a detection's bounding box, padded and scaled to fit ``size``.
+
+    Args:
+        fp: Seekable binary stream of the source image
+        box: ``[x1, y1, x2, y2]`` in full-resolution pixel coordinates
+        size: Longest edge of the output
+
+    Returns:
+        bytes: Encoded JPEG
+    """
+    from PIL import Image
+
+    with Image.open(fp) as img:
+        full_w, full_h = img.size
+        x1, y1, x2, y2 = box
+        pad_x, pad_y = (x2 - x1) * CROP_PADDING, (y2 - y1) * CROP_PADDING
+        x1, y1 = max(0.0, x1 - pad_x), max(0.0, y1 - pad_y)
+        x2, y2 = min(float(full_w), x2 + pad_x), min(float(full_h), y2 + pad_y)
+        box_w, box_h = max(x2 - x1, 1.0), max(y2 - y1, 1.0)
+
+        # Decode only as much resolution as the crop needs to still cover `size`
+        scale_needed = min(1.0, size / max(box_w, box_h))
+        img.draft("RGB", (int(full_w * scale_needed), int(full_h * scale_needed)))
+        sx, sy = img.size[0] / full_w, img.size[1] / full_h
+
+        crop = img.crop((int(x1 * sx), int(y1 * sy), round(x2 * sx), round(y2 * sy)))
+        crop.thumbnail((size, size), reducing_gap=2.0)
+        return _encode_jpeg(crop)
@@ -0,0 +1,259 @@
+"""
+Object Tracking Module
+
+Links detections across consecutive frames of the same camera into tracks,
+so a rhino standing in front of a camera trap for ten minutes becomes one
+track instead of hundreds of unrelated detections.
+
+Matching is per camera and per class: each new box is paired with an active
+track by bounding-box IoU, computed for all box/track pairs at once with
+NumPy, and boxes left over are paired by centroid distance (relative to the
+track's box size) to catch fast-moving animals. Pairs are assigned greedily,
+best first. A track stays active until it has not been seen for
+``max_gap_seconds``.
+
+With ``store="best"`` only the detections that open a track or raise its
+best confidence are written; every other frame just updates the track row.
+Active tracks are loaded from the database at the start of each batch, so
+tracking continues across requests, workers and restarts.
+
+Loading, matching and writing a camera's tracks must not interleave with
+another batch from the same camera, or both open a track (and an alert) for
+the same animal. On PostgreSQL ``assign_tracks`` takes a transaction-scoped
+advisory lock per camera, held until the caller commits or rolls back. Other
+backends get no cross-process lock: there tracking is only consistent with a
+single worker (the upload handler does not yield to the event loop between
+``assign_tracks`` and its commit).
+"""
+
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from database.models import Detection, Track
+
+# First key of the (namespace, camera) advisory lock pair
+TRACK_LOCK_NAMESPACE = 0x7472  # "tr"
+
+
+def iou_matrix(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """IoU of every box in ``a`` (N x 4) against every box in ``b`` (M x 4)."""
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - inter
+    return np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
+
+
+def _greedy(scores: np.ndarray, threshold: float, higher_is_better: bool = True) -> List[Tuple[int, int]]:
+    """Best-first one-to-one assignment of a score matrix, keeping pairs past ``threshold``."""
+    flat = scores.ravel()
+    order = np.argsort(-flat if higher_is_better else flat, kind="stable")
+    used_rows, used_cols, pairs = set(), set(), []
+    n_cols = scores.shape[1]
+    for k in order:
+        value = flat[k]
+        if (value < threshold) if higher_is_better else (value > threshold):
+            break
+        row, col = divmod(int(k), n_cols)
+        if row in used_rows or col in used_cols:
+            continue
+        used_rows.add(row)
+        used_cols.add(col)
+        pairs.append((row, col))
+    return pairs
+
+
+def match_boxes(
+    boxes: np.ndarray,
+    classes: Sequence[str],
+    track_boxes: np.ndarray,
+    track_classes: Sequence[str],
+    iou_threshold: float = 0.3,
+    max_centroid_distance: float = 0.5,
+) -> np.ndarray:
+    """
+    Match new boxes to track boxes.
+
+    Args:
+        boxes: New boxes, N x 4 ``[x1, y1, x2, y2]``
+        classes: Class name per new box
+        track_boxes: Latest box per active track, M x 4
+        track_classes: Class name per track
+        iou_threshold: Minimum IoU for a match
+        max_centroid_distance: Fallback match radius as a fraction of the
+            track box diagonal
+
+    Returns:
+        np.ndarray: Track index per new box, -1 for unmatched
+    """
+    assigned = np.full(len(boxes), -1, dtype=np.int64)
+    if not len(boxes) or not len(track_boxes):
+        return assigned
+
+    same_class = np.asarray(classes, dtype=object)[:, None] == np.asarray(track_classes, dtype=object)[None, :]
+    iou = np.where(same_class, iou_matrix(boxes, track_boxes), 0.0)
+    for row, col in _greedy(iou, iou_threshold):
+        assigned[row] = col
+
+    rows = np.flatnonzero(assigned < 0)
+    taken = np.zeros(len(track_boxes), dtype=bool)
+    taken[assigned[assigned >= 0]] = True
+    cols = np.flatnonzero(~taken)
+    if len(rows) and len(cols):
+        centres = (boxes[rows, :2] + boxes[rows, 2:]) / 2
+        track_centres = (track_boxes[cols, :2] + track_boxes[cols, 2:]) / 2
+        diag = np.hypot(track_boxes[cols, 2] - track_boxes[cols, 0], track_boxes[cols, 3] - track_boxes[cols, 1])
+        dist = np.linalg.norm(centres[:, None, :] - track_centres[None, :, :], axis=2) / np.maximum(diag, 1e-6)[None, :]
+        dist = np.where(same_class[np.ix_(rows, cols)], dist, np.inf)
+        for r, c in _greedy(dist, max_centroid_distance, higher_is_better=False):
+            assigned[rows[r]] = cols[c]
+    return assigned
+
+
+class Tracker:
+    """
+    Active tracks per camera, updated frame by frame.
+
+    Args:
+        iou_threshold: Minimum IoU to continue a track
+        max_gap_seconds: Time after which an unseen track is closed
+        max_centroid_distance: Fallback match radius, fraction of box diagonal
+        store: ``"best"`` to write only detections that open a track or
+            improve its best confidence, ``"all"`` to write every detection
+    """
+
+    def __init__(
+        self,
+        iou_threshold: float = 0.3,
+        max_gap_seconds: float = 60.0,
+        max_centroid_distance: float = 0.5,
+        store: str = "best",
+    ):
+        self.iou_threshold = iou_threshold
+        self.max_gap = timedelta(seconds=max_gap_seconds)
+        self.max_centroid_distance = max_centroid_distance
+        self.store = store
+        self._active: Dict[str, List[Track]] = defaultdict(list)
+        self._loaded = set()
+
+    def load_active(self, db: Session, camera_ids, since: datetime) -> None:
+        """Resume tracks of ``camera_ids`` last seen at or after ``since``."""
+        wanted = set(camera_ids) - self._loaded
+        if not wanted:
+            return
+        for track in db.execute(
+            select(Track).where(Track.camera_id.in_(wanted), Track.last_seen >= since)
+        ).scalars():
+            self._active[track.camera_id].append(track)
+        self._loaded |= wanted
+
+    def update(self, camera_id: str, ts: datetime, boxes: np.ndarray, classes: Sequence[str]) -> List[Optional[Track]]:
+        """
+        Match one frame's boxes against the camera's active tracks.
+
+        Returns:
+            list: The matched track per box, None where a new track is needed
+        """
+        active = [t for t in self._active[camera_id] if ts - t.last_seen <= self.max_gap]
+        self._active[camera_id] = active
+        if not active:
+            return [None] * len(boxes)
+        track_boxes = np.array([[t.box_x1, t.box_y1, t.box_x2, t.box_y2] for t in active], dtype=np.float64)
+        assigned = match_boxes(
+            boxes, classes, track_boxes, [t.class_name for t in active],
+            self.iou_threshold, self.max_centroid_distance,
+        )
+        return [active[i] if i >= 0 else None for i in assigned]
+
+    def add(self, camera_id: str, track: Track) -> None:
+        self._active[camera_id].append(track)
+
+
+def make_tracker() -> Tracker:
+    """Tracker configured from settings. Trackers are cheap; use one per batch."""
+    from config import TRACK_IOU_THRESHOLD, TRACK_MAX_CENTROID_DISTANCE, TRACK_MAX_GAP_SECONDS, TRACK_STORE
+
+    return Tracker(TRACK_IOU_THRESHOLD, TRACK_MAX_GAP_SECONDS, TRACK_MAX_CENTROID_DISTANCE, TRACK_STORE)
+
+
+def lock_cameras(db: Session, camera_ids) -> None:
+    """
+    Serialize tracking of ``camera_ids`` across workers until the current
+    transaction ends. PostgreSQL only; a no-op elsewhere.
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    # Always in the same order, so two batches sharing cameras cannot deadlock
+    for camera_id in sorted(camera_ids):
+        db.execute(select(func.pg_advisory_xact_lock(TRACK_LOCK_NAMESPACE, func.hashtext(camera_id))))
+
+
+def assign_tracks(db: Session, detections: Sequence[Detection], tracker: Tracker) -> List[Detection]:
+    """
+    Link detections with a ``camera_id`` to tracks, creating and updating
+    ``Track`` rows. Detections without a camera are not tracked.
+
+    Detections must have ``timestamp`` and box columns set. Tracks and the
+    detections worth storing are added to ``db``; nothing is flushed. The
+    cameras stay locked (``lock_cameras``) until ``db`` commits.
+
+    Returns:
+        list: Detections to store, in input order
+    """
+    frames: Dict[Tuple[str, datetime], List[Detection]] = defaultdict(list)
+    for det in detections:
+        if det.camera_id:
+            frames[(det.camera_id, det.timestamp)].append(det)
+    if frames:
+        cameras = {camera for camera, _ in frames}
+        lock_cameras(db, cameras)
+        since = min(ts for _, ts in frames) - tracker.max_gap
+        tracker.load_active(db, cameras, since)
+
+    keep = {id(det) for det in detections if not det.camera_id}
+    for (camera_id, ts), frame in sorted(frames.items(), key=lambda item: item[0][1]):
+        boxes = np.array([[d.box_x1, d.box_y1, d.box_x2, d.box_y2] for d in frame], dtype=np.float64)
+        matches = tracker.update(camera_id, ts, boxes, [d.class_name for d in frame])
+        for det, track in zip(frame, matches):
+            if track is None:
+                track = Track(
+                    camera_id=camera_id, class_name=det.class_name, first_seen=ts,
+                    best_confidence=0.0, detection_count=0,
+                )
+                db.add(track)
+                tracker.add(camera_id, track)
+            track.last_seen = ts
+            track.box_x1, track.box_y1, track.box_x2, track.box_y2 = det.box_x1, det.box_y1, det.box_x2, det.box_y2
+            track.zone_label = det.zone_label
+            track.detection_count += 1
+            det.track = track
+            if tracker.store == "all" or det.confidence > track.best_confidence:
+                keep.add(id(det))
+            if det.confidence > track.best_confidence:
+                track.best_confidence = det.confidence
+                track.best_detection_id = None  # set by link_best_detections once flushed
+                det._best_of_track = True
+
+    stored = [det for det in detections if id(det) in keep]
+    db.add_all(stored)
+    return stored
+
+
+def link_best_detections(detections: Sequence[Detection]) -> None:
+    """After a flush: point tracks at their best stored detection and copy
+    track IDs onto detections that were not stored."""
+    for det in detections:
+        if det.track is None:
+            continue
+        det.track_id = det.track.id
+        if getattr(det, "_best_of_track", False) and det.id is not None:
+            det.track.best_detection_id = det.id